@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+端對端截圖效能：以無頭 BooksCrawler 對本機模擬閱讀器執行 login → navigate_to_book → auto_capture_mode。
+
+回報頁/分鐘、每頁延遲 (p50/p95/最長)、各階段耗時，以及 Python 與瀏覽器行程樹的峰值記憶體 (RSS)。
+--history 會把每次結果（含 git commit）附加到 JSON Lines 檔，方便追蹤效能變化。
+需要可用的瀏覽器與 WebDriver，不需連線到博客來。
+
+用法：
+    python benchmarks/bench_e2e.py --browser chrome --pages 30 --latency 0.2
+    python benchmarks/bench_e2e.py --drop-turn-rate 0.05 --stale-rate 0.05 --history bench_history.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from src.utils import load_config  # noqa: E402
+from src.crawler import BooksCrawler  # noqa: E402
+from src.procstat import process_tree_rss  # noqa: E402
+from fixture_server import ReaderFixture  # noqa: E402
+
+
+class PeakRssSampler:
+    """背景執行緒定期取樣整個行程樹（Python + WebDriver + 瀏覽器）的 RSS，記錄峰值。"""
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = process_tree_rss(os.getpid())
+            if rss:
+                self.peak = max(self.peak, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_once(args, fixture):
+    config = dict(
+        load_config(),
+        base_url=fixture.base_url,
+        browser=args.browser,
+        headless=not args.headed,
+        email="bench@example.com",
+        password="bench",
+        session_file="",
+        page_turn_cache="",
+        metrics_dir="",
+        capture_mode=args.capture_mode,
+        settle_mode=args.settle_mode,
+    )
+    capture_times = []
+    with PeakRssSampler() as sampler:
+        start = time.monotonic()
+        crawler = BooksCrawler(config)
+        try:
+            # 記錄每頁截圖完成的時間點，相鄰差值即為每頁延遲（含翻頁與等待渲染）
+            capture = crawler.capture_page_with_retry
+
+            def timed_capture(page_num, *a, **kw):
+                ok = capture(page_num, *a, **kw)
+                if ok and crawler._last_capture_status != 'unchanged':
+                    capture_times.append(time.monotonic())
+                return ok
+
+            crawler.capture_page_with_retry = timed_capture
+            if not crawler.login(auto_captcha=True):
+                raise RuntimeError("模擬首頁登入失敗")
+            crawler.navigate_to_book(fixture.book_url())
+            capture_start = time.monotonic()
+            summary = crawler.auto_capture_mode(args.pages, args.delay)
+            capture_elapsed = time.monotonic() - capture_start
+            metrics = crawler.metrics.summary()
+        finally:
+            crawler.close()
+        total_elapsed = time.monotonic() - start
+
+    latencies = sorted(b - a for a, b in zip(capture_times, capture_times[1:]))
+    successful = summary["successful"] if summary else 0
+    return {
+        "pages": successful,
+        "failed_pages": summary["failed_pages"] if summary else None,
+        "pages_per_minute": round(successful / capture_elapsed * 60, 2) if capture_elapsed else 0.0,
+        "page_latency": {
+            "p50": round(latencies[len(latencies) // 2], 4) if latencies else None,
+            "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4) if latencies else None,
+            "max": round(latencies[-1], 4) if latencies else None,
+        },
+        "capture_seconds": round(capture_elapsed, 3),
+        "total_seconds": round(total_elapsed, 3),
+        "peak_rss_mb": round(sampler.peak / 1024 / 1024, 1) if sampler.peak else None,
+        "phases": metrics["phases"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--browser', default='chrome', choices=['chrome', 'edge', 'firefox'])
+    parser.add_argument('--headed', action='store_true', help='顯示瀏覽器畫面')
+    parser.add_argument('--pages', type=int, default=30, help='模擬書籍的頁數')
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--delay', type=float, default=5, help='每頁最長等待秒數')
+    parser.add_argument('--settle-mode', default='adaptive', choices=['adaptive', 'fixed'])
+    parser.add_argument('--capture-mode', default='window', choices=['window', 'element'])
+    parser.add_argument('--latency', type=float, default=0.2, help='翻頁後內容出現的延遲秒數')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--drop-turn-rate', type=float, default=0.0)
+    parser.add_argument('--stale-rate', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--history', help='將結果附加到此 JSON Lines 檔')
+    args = parser.parse_args()
+
+    results = []
+    cwd = Path.cwd()
+    for run in range(args.runs):
+        fixture = ReaderFixture(
+            pages=args.pages, latency=args.latency, jitter=args.jitter,
+            drop_turn_rate=args.drop_turn_rate, stale_rate=args.stale_rate,
+            slow_rate=args.slow_rate, seed=run + 1,
+        )
+        # 輸出寫到暫存目錄，避免污染 output/
+        with fixture, tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                results.append(run_once(args, fixture))
+            finally:
+                os.chdir(cwd)
+
+    print(f"\n{'輪次':>4} {'頁數':>6} {'頁/分鐘':>9} {'p50(s)':>8} {'p95(s)':>8} {'最長(s)':>8} {'峰值RSS(MB)':>12}")
+    for i, result in enumerate(results, 1):
+        latency = result["page_latency"]
+        fmt = lambda v: f"{v:.3f}" if v is not None else "-"  # noqa: E731
+        print(
+            f"{i:>4} {result['pages']:>6} {result['pages_per_minute']:>9.1f} {fmt(latency['p50']):>8} "
+            f"{fmt(latency['p95']):>8} {fmt(latency['max']):>8} {result['peak_rss_mb'] or '-':>12}"
+        )
+    phases = results[-1]["phases"] if results else {}
+    if phases:
+        print(f"\n{'階段 (最後一輪)':<28} {'次數':>6} {'總計(s)':>9} {'p50(s)':>8} {'p95(s)':>8}")
+        for phase, stats in sorted(phases.items(), key=lambda item: item[1]["total"], reverse=True):
+            print(f"{phase:<28} {stats['count']:>6} {stats['total']:>9.2f} {stats['p50']:>8.3f} {stats['p95']:>8.3f}")
+
+    if args.history:
+        record = {
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "commit": git_commit(),
+            "args": vars(args),
+            "runs": results,
+        }
+        with open(cwd / args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"\n📈 已附加到 {args.history}")
+
+
+if __name__ == '__main__':
+    main()
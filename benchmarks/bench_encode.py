@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+編碼設定的比較：每頁位元組數與編碼 ms/頁。
+
+預設以 Pillow 產生黑字白底、帶空白邊界的合成頁面；--images 可指定已截好的 PNG 資料夾。
+每種設定先以單一行程量測 ms/頁，再以 --workers 個行程的 PageEncoder 量測整體頁/秒。
+「PNG level 6」為解碼後以預設等級重新壓縮，比例欄以原始截圖大小為 1。
+
+用法：
+    python benchmarks/bench_encode.py --pages 20 --workers 4
+    python benchmarks/bench_encode.py --images output/ebook_20240101_120000
+"""
+
+import io
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from src.encoder import PageEncoder, encode_options, encode_page  # noqa: E402
+
+SETTINGS = [
+    ("PNG level 6", {}),
+    ("PNG level 9", {"png_compress_level": 9}),
+    ("灰階 PNG", {"image_mode": "grayscale"}),
+    ("1-bit PNG", {"image_mode": "bw"}),
+    ("16 色 PNG", {"image_mode": "palette", "palette_colors": 16}),
+    ("無損 WebP", {"image_format": "webp"}),
+    ("灰階無損 WebP", {"image_mode": "grayscale", "image_format": "webp"}),
+    ("JPEG q85", {"image_format": "jpeg"}),
+    ("灰階 JPEG q75", {"image_mode": "grayscale", "image_format": "jpeg", "jpeg_quality": 75}),
+    ("1-bit PNG + 裁邊", {"image_mode": "bw", "trim_margins": True}),
+]
+
+
+def synthetic_pages(count, width=1280, height=1800):
+    pages = []
+    for i in range(count):
+        # 模擬瀏覽器截圖：RGBA、淡灰色閱讀器背景、白色頁面與黑字
+        img = Image.new('RGBA', (width, height), (238, 238, 238, 255))
+        draw = ImageDraw.Draw(img)
+        draw.rectangle((140, 60, width - 140, height - 60), fill=(255, 255, 255, 255))
+        for line in range(48):
+            draw.text((200, 120 + line * 32), f"Page {i + 1} line {line + 1} " * 4, fill=(20, 20, 20, 255))
+        buf = io.BytesIO()
+        img.save(buf, format='PNG')
+        pages.append(buf.getvalue())
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pages', type=int, default=20, help='合成頁面數')
+    parser.add_argument('--images', help='改用此資料夾中的 PNG')
+    parser.add_argument('--workers', type=int, default=4, help='行程池的行程數')
+    args = parser.parse_args()
+
+    if args.images:
+        pages = [p.read_bytes() for p in sorted(Path(args.images).glob('*.png'))]
+    else:
+        pages = synthetic_pages(args.pages)
+    if not pages:
+        sys.exit("沒有可編碼的頁面")
+    target = Path('page_0001.png')
+
+    print(f"{len(pages)} 頁，原始 PNG 平均 {sum(map(len, pages)) / len(pages) / 1024:.1f} KiB/頁")
+    print(f"{'設定':<18} {'KiB/頁':>9} {'比例':>7} {'ms/頁':>8} {f'頁/秒 ({args.workers} 行程)':>16}")
+    original = sum(map(len, pages)) / len(pages)
+    for label, overrides in SETTINGS:
+        options = encode_options(overrides)
+        start = time.perf_counter()
+        sizes = [len(encode_page(data, target, options)[0]) for data in pages]
+        ms_per_page = (time.perf_counter() - start) * 1000 / len(pages)
+
+        encoder = PageEncoder(options, workers=args.workers)
+        try:
+            encoder(pages[0], target)  # 暖機：啟動子行程
+            start = time.perf_counter()
+            # 與 ScreenshotWriter 相同：多個寫入執行緒同時呼叫 encoder
+            with ThreadPoolExecutor(max_workers=args.workers) as threads:
+                list(threads.map(lambda data: encoder(data, target), pages))
+            rate = len(pages) / (time.perf_counter() - start)
+        finally:
+            encoder.close()
+
+        size = sum(sizes) / len(sizes)
+        print(f"{label:<18} {size / 1024:>9.1f} {size / original:>7.2f} {ms_per_page:>8.1f} {rate:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+全頁截圖拼接效能比較：舊版（暫存檔 + 整張 Image.new）vs FullPageStitcher（串流寫出）。
+
+不需要瀏覽器：以 FakeDriver 模擬捲動與截圖。每種實作在獨立的子行程中執行，
+以 ru_maxrss 取得各自的峰值記憶體。
+
+用法：
+    python benchmarks/bench_full_page.py --viewports 30
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from src.stitcher import FullPageStitcher  # noqa: E402
+
+WIDTH, HEIGHT = 1920, 1080
+
+
+def _make_viewport_png(seed):
+    """產生類似書頁（白底黑字）的視窗截圖。"""
+    rng = random.Random(seed)
+    img = Image.new('RGB', (WIDTH, HEIGHT), 'white')
+    draw = ImageDraw.Draw(img)
+    for y in range(40, HEIGHT - 40, 28):
+        x = 80
+        while x < WIDTH - 120:
+            w = rng.randint(8, 60)
+            draw.rectangle((x, y, x + w, y + 16), fill='black')
+            x += w + rng.randint(6, 14)
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
+
+
+class FakeDriver:
+    """模擬 execute_script / 截圖的最小 WebDriver 替身。"""
+
+    def __init__(self, total_height):
+        self.total_height = total_height
+        self.scroll_y = 0
+        self.frames = [_make_viewport_png(i) for i in range(4)]
+
+    def execute_script(self, script, *args):
+        if 'scrollHeight' in script and 'innerHeight' in script:
+            return [self.total_height, HEIGHT, WIDTH]
+        if 'scrollHeight' in script:
+            return self.total_height
+        if 'innerHeight' in script:
+            return HEIGHT
+        if 'innerWidth' in script:
+            return WIDTH
+        if 'scrollTo' in script:
+            target = args[0] if args else int(script.split(',')[1].split(')')[0])
+            self.scroll_y = max(0, min(target, self.total_height - HEIGHT))
+            return self.scroll_y
+        raise ValueError(script)
+
+    def get_screenshot_as_png(self):
+        return self.frames[(self.scroll_y // HEIGHT) % len(self.frames)]
+
+    def save_screenshot(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.get_screenshot_as_png())
+        return True
+
+
+def legacy_capture(driver, output_dir, filename):
+    """舊版 capture_full_page_screenshot 的演算法（僅移除日誌）。"""
+    total_height = driver.execute_script("return document.body.scrollHeight")
+    viewport_height = driver.execute_script("return window.innerHeight")
+    viewport_width = driver.execute_script("return window.innerWidth")
+    screenshots = []
+    current_position = 0
+    while current_position < total_height:
+        driver.execute_script(f"window.scrollTo(0, {current_position});")
+        time.sleep(0.1)
+        temp_screenshot_path = output_dir / "temp_part.png"
+        driver.save_screenshot(str(temp_screenshot_path))
+        screenshots.append(Image.open(temp_screenshot_path))
+        os.remove(temp_screenshot_path)
+        current_position += viewport_height
+    final_height = sum(img.height for img in screenshots)
+    full_image = Image.new('RGB', (viewport_width, final_height))
+    y_offset = 0
+    for img in screenshots:
+        full_image.paste(img, (0, y_offset))
+        y_offset += img.height
+        img.close()
+    full_image.save(filename)
+
+
+def run_one(impl, viewports, max_strip_height):
+    # 最後一段刻意只有半個視窗高，以呈現重疊裁切
+    driver = FakeDriver(total_height=viewports * HEIGHT + HEIGHT // 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        output_dir = Path(tmp)
+        filename = output_dir / "page_0001.png"
+        start = time.perf_counter()
+        if impl == 'legacy':
+            legacy_capture(driver, output_dir, filename)
+            outputs = [filename]
+        else:
+            outputs = FullPageStitcher(driver, max_strip_height=max_strip_height).capture(filename)
+        elapsed = time.perf_counter() - start
+        heights = []
+        for path in outputs:
+            with Image.open(path) as img:
+                heights.append(img.height)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() != 'Darwin':
+        peak *= 1024  # Linux 的 ru_maxrss 單位為 KB
+    return {
+        'impl': impl,
+        'wall_s': round(elapsed, 3),
+        'peak_rss_mb': round(peak / 1024 / 1024, 1),
+        'files': len(outputs),
+        'output_height': sum(heights),
+        'expected_height': driver.total_height,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--viewports', type=int, default=30, help='頁面高度（以視窗數計）')
+    parser.add_argument('--max-strip-height', type=int, default=16000)
+    parser.add_argument('--impl', choices=['legacy', 'streaming'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.impl:
+        print(json.dumps(run_one(args.impl, args.viewports, args.max_strip_height)))
+        return
+
+    results = []
+    for impl in ('legacy', 'streaming'):
+        out = subprocess.run(
+            [sys.executable, __file__, '--impl', impl,
+             '--viewports', str(args.viewports),
+             '--max-strip-height', str(args.max_strip_height)],
+            check=True, capture_output=True, text=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'實作':<10} {'時間(s)':>8} {'峰值RSS(MB)':>12} {'檔案數':>6} {'輸出高度':>10} {'預期高度':>10}")
+    for r in results:
+        print(
+            f"{r['impl']:<10} {r['wall_s']:>8} {r['peak_rss_mb']:>12} {r['files']:>6} "
+            f"{r['output_height']:>10} {r['expected_height']:>10}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+OCR 階段的吞吐量：頁/秒/核心 vs 行程數。
+
+預設以 Pillow 產生含文字的合成頁面；--images 可指定已截好的 PNG 資料夾。
+每一輪使用全新的快取目錄，確保每頁都真的執行 OCR。
+
+用法：
+    python benchmarks/bench_ocr.py --workers 1 2 4 --pages 24
+    python benchmarks/bench_ocr.py --images output/ebook_20240101_120000
+"""
+
+import io
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from src.ocr import OcrStage  # noqa: E402
+
+
+def synthetic_pages(count, width=1200, height=1600):
+    pages = []
+    for i in range(count):
+        img = Image.new('L', (width, height), 255)
+        draw = ImageDraw.Draw(img)
+        for line in range(40):
+            draw.text((60, 60 + line * 36), f"Page {i + 1} line {line + 1} the quick brown fox", fill=0)
+        buf = io.BytesIO()
+        img.save(buf, format='PNG')
+        pages.append(buf.getvalue())
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--pages', type=int, default=24, help='合成頁面數')
+    parser.add_argument('--images', help='改用此資料夾中的 PNG')
+    parser.add_argument('--lang', default='eng', help='Tesseract 語言（合成頁面為英文）')
+    args = parser.parse_args()
+
+    if args.images:
+        pages = [p.read_bytes() for p in sorted(Path(args.images).glob('*.png'))]
+    else:
+        pages = synthetic_pages(args.pages)
+    if not pages:
+        sys.exit("沒有可辨識的頁面")
+
+    rows = []
+    for workers in args.workers:
+        tmp = Path(tempfile.mkdtemp(prefix='bench_ocr_'))
+        try:
+            stage = OcrStage(workers=workers, lang=args.lang, cache_dir=tmp / 'cache')
+            start = time.monotonic()
+            for i, data in enumerate(pages, 1):
+                stage.submit(i, tmp / f'page_{i:04d}.png', data)
+            stage.close()
+            elapsed = time.monotonic() - start
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        rate = len(pages) / elapsed if elapsed else 0
+        rows.append((workers, elapsed, rate, rate / workers))
+
+    print(f"{'行程數':>6} {'耗時(s)':>9} {'頁/秒':>8} {'頁/秒/核心':>11}")
+    for workers, elapsed, rate, per_core in rows:
+        print(f"{workers:>6} {elapsed:>9.1f} {rate:>8.2f} {per_core:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多分頁截圖引擎的吞吐量：頁/分鐘 vs 分頁數。
+
+每一輪開啟 N 個分頁、各截取同一本書的前 --pages 頁，回報整體頁/分鐘。
+需要可用的瀏覽器與 WebDriver；--url 可指向本機的閱讀器模擬頁面（benchmarks/fixture_server.py），不需登入。
+
+用法：
+    python benchmarks/bench_tabs.py --url http://127.0.0.1:8000/products/e/E050000001 --tabs 1 2 4 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.utils import load_config  # noqa: E402
+from src.crawler import BooksCrawler  # noqa: E402
+from src.tab_engine import TabCaptureEngine  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', required=True, help='電子書（或模擬閱讀器）網址')
+    parser.add_argument('--tabs', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--pages', type=int, default=20, help='每個分頁截取的頁數')
+    parser.add_argument('--delay', type=float, default=5, help='每頁最長等待秒數')
+    parser.add_argument('--headed', action='store_true', help='顯示瀏覽器畫面')
+    args = parser.parse_args()
+
+    config = dict(load_config(), headless=not args.headed, session_file="", page_turn_cache="", metrics_dir="")
+    crawler = BooksCrawler(config)
+    rows = []
+    try:
+        for tabs in args.tabs:
+            engine = TabCaptureEngine(crawler, concurrency=tabs)
+            cwd = Path.cwd()
+            # 輸出寫到暫存目錄，避免污染 output/
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                try:
+                    start = time.monotonic()
+                    results = engine.run([args.url] * tabs, args.pages, args.delay)
+                    elapsed = time.monotonic() - start
+                finally:
+                    os.chdir(cwd)
+                    engine.close()
+            pages = sum(r["captured"] for r in results)
+            rows.append((tabs, pages, elapsed, pages / elapsed * 60 if elapsed else 0))
+    finally:
+        crawler.close()
+
+    print(f"{'分頁數':>6} {'頁數':>6} {'耗時(s)':>9} {'頁/分鐘':>9}")
+    for tabs, pages, elapsed, rate in rows:
+        print(f"{tabs:>6} {pages:>6} {elapsed:>9.1f} {rate:>9.1f}")
+    print()
+    print("\n".join(crawler.metrics.format_table()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本機的博客來閱讀器模擬伺服器，供端對端效能測試使用，不需連線或登入真實網站。
+
+- `/`：首頁，含 login() 需要的彈窗關閉鈕、「會員登入」、帳號 / 密碼輸入框與登入按鈕；
+  登入後出現「登出」。
+- `/products/e/<書籍 ID>`：閱讀器頁面，含教學引導 (#UIObj-demo-next-btn)、
+  `iframe#epubjs-view-N`（內容為 body > div）、符合 NEXT_PAGE_XPATHS 的下一頁按鈕，
+  以及提供 currentLocation() / display() 的 window.rendition。
+
+可設定渲染延遲與故障注入（翻頁無效、iframe 被替換、渲染特別慢、閱讀器頁面 HTTP 503）。
+
+用法：
+    python benchmarks/fixture_server.py --port 8000 --pages 50 --latency 0.2
+"""
+
+import sys
+import json
+import random
+import argparse
+import threading
+from urllib.parse import urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HOME_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>博客來（模擬）</title>
+<style>
+  #top_banner { position: fixed; top: 0; left: 0; right: 0; padding: 12px; background: #fc0; }
+  #login_box { display: none; margin: 80px auto; width: 320px; }
+  #login_box input, #login_box button { display: block; width: 100%; margin: 8px 0; }
+</style></head>
+<body>
+<div id="top_banner">限時優惠 <button id="close_top_banner" onclick="this.parentNode.remove()">關閉</button></div>
+<div style="margin-top: 60px">
+  <span class="member_class_name" id="member" onclick="showLogin()">會員登入</span>
+</div>
+<form id="login_box" onsubmit="return doLogin()">
+  <input id="login_id_width01" name="login_id" type="text">
+  <input id="login_pswd" name="login_pswd" type="password">
+  <button id="show-captcha" type="submit">登入</button>
+</form>
+<script>
+  function renderMember() {
+    if (document.cookie.indexOf("fixture_session=ok") !== -1) {
+      document.getElementById("member").outerHTML = '<a href="/logout" id="logout">登出</a>';
+    }
+  }
+  function showLogin() { document.getElementById("login_box").style.display = "block"; }
+  function doLogin() {
+    if (!document.getElementById("login_id_width01").value) { return false; }
+    document.cookie = "fixture_session=ok; path=/; max-age=86400";
+    localStorage.setItem("fixture_login", String(Date.now()));
+    document.getElementById("login_box").style.display = "none";
+    renderMember();
+    return false;
+  }
+  renderMember();
+</script>
+</body></html>
+"""
+
+READER_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>閱讀器（模擬）</title>
+<style>
+  html, body { margin: 0; height: 100%%; background: #ddd; font-family: serif; }
+  #viewer { position: absolute; top: 48px; bottom: 48px; left: 80px; right: 80px; }
+  #viewer iframe { width: 100%%; height: 100%%; border: 0; background: #fff; }
+  #toolbar { position: absolute; bottom: 0; left: 0; right: 0; height: 48px; text-align: center; }
+  #tutorial { position: fixed; inset: 0; background: rgba(0, 0, 0, .6); color: #fff; z-index: 10; }
+  #tutorial .step { margin: 200px auto; width: 300px; text-align: center; }
+</style></head>
+<body>
+<div id="viewer"></div>
+<div id="toolbar">
+  <button class="prev" onclick="reader.turn(-1)">上一頁</button>
+  <span id="progress"></span>
+  <button class="next" onclick="reader.turn(1)">下一頁</button>
+</div>
+<div id="tutorial"><div class="step">
+  <p id="tutorial_text"></p>
+  <div id="UIObj-demo-next-btn" onclick="reader.tutorialNext()" style="cursor: pointer">下一步</div>
+</div></div>
+<script>
+var FIXTURE = %(config)s;
+var seed = FIXTURE.seed || 1;
+function rand() { seed = (seed * 16807) %% 2147483647; return seed / 2147483647; }
+
+var reader = {
+  page: 1,
+  viewCount: 0,
+  tutorialStep: 0,
+  frame: null,
+  newFrame: function () {
+    var viewer = document.getElementById("viewer");
+    if (this.frame) { this.frame.remove(); }
+    this.viewCount += 1;
+    var frame = document.createElement("iframe");
+    frame.id = "epubjs-view-" + this.viewCount;
+    viewer.appendChild(frame);
+    this.frame = frame;
+    frame.contentDocument.open();
+    frame.contentDocument.write('<!DOCTYPE html><html><head><meta charset="utf-8"><style>' +
+      'body { margin: 40px; font: 20px/1.8 serif; color: #111; }</style></head><body></body></html>');
+    frame.contentDocument.close();
+    return frame;
+  },
+  render: function () {
+    var page = this.page;
+    var latency = FIXTURE.latency + rand() * FIXTURE.jitter;
+    if (rand() < FIXTURE.slow_rate) { latency *= 5; }
+    if (!this.frame || rand() < FIXTURE.stale_rate) { this.newFrame(); }
+    var doc = this.frame.contentDocument;
+    doc.body.innerHTML = "";
+    document.getElementById("progress").textContent = page + " / " + FIXTURE.pages;
+    setTimeout(function () {
+      if (reader.page !== page) { return; }
+      var div = doc.createElement("div");
+      var lines = ["<h2>第 " + page + " 頁</h2>"];
+      for (var i = 0; i < 18; i++) {
+        lines.push("<p>第 " + page + " 頁第 " + (i + 1) + " 行：天地玄黃，宇宙洪荒，日月盈昃，辰宿列張。" +
+                   "寒來暑往，秋收冬藏。</p>");
+      }
+      div.innerHTML = lines.join("");
+      doc.body.appendChild(div);
+    }, latency * 1000);
+  },
+  turn: function (delta) {
+    if (delta > 0 && rand() < FIXTURE.drop_turn_rate) { return; }  // 模擬點擊未生效
+    var target = Math.max(1, Math.min(FIXTURE.pages, this.page + delta));
+    if (target === this.page) { return; }
+    this.page = target;
+    this.render();
+  },
+  tutorialNext: function () {
+    this.tutorialStep += 1;
+    if (this.tutorialStep >= FIXTURE.tutorial_steps) {
+      document.getElementById("tutorial").remove();
+    } else {
+      document.getElementById("tutorial_text").textContent = "教學 " + (this.tutorialStep + 1);
+    }
+  }
+};
+
+window.rendition = {
+  currentLocation: function () {
+    return {start: {
+      cfi: "epubcfi(/6/" + (reader.page * 2) + ")",
+      href: "page" + reader.page + ".xhtml",
+      percentage: (reader.page - 1) / FIXTURE.pages
+    }};
+  },
+  display: function (target) {
+    var page = null;
+    if (typeof target === "number") {
+      page = Math.floor(target * FIXTURE.pages) + 1;
+    } else {
+      var match = /epubcfi\\(\\/6\\/(\\d+)/.exec(target) || /page(\\d+)/.exec(target);
+      if (match) { page = target.indexOf("epubcfi") === 0 ? parseInt(match[1], 10) / 2 : parseInt(match[1], 10); }
+    }
+    if (!page) { return Promise.reject(new Error("unknown target")); }
+    reader.page = Math.max(1, Math.min(FIXTURE.pages, page));
+    reader.render();
+    return new Promise(function (resolve) { setTimeout(resolve, FIXTURE.latency * 1000); });
+  }
+};
+
+document.getElementById("tutorial_text").textContent = "教學 1";
+if (FIXTURE.tutorial_steps <= 0) { document.getElementById("tutorial").remove(); }
+reader.render();
+</script>
+</body></html>
+"""
+
+
+class ReaderFixture:
+    """
+    在背景執行緒中執行的模擬伺服器。
+
+    Args:
+        pages (int): 每本書的頁數。
+        latency (float): 翻頁後內容出現前的延遲秒數。
+        jitter (float): 額外的隨機延遲上限（秒）。
+        tutorial_steps (int): 教學引導需要點擊「下一步」的次數。
+        drop_turn_rate (float): 翻頁點擊被忽略的機率。
+        stale_rate (float): 翻頁時整個 iframe 被換成新元素的機率（舊元素參考失效）。
+        slow_rate (float): 該頁渲染延遲變成 5 倍的機率。
+        http_error_rate (float): 閱讀器頁面回應 HTTP 503 的機率。
+        seed (int): 故障注入的亂數種子，相同設定可重現相同的結果。
+    """
+
+    def __init__(self, pages=50, latency=0.2, jitter=0.0, tutorial_steps=3, drop_turn_rate=0.0,
+                 stale_rate=0.0, slow_rate=0.0, http_error_rate=0.0, seed=1, host="127.0.0.1", port=0):
+        self.options = {
+            "pages": pages,
+            "latency": latency,
+            "jitter": jitter,
+            "tutorial_steps": tutorial_steps,
+            "drop_turn_rate": drop_turn_rate,
+            "stale_rate": stale_rate,
+            "slow_rate": slow_rate,
+            "seed": seed,
+        }
+        self.http_error_rate = http_error_rate
+        self._random = random.Random(seed)
+        self.requests = 0
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fixture.requests += 1
+                path = urlparse(self.path).path
+                if path in ('/', '/index.html'):
+                    self._send(HOME_HTML)
+                elif path == '/logout':
+                    self.send_response(302)
+                    self.send_header('Set-Cookie', 'fixture_session=; path=/; max-age=0')
+                    self.send_header('Location', '/')
+                    self.end_headers()
+                elif path.startswith('/products/e/'):
+                    if fixture._random.random() < fixture.http_error_rate:
+                        self.send_error(503)
+                        return
+                    self._send(READER_HTML % {"config": json.dumps(fixture.options)})
+                else:
+                    self.send_error(404)
+
+            def _send(self, html):
+                body = html.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def book_url(self, book_id="E050000001"):
+        return f"{self.base_url}products/e/{book_id}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="reader-fixture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--drop-turn-rate', type=float, default=0.0)
+    parser.add_argument('--stale-rate', type=float, default=0.0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--http-error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    fixture = ReaderFixture(
+        pages=args.pages, latency=args.latency, jitter=args.jitter,
+        drop_turn_rate=args.drop_turn_rate, stale_rate=args.stale_rate,
+        slow_rate=args.slow_rate, http_error_rate=args.http_error_rate, port=args.port,
+    )
+    print(f"首頁: {fixture.base_url}")
+    print(f"書籍: {fixture.book_url()}")
+    try:
+        fixture._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fixture._server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,17 +7,15 @@ import os
 import sys
 import logging
 import platform
+import argparse
 from pathlib import Path
-from multiprocessing import Process
 from src.utils import setup_logging, load_config
 from src.crawler import BooksCrawler
-
-def run_crawler(config, book_url, total_pages, delay):
-    crawler = BooksCrawler(config)
-    # 子進程不做人工 CAPTCHA 驗證
-    crawler.login(auto_captcha=True)
-    crawler.navigate_to_book(book_url)
-    crawler.auto_capture_mode(total_pages, delay)
+from src.session_pool import DriverPool
+from src.tab_engine import TabCaptureEngine
+from src.chunked import ChunkedCapture
+from src.scheduler import JobQueue, RateLimiter, load_job_file
+from src.assembler import assemble_pdf
 
 def print_banner():
     print("\n" + "="*70)
@@ -28,33 +26,154 @@ def print_banner():
     print("="*70 + "\n")
     # ...existing code...
 
+def parse_pages(text):
+    """解析 "3,7-9" 形式的頁碼清單。"""
+    pages = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        try:
+            pages.update(range(int(first), int(last or first) + 1))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"無效的頁碼: {part}")
+    return sorted(pages)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="博客來電子書截圖工具")
+    parser.add_argument(
+        "--resume", metavar="OUTPUT_DIR",
+        help="依輸出目錄中的 manifest.json 從最後一張成功截圖的位置繼續",
+    )
+    parser.add_argument(
+        "--recapture", metavar="OUTPUT_DIR",
+        help="只重新截取輸出目錄中失敗的頁面（或 --pages 指定的頁面），每頁直接跳轉，不必從第 1 頁翻起",
+    )
+    parser.add_argument("--pages", type=parse_pages, help="搭配 --recapture 指定頁碼，例如 3,7-9")
+    parser.add_argument(
+        "--tabs", type=int, metavar="N",
+        help="多本書時改在同一個瀏覽器中以 N 個分頁同時截圖（取代多個瀏覽器）",
+    )
+    parser.add_argument(
+        "--jobs", metavar="FILE",
+        help="批次模式：從工作檔讀取書籍（每行 網址[,頁數[,優先順序]] 或 JSON），不需任何互動輸入",
+    )
+    parser.add_argument("--workers", type=int, help="批次模式同時使用的瀏覽器數量（預設為 pool_size）")
+    parser.add_argument(
+        "--chunks", type=int, metavar="N",
+        help="單本書時分成 N 段，以 N 個已登入的瀏覽器同時截圖後合併為一個輸出目錄",
+    )
+    parser.add_argument(
+        "--pdf", metavar="OUTPUT_DIR",
+        help="將輸出目錄中已截取的頁面組成 book.pdf（不需開啟瀏覽器）",
+    )
+    return parser.parse_args()
+
+def run_batch(args, config):
+    """批次模式：以有界的瀏覽器池處理工作檔中的書籍，失敗自動重試，佇列狀態可跨重啟保存。"""
+    jobs = JobQueue(
+        config.get("queue_state_file"),
+        max_attempts=config.get("job_max_attempts", 3),
+        backoff_base=config.get("job_retry_backoff", 30),
+    )
+    for entry in load_job_file(args.jobs):
+        jobs.add(entry["url"], entry.get("pages"), entry.get("priority", 0))
+    print(f"📋 工作佇列: {jobs.summary()}")
+
+    limiter = RateLimiter(config.get("max_requests_per_second", 2))
+    pool = DriverPool(config, size=args.workers, rate_limiter=limiter)
+    try:
+        # 無人值守：不等待手動 CAPTCHA，建議搭配 session_file 保存的登入狀態
+        try:
+            pool.start(auto_captcha=True)
+        except RuntimeError as e:
+            # 沒有有效的登入狀態時每本書都會失敗：直接停止，不消耗工作的重試次數
+            print(f"❌ {e}；請先以一般模式登入一次，讓 session_file 保存登入狀態。工作佇列未變更。")
+            return
+        pool.run_jobs(jobs, config.get("total_pages", 100), config.get("delay", 1))
+    finally:
+        pool.close()
+
+    print("\n" + "="*60)
+    for job in jobs.jobs:
+        mark = {"done": "✅", "failed": "❌"}.get(job["status"], "⏸️")
+        print(f"{mark} {job['url']} -> {job.get('output_dir') or job.get('last_error') or job['status']}")
+    print(f"📋 工作佇列: {jobs.summary()}")
+
 def main():
+    args = parse_args()
     setup_logging()
     config = load_config()
     print_banner()
+    if args.pdf:
+        print(f"📕 PDF: {assemble_pdf(args.pdf)}")
+        return
+    if args.jobs:
+        run_batch(args, config)
+        return
+
     # 先登入
     crawler = BooksCrawler(config)
     crawler.login(auto_captcha=False)
 
+    total_pages = config.get("total_pages", 100)
+    delay = config.get("delay", 1)
+    if args.resume:
+        try:
+            crawler.resume_capture(args.resume, total_pages, delay)
+        finally:
+            crawler.close()
+        return
+    if args.recapture:
+        try:
+            crawler.recapture_pages(args.recapture, args.pages, delay)
+        finally:
+            crawler.close()
+        return
+
     # 讓使用者輸入多本電子書網址
     urls_input = input("請輸入所有電子書網址（以逗號分隔）: ").strip()
     book_urls = [u.strip() for u in urls_input.split(",") if u.strip()]
     if not book_urls:
         print("未輸入任何網址，程式結束。")
         return
-    total_pages = config.get("total_pages", 100)
-    delay = config.get("delay", 1)
-    processes = []
-    # 主進程執行第一本書
-    crawler.navigate_to_book(book_urls[0])
-    crawler.auto_capture_mode(total_pages, delay)
-    # 其餘書籍平行處理
-    for url in book_urls[1:]:
-        p = Process(target=run_crawler, args=(config, url, total_pages, delay))
-        p.start()
-        processes.append(p)
-    for p in processes:
-        p.join()
+    if len(book_urls) == 1 and (args.chunks or 1) > 1:
+        ChunkedCapture(config, args.chunks).run(book_urls[0], total_pages, delay, primary=crawler)
+        return
+    if len(book_urls) == 1:
+        try:
+            crawler.navigate_to_book(book_urls[0])
+            crawler.auto_capture_mode(total_pages, delay)
+        finally:
+            crawler.close()
+        return
+
+    if args.tabs:
+        engine = TabCaptureEngine(crawler, concurrency=args.tabs)
+        try:
+            results = engine.run(book_urls, total_pages, delay)
+        finally:
+            engine.close()
+            crawler.close()
+        print("\n" + "="*60)
+        for result in results:
+            print(
+                f"📚 {result['url']} -> {result['output_dir']} "
+                f"(成功 {result['captured']} 頁，失敗 {len(result['failed'])} 頁)"
+            )
+        return
+
+    # 多本書：已登入的瀏覽器加入瀏覽器池，其餘瀏覽器沿用其登入狀態，從工作佇列依序取書
+    pool = DriverPool(config, size=min(config.get("pool_size", 2), len(book_urls)))
+    try:
+        pool.start(primary=crawler)
+        results = pool.run(book_urls, total_pages, delay)
+    finally:
+        pool.close()
+    print("\n" + "="*60)
+    for url, output_dir in results.items():
+        print(f"{'✅' if output_dir else '❌'} {url} -> {output_dir or '失敗'}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import zlib
+import struct
+import logging
+import zipfile
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+from src.manifest import BookManifest
+from src.stitcher import PNG_SIGNATURE
+from src.storage import open_store
+
+logger = logging.getLogger(__name__)
+
+ASSEMBLE_FORMATS = ("pdf", "cbz")
+
+
+def _png_image_data(data):
+    """
+    非交錯的 8 位元 RGB / 灰階或 1 位元灰階 PNG：其 IDAT 串流可直接以 FlateDecode + PNG predictor
+    嵌入 PDF，不必解碼再壓縮。
+
+    Returns:
+        tuple | None: (寬, 高, 色彩分量數, 位元數, 壓縮後的像素資料)；無法直接嵌入時返回 None。
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+    header = None
+    idat = []
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack('>I4s', data[pos:pos + 8])
+        if chunk_type == b'IHDR':
+            header = struct.unpack('>IIBBBBB', data[pos + 8:pos + 21])
+        elif chunk_type == b'IDAT':
+            idat.append(data[pos + 8:pos + 8 + length])
+        elif chunk_type == b'IEND':
+            break
+        pos += length + 12
+    if header is None or not idat:
+        return None
+    width, height, bits, color_type, _, _, interlace = header
+    if interlace or (color_type, bits) not in ((2, 8), (0, 8), (0, 1)):
+        return None
+    return width, height, 3 if color_type == 2 else 1, bits, b"".join(idat)
+
+
+class PdfWriter:
+    """
+    逐頁串流寫出的 PDF：每頁的影像一寫入就釋放，記憶體用量與頁數無關。
+
+    影像以 FlateDecode 無損壓縮（1 像素 = 1 pt），RGB / 灰階 PNG 與 JPEG 直接沿用原本的壓縮資料；
+    內容相同的頁面以 add_copy() 共用先前的影像物件。頁面樹與交叉參照表在 close() 時寫入。
+    """
+
+    def __init__(self, path, compress_level=6):
+        self.path = Path(path)
+        self.compress_level = compress_level
+        self._file = open(self.path, 'wb')
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        # 物件 1 為 Catalog、2 為 Pages，其餘依序配置
+        self._offsets = {}
+        self._next_id = 3
+        self._page_ids = []
+        self._page_objects = []
+
+    def _new_id(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._file.tell()
+        self._file.write(f"{obj_id} 0 obj\n".encode())
+        self._file.write(body)
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def add_page(self, image_bytes):
+        """加入一頁（PNG 或其他 Pillow 可讀取的影像位元組），返回頁面索引（從 0 起算）。"""
+        png = _png_image_data(image_bytes)
+        if png:
+            # RGB / 灰階 PNG 的壓縮資料直接沿用，只需宣告 PNG predictor
+            width, height, colors, bits, pixels = png
+            colorspace = b"/DeviceRGB" if colors == 3 else b"/DeviceGray"
+            image_filter = b"/FlateDecode /DecodeParms << /Predictor 15 /Colors %d /BitsPerComponent %d " \
+                           b"/Columns %d >>" % (colors, bits, width)
+        else:
+            bits = 8
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                width, height = img.size
+                if img.format == 'JPEG' and img.mode in ('RGB', 'L'):
+                    # JPEG 可直接嵌入 PDF，不必解碼再壓縮
+                    colorspace = b"/DeviceGray" if img.mode == 'L' else b"/DeviceRGB"
+                    pixels, image_filter = bytes(image_bytes), b"/DCTDecode"
+                else:
+                    if img.mode not in ('RGB', 'L'):
+                        img = img.convert('L' if img.mode == '1' else 'RGB')
+                    colorspace = b"/DeviceGray" if img.mode == 'L' else b"/DeviceRGB"
+                    pixels, image_filter = zlib.compress(img.tobytes(), self.compress_level), b"/FlateDecode"
+
+        image_id, content_id = self._new_id(), self._new_id()
+        self._write_object(
+            image_id,
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s "
+            b"/BitsPerComponent %d /Filter %s /Length %d >>"
+            % (width, height, colorspace, bits, image_filter, len(pixels)),
+            pixels,
+        )
+        content = b"q %d 0 0 %d 0 0 cm /Im0 Do Q" % (width, height)
+        self._write_object(content_id, b"<< /Length %d >>" % len(content), content)
+        return self._write_page(image_id, content_id, width, height)
+
+    def add_copy(self, index):
+        """再加入一次第 index 頁（共用影像與內容物件，不再寫入像素資料），返回新頁面的索引。"""
+        return self._write_page(*self._page_objects[index])
+
+    def _write_page(self, image_id, content_id, width, height):
+        page_id = self._new_id()
+        self._write_object(
+            page_id,
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+            % (width, height, image_id, content_id),
+        )
+        self._page_ids.append(page_id)
+        self._page_objects.append((image_id, content_id, width, height))
+        return len(self._page_ids) - 1
+
+    @property
+    def page_count(self):
+        return len(self._page_ids)
+
+    def close(self):
+        if self._file is None:
+            return
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self._page_ids)
+        self._write_object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_ids)))
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self._file.tell()
+        size = self._next_id
+        self._file.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for obj_id in range(1, size):
+            self._file.write(b"%010d 00000 n \n" % self._offsets[obj_id])
+        self._file.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset))
+        self._file.close()
+        self._file = None
+
+
+class CbzWriter:
+    """逐頁串流寫出的 CBZ（不壓縮的 ZIP）；頁面依加入順序命名為 0001.png、0002.png...。"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._zip = zipfile.ZipFile(self.path, 'w', zipfile.ZIP_STORED)
+        self._names = []
+
+    @property
+    def page_count(self):
+        return len(self._names)
+
+    def add_page(self, image_bytes, suffix=".png"):
+        """加入一頁，返回頁面索引（從 0 起算）。"""
+        name = f"{self.page_count + 1:04d}{suffix}"
+        self._zip.writestr(name, image_bytes)
+        self._names.append(name)
+        return len(self._names) - 1
+
+    def add_copy(self, index):
+        """再加入一次第 index 頁（從已寫入的 ZIP 讀回），返回新頁面的索引。"""
+        name = self._names[index]
+        return self.add_page(self._zip.read(name), Path(name).suffix)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+
+class BookAssembler:
+    """
+    截圖迴圈中逐頁組書：頁面一寫入就依頁碼順序附加到開啟中的 PDF / CBZ，close() 時寫入
+    交叉參照表（或 ZIP 目錄），最後一頁截完時整本書也已完成。
+
+    背景寫入器不一定依頁碼順序完成，尚未輪到的頁面暫存在重新排序緩衝區（受寫入佇列長度限制）。
+    與更早頁面內容相同的頁碼以 duplicate() 告知，輸出中重複引用該頁的影像；沒有輸出的頁碼
+    （截圖失敗、寫入失敗）須以 skip() 告知，之後的頁面才能繼續附加。
+    """
+
+    def __init__(self, path, fmt="pdf", start_page=1):
+        if fmt not in ASSEMBLE_FORMATS:
+            raise ValueError(f"未知的組書格式: {fmt}")
+        self.path = Path(path)
+        self.format = fmt
+        self._writer = PdfWriter(self.path) if fmt == "pdf" else CbzWriter(self.path)
+        self._next = start_page
+        self._pending = {}
+        self._indices = {}  # 頁碼 -> 該頁在輸出中的頁面索引，供重複頁引用
+        self._lock = threading.Lock()
+        self.page_count = 0
+
+    def add(self, page_num, written):
+        """加入一頁的輸出 [(path, data)]，可在背景寫入執行緒中呼叫。"""
+        with self._lock:
+            if self._writer is None or page_num < self._next:
+                return
+            self._pending[page_num] = written
+            self._drain()
+
+    def duplicate(self, page_num, of_page):
+        """此頁碼與較早的 of_page 內容相同：輸出中再放一次 of_page 的影像。"""
+        with self._lock:
+            if self._writer is None or page_num < self._next:
+                return
+            self._pending[page_num] = of_page
+            self._drain()
+
+    def skip(self, page_num):
+        """此頁碼沒有輸出。"""
+        with self._lock:
+            if self._writer is None or page_num < self._next:
+                return
+            self._pending.setdefault(page_num, [])
+            self._drain()
+
+    def _drain(self):
+        while self._next in self._pending:
+            self._flush_page(self._next, self._pending.pop(self._next))
+            self._next += 1
+
+    def _flush_page(self, page_num, written):
+        """written 為 [(path, data)]，或重複頁所引用的較早頁碼。"""
+        if isinstance(written, int):
+            indices = [self._copy(index) for index in self._indices.get(written, [])]
+        else:
+            indices = [self._append(path, data) for path, data in written]
+        self._indices[page_num] = [index for index in indices if index is not None]
+
+    def _append(self, path, data):
+        try:
+            if self.format == "pdf":
+                index = self._writer.add_page(data)
+            else:
+                index = self._writer.add_page(data, Path(path).suffix)
+            self.page_count += 1
+            return index
+        except Exception as e:
+            logger.warning(f"⚠️ 無法將 {Path(path).name} 加入 {self.path.name}: {e}")
+            return None
+
+    def _copy(self, index):
+        try:
+            index = self._writer.add_copy(index)
+            self.page_count += 1
+            return index
+        except Exception as e:
+            logger.warning(f"⚠️ 無法在 {self.path.name} 中重複引用頁面: {e}")
+            return None
+
+    def close(self):
+        """依頁碼順序寫入緩衝區中剩餘的頁面（略過缺少的頁碼）並完成檔案。"""
+        with self._lock:
+            if self._writer is None:
+                return
+            for page_num in sorted(self._pending):
+                self._flush_page(page_num, self._pending[page_num])
+            self._pending.clear()
+            self._indices.clear()
+            self._writer.close()
+            self._writer = None
+
+
+def book_page_names(output_dir):
+    """
+    依 manifest.json 的頁碼順序列出每頁的檔案名稱（失敗頁不列入）。
+    重複頁列出其 duplicate_of 頁面的檔案名稱，讓組成的書與原書頁數相同。
+    """
+    manifest = BookManifest(output_dir)
+    entries = manifest.data.get("pages", {})
+    names = []
+    for page in sorted(entries, key=int):
+        entry = entries[page]
+        if not entry.get("files") and entry.get("duplicate_of") is not None:
+            entry = entries.get(str(entry["duplicate_of"])) or {}
+        names.extend(entry.get("files", []))
+    return names
+
+
+def assemble_pdf(output_dir, pdf_path=None):
+    """
+    將一本書的頁面組成 PDF。頁面直接從頁面儲存讀取（容器格式以 mmap 隨機存取，不需解開）。
+
+    Returns:
+        Path: 輸出的 PDF 路徑，預設為 <output_dir>/book.pdf。
+    """
+    output_dir = Path(output_dir)
+    pdf_path = Path(pdf_path) if pdf_path else output_dir / "book.pdf"
+    store = open_store(output_dir, readonly=True)
+    try:
+        names = book_page_names(output_dir) if BookManifest.exists(output_dir) else store.names()
+        writer = PdfWriter(pdf_path)
+        added = {}  # 檔案名稱 -> 頁面索引；重複頁共用同一個影像物件
+        try:
+            for name in names:
+                if name in added:
+                    writer.add_copy(added[name])
+                    continue
+                if name not in store:
+                    logger.warning(f"⚠️ 頁面儲存中找不到 {name}，略過。")
+                    continue
+                added[name] = writer.add_page(store.get(name))
+        finally:
+            writer.close()
+    finally:
+        store.close()
+    logger.info(f"📕 已輸出 PDF: {pdf_path} ({writer.page_count} 頁)")
+    return pdf_path
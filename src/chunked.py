@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import shutil
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+
+from src.manifest import BookManifest
+from src.storage import open_store
+from src.assembler import BookAssembler
+from src.ocr import load_sidecar, save_sidecar
+from src.session_pool import DriverPool
+
+logger = logging.getLogger(__name__)
+
+CHUNKS_DIRNAME = "chunks"
+
+
+class ChunkedCapture:
+    """
+    將一本長篇書籍依閱讀進度切成數段，由多個已登入的瀏覽器（DriverPool）同時截圖。
+
+    每個瀏覽器開啟同一本書，以 seek() 跳到所屬段落的起點（0、1/N、2/N ...），
+    截圖到下一段的起點為止，頁面先寫入 <輸出目錄>/chunks/chunk_NN/。全部完成後由
+    merge_chunks() 依段落順序重新編號、合併到輸出目錄並合併 manifest。
+
+    段落的頁數事先無法得知（畫面頁數取決於版面），因此各段先以段內頁碼截圖，合併時才換算成全書頁碼；
+    段落交界處重疊的頁面以位置 (CFI) 或內容雜湊去除。
+    """
+
+    def __init__(self, config, chunks=4, rate_limiter=None):
+        self.config = config
+        self.chunks = max(1, chunks)
+        self.rate_limiter = rate_limiter
+
+    def _prepare(self, crawler, index, book_url, chunk_dir, delay):
+        """開啟書籍並跳到第 index 段的起點，返回起點位置；無法跳轉時返回 None。"""
+        crawler.navigate_to_book(book_url, output_dir=chunk_dir)
+        if not crawler.find_and_switch_to_ebook_iframe():
+            return None
+        location = crawler.seek(index / self.chunks)
+        if location is None:
+            return None
+        crawler.origin_location = location
+        crawler.wait_for_page_settle(delay)
+        return location
+
+    def run(self, book_url, total_pages=None, delay=5, primary=None, auto_captcha=False, output_dir=None):
+        """
+        分段截取一本書。
+
+        Args:
+            total_pages (int): 合併後全書的頁數上限（同時也是每段的頁數上限）。
+            primary (BooksCrawler): 已登入的瀏覽器；其餘瀏覽器沿用其登入狀態。
+
+        Returns:
+            dict | None: merge_chunks() 的摘要；沒有任何一段能開始截圖時返回 None。
+        """
+        output_dir = Path(output_dir or f"output/ebook_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        chunk_dirs = [output_dir / CHUNKS_DIRNAME / f"chunk_{i + 1:02d}" for i in range(self.chunks)]
+        pool = DriverPool(self.config, size=self.chunks, rate_limiter=self.rate_limiter)
+        try:
+            pool.start(primary=primary, auto_captcha=auto_captcha)
+            crawlers = [pooled.crawler for pooled in pool.drivers]
+            for crawler in crawlers:
+                crawler.assemble_format = None  # 各段不組書，合併後再組成整本
+            if len(crawlers) < self.chunks:
+                logger.warning(f"⚠️ 只有 {len(crawlers)} 個瀏覽器可用，改為分成 {len(crawlers)} 段。")
+                self.chunks = len(crawlers)
+
+            # 1. 所有瀏覽器同時開啟書籍並跳到各自的起點
+            starts = [None] * self.chunks
+            self._parallel(crawlers, lambda i, crawler: starts.__setitem__(
+                i, self._prepare(crawler, i, book_url, chunk_dirs[i], delay)
+            ))
+            active = []
+            for i, location in enumerate(starts):
+                if location is None:
+                    logger.warning(f"⚠️ 第 {i + 1} 段無法跳到起點，由前一段接續截圖。")
+                elif active and location.get('cfi') == starts[active[-1]].get('cfi'):
+                    logger.warning(f"⚠️ 第 {i + 1} 段的起點與前一段相同，略過。")
+                else:
+                    active.append(i)
+            if not active:
+                logger.error("❌ 沒有任何一段能開始截圖。")
+                return None
+
+            # 2. 每段截到下一段的起點為止；最後一段截到書末
+            print(f"🧩 分成 {len(active)} 段同時截圖: {output_dir}")
+            stops = {i: starts[j] for i, j in zip(active, active[1:])}
+            self._parallel(crawlers, lambda i, crawler: i in active and crawler.auto_capture_mode(
+                total_pages, delay, stop_at=stops.get(i)
+            ))
+        finally:
+            pool.close()
+
+        return merge_chunks(
+            output_dir, [chunk_dirs[i] for i in active], book_url,
+            backend=self.config.get('output_backend', 'loose'),
+            assemble_format=self.config.get('assemble_format') or None,
+            total_pages=total_pages,
+        )
+
+    def _parallel(self, crawlers, fn):
+        def run(index, crawler):
+            try:
+                fn(index, crawler)
+            except Exception as e:
+                logger.error(f"❌ 第 {index + 1} 段發生錯誤: {e}", exc_info=True)
+
+        threads = [
+            threading.Thread(target=run, args=(i, crawler), name=f"chunk-{i + 1}")
+            for i, crawler in enumerate(crawlers[:self.chunks])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+
+def _chunk_pages(manifest):
+    """段落 manifest 中的所有頁碼（含失敗頁），依頁碼排序。"""
+    pages = set(int(page) for page in manifest.data.get("pages", {}))
+    pages.update(manifest.failed_pages())
+    return sorted(pages)
+
+
+def _overlap(manifest, pages, next_manifest):
+    """段落結尾與下一段開頭重疊（位置或內容相同）的頁數。"""
+    next_pages = _chunk_pages(next_manifest)
+    if not next_pages:
+        return 0
+    next_entries = [next_manifest.data["pages"].get(str(page)) or {} for page in next_pages]
+    next_cfis = {(entry.get("location") or {}).get("cfi") for entry in next_entries} - {None}
+    first_digests = next_entries[0].get("sha256")
+    overlap = 0
+    for page in reversed(pages):
+        entry = manifest.data["pages"].get(str(page)) or {}
+        cfi = (entry.get("location") or {}).get("cfi")
+        if (cfi and cfi in next_cfis) or (first_digests and entry.get("sha256") == first_digests):
+            overlap += 1
+        else:
+            break
+    return overlap
+
+
+def merge_chunks(output_dir, chunk_dirs, book_url=None, backend="loose", assemble_format=None, total_pages=None):
+    """
+    依段落順序合併分段截圖的輸出：頁面重新編號為全書頁碼、寫入 output_dir 的頁面儲存，
+    並合併 manifest（位置、雜湊、重複頁、失敗頁）。全部成功後刪除 chunks/ 目錄。
+
+    Returns:
+        dict: {"output_dir", "successful", "failed_pages", "duplicate_pages", "chunks"}
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifests = [BookManifest(chunk_dir) for chunk_dir in chunk_dirs]
+    merged = BookManifest(output_dir, book_url or (manifests[0].book_url if manifests else None))
+    store = open_store(output_dir, backend)
+    assembler = BookAssembler(output_dir / f"book.{assemble_format}", assemble_format) if assemble_format else None
+    summary = {"output_dir": str(output_dir), "successful": 0, "failed_pages": [], "duplicate_pages": [], "chunks": []}
+    page_num = 0
+    complete = True
+
+    try:
+        for index, (chunk_dir, manifest) in enumerate(zip(chunk_dirs, manifests)):
+            pages = _chunk_pages(manifest)
+            if index + 1 < len(manifests):
+                overlap = _overlap(manifest, pages, manifests[index + 1])
+                if overlap:
+                    logger.info(f"✂️ 第 {index + 1} 段結尾有 {overlap} 頁與下一段重疊，略過。")
+                    pages = pages[:-overlap]
+            summary["chunks"].append({"dir": str(chunk_dir), "first_page": page_num + 1, "pages": len(pages)})
+            chunk_store = open_store(chunk_dir, backend, readonly=True)
+            renumbered = {}
+            try:
+                for old in pages:
+                    if total_pages is not None and page_num >= total_pages:
+                        break
+                    page_num += 1
+                    renumbered[old] = page_num
+                    entry = manifest.data["pages"].get(str(old)) or {}
+                    if entry.get("location"):
+                        merged.record_location(page_num, entry["location"])
+                    if entry.get("files"):
+                        written = []
+                        for name in entry["files"]:
+                            new_name = f"page_{page_num:04d}" + name[len(f"page_{old:04d}"):]
+                            data = chunk_store.get(name)
+                            store.put(output_dir / new_name, data)
+                            written.append((output_dir / new_name, data))
+                            ocr = load_sidecar(name, chunk_store)
+                            if ocr is not None:
+                                save_sidecar(output_dir / new_name, ocr, store)
+                        merged.record_page(page_num, written)
+                        summary["successful"] += 1
+                        if assembler:
+                            assembler.add(page_num, written)
+                        continue
+                    if entry.get("duplicate_of") in renumbered:
+                        merged.record_duplicate(page_num, renumbered[entry["duplicate_of"]])
+                        summary["successful"] += 1
+                        summary["duplicate_pages"].append(page_num)
+                        if assembler:
+                            assembler.duplicate(page_num, renumbered[entry["duplicate_of"]])
+                    else:
+                        if assembler:
+                            assembler.skip(page_num)
+                        reason = manifest.data["failures"].get(str(old), "capture failed")
+                        merged.record_failure(page_num, f"第 {index + 1} 段第 {old} 頁: {reason}")
+                        summary["failed_pages"].append(page_num)
+            except Exception as e:
+                logger.error(f"❌ 合併第 {index + 1} 段失敗: {e}", exc_info=True)
+                complete = False
+            finally:
+                chunk_store.close()
+    finally:
+        store.close()
+        merged.flush()
+        if assembler:
+            assembler.close()
+
+    if complete:
+        shutil.rmtree(output_dir / CHUNKS_DIRNAME, ignore_errors=True)
+    else:
+        logger.warning(f"⚠️ 合併未完成，保留分段輸出: {output_dir / CHUNKS_DIRNAME}")
+    print(
+        f"🧩 已合併 {len(summary['chunks'])} 段: 成功 {summary['successful']} 頁，"
+        f"失敗 {len(summary['failed_pages'])} 頁 -> {output_dir}"
+    )
+    return summary
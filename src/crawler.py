@@ -3,15 +3,22 @@
 
 import os
 import time
+import hashlib
 import threading
 import logging
 import platform
 from pathlib import Path
+from urllib.parse import urlparse
 from datetime import datetime
-from PIL import Image # 新增 Image 模組
 
 from selenium import webdriver
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import (
+    TimeoutException,
+    StaleElementReferenceException,
+    NoSuchFrameException,
+    SessionNotCreatedException,
+    WebDriverException,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.action_chains import ActionChains
@@ -21,27 +28,185 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 
+from src.scripts import (
+    EBOOK_IFRAME_SELECTOR,
+    VISIBLE_EBOOK_VIEWS_JS,
+    DISPLAY_LOCATION_JS,
+    EXPORT_LOCAL_STORAGE_JS,
+    RESTORE_LOCAL_STORAGE_JS,
+    IS_LOGGED_IN_JS,
+    READER_HELPER_JS,
+    READER_STATE_JS,
+    READER_PROBE_JS,
+    READER_STEP_JS,
+    SEEK_LOCATION_JS,
+    WAIT_FOR_ANY_JS,
+)
+from src.utils import load_json_file, save_json_file
+from src.driver_setup import (
+    DEFAULT_BLOCKED_URLS,
+    BrowserProfile,
+    apply_url_blocklist,
+    close_service_log,
+    forget_driver_path,
+    resolve_driver_path,
+)
+from src.writer import ScreenshotWriter, spread_part_paths, write_page
+from src.stitcher import FullPageStitcher
+from src.manifest import BookManifest
+from src.fingerprint import page_fingerprint, is_same_page
+from src.session_store import load_session, save_session, session_secret
+from src.ocr import OcrStage
+from src.storage import open_store
+from src.encoder import PageEncoder, encode_options, needs_encoding
+from src.assembler import BookAssembler
+from src.metrics import Metrics, timed
+from src.watchdog import DriverWatchdog
+from src.procstat import process_tree_rss
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.WARNING)
 
+BASE_URL = "https://www.books.com.tw/"
+
+# 下一頁按鈕的候選 XPath（依優先順序）
+NEXT_PAGE_XPATHS = [
+    "//button[contains(@class, 'next')]",
+    "//button[contains(@class, 'right')]",
+    "//div[contains(@class, 'viewer-right')]",
+    "//a[contains(@class, 'next')]",
+    "//*[@aria-label='Next page']",
+    "//*[@id='next-page']"
+]
+
+
+# 登入流程每一步等待元素出現的最長秒數
+LOGIN_STEP_TIMEOUT = 5
+# 翻頁按鈕暫時不可點擊時，等待它出現的最長秒數
+NEXT_BUTTON_WAIT = 2
+
+# 教學引導按鈕的快速檢查（一次 find_elements，不等待）
+TUTORIAL_QUICK_SELECTOR = "#UIObj-demo-next-btn, .tutorial-next-button, div[class*='-next-btn']"
+
 
 class BooksCrawler:
-    def __init__(self, config):
+    def __init__(self, config, driver=None, metrics=None):
+        """
+        Args:
+            config (dict): load_config() 的設定。
+            driver (WebDriver): 共用既有的瀏覽器（例如多分頁模式）；未提供時啟動新的瀏覽器。
+            metrics (Metrics): 共用的效能指標（瀏覽器池、多分頁）；未提供時建立本次執行專屬的指標。
+        """
         self.config = config
         self.email = self.config.get('email')  # 修改為 email
         self.password = self.config.get('password')
         self.headless = self.config.get('headless', False)
+        # 網站首頁；效能測試時可指向本機的閱讀器模擬伺服器 (benchmarks/fixture_server.py)
+        self.base_url = self.config.get('base_url') or BASE_URL
         self.driver = None
         self.wait = None
         self.output_dir = None
+        self.book_url = None
+        self.manifest = None
+        # 頁面儲存："loose" 每頁一個 PNG；"cbz" / "pack" 每本書一個容器（見 src.storage）
+        self.output_backend = self.config.get('output_backend', 'loose')
+        self.store = None
         self.main_iframe = None
         self.full_page_screenshot = self.config.get('full_page_screenshot', False)
-        self.setup_driver()
+        # 截圖後的編碼階段（灰階 / 1-bit / 調色盤、WebP / JPEG、裁邊），預設保留原始 PNG
+        self.encode_options = encode_options(self.config)
+        self.encoder = None
+        # 翻頁後的等待方式："adaptive" 偵測渲染穩定即截圖，"fixed" 固定等待 delay 秒
+        self.settle_mode = self.config.get('settle_mode', 'adaptive')
+        self.settle_quiet_ms = self.config.get('settle_quiet_ms', 150)
+        self.settle_pixel_check = self.config.get('settle_pixel_check', True)
+        self.settle_times = []
+        # 閱讀器狀態快取：教學引導只需處理一次，iframe 元素與目前所在的 frame 也不必每頁重新尋找
+        self._tutorial_handled = False
+        self._ebook_iframe = None
+        self._frame_context = None  # 'default'、'ebook' 或 None (未知)
+        # 閱讀器輔助物件 (READER_HELPER_JS) 最近回報的 {ready, location, geometry}，翻頁後即失效；
+        # 以及翻頁後像素比對的最後一張截圖，可直接作為該頁的視窗截圖
+        self._reader_state = None
+        self._settled_png = None
+        self._script_timeout = None
+        # 已確認可用的翻頁按鈕 XPath，同一種閱讀器版面只需探測一次
+        self._page_turn_strategy = None
+        self._book_domain = None
+        # 截圖改由背景執行緒寫入磁碟，瀏覽器可立即翻到下一頁
+        self.async_write = self.config.get('async_write', True)
+        self.writer = None
+        # 可選的 OCR 階段：頁面寫入後在行程池中產生文字層 (page_NNNN.ocr.json)
+        self.ocr_enabled = self.config.get('ocr_enabled', False)
+        self.ocr = None
+        # 邊截圖邊組書："pdf" / "cbz" 時頁面寫入後立即附加到 <輸出目錄>/book.<格式>（見 BookAssembler）
+        self.assemble_format = self.config.get('assemble_format') or None
+        self.assembler = None
+        # "window" 截取整個視窗；"element" 只截取 epub.js 頁面 iframe，跨頁時拆成兩頁
+        self.capture_mode = self.config.get('capture_mode', 'window')
+        self.spread_aspect_ratio = self.config.get('spread_aspect_ratio', 1.2)
+        # 重複頁偵測：畫面未變化時重試翻頁，連續多次相同則視為書末；與先前頁面相同者不重複寫入
+        self.dedupe_pages = self.config.get('dedupe_pages', True)
+        self.duplicate_tolerance = self.config.get('duplicate_tolerance', 2.0)
+        self.duplicate_end_threshold = self.config.get('duplicate_end_threshold', 3)
+        self._previous_capture = None  # (頁碼, PageFingerprint, 位置 CFI)
+        self._seen_digests = {}
+        self._last_capture_status = None  # None、'unchanged' 或 'duplicate'
+        self._last_capture_ref = None
+        # 全域請求速率上限（scheduler.RateLimiter），由排程器或瀏覽器池設定
+        self.rate_limiter = None
+        # 各階段耗時（見 src.metrics）；自行建立的指標在 close() 時寫出
+        self._owns_metrics = metrics is None
+        self.metrics = metrics or Metrics.for_run(self.config)
+        # 快速啟動：持久化的瀏覽器設定檔與第三方請求封鎖清單（見 src.driver_setup）
+        self.profile = None
+        self.blocked_urls = list(self.config.get('blocked_url_patterns') or [])
+        if self.config.get('block_trackers', False):
+            self.blocked_urls = DEFAULT_BLOCKED_URLS + self.blocked_urls
+        self._owns_driver = driver is None
+        # 自行啟動瀏覽器時，記錄從建立到第一張截圖的冷啟動耗時 ("cold_start")
+        self._created_at = time.monotonic() if driver is None else None
+        # 瀏覽器健康監看：指令卡住、崩潰或記憶體膨脹時，在下一次截圖前重新啟動瀏覽器並回到原頁（見 src.watchdog）
+        self.watchdog = None
+        if driver is None and self.config.get('watchdog_enabled', True):
+            self.watchdog = DriverWatchdog(
+                self.metrics,
+                interval=self.config.get('watchdog_interval', 5),
+                hang_timeout=self.config.get('watchdog_hang_timeout', 90),
+                max_rss_mb=self.config.get('watchdog_max_rss_mb', 0),
+            )
+        self.max_restarts = self.config.get('watchdog_max_restarts', 3)
+        self.restarts = []  # [{"page", "reason"}]
+        self._session_state = None  # 最近一次登入 / 還原的狀態，重新啟動瀏覽器時沿用
+        self._capture_delay = 5
+        # 第 1 頁在閱讀器中的位置；分段截圖時為段落起點而非書籍開頭，重新啟動後由此回到原頁
+        self.origin_location = None
+        # 閱讀器是否確定停在剛載入的位置（書籍開頭），翻頁或跳轉後即不確定
+        self._at_book_start = False
+        # 記憶體上限：每 memory_check_pages 頁量測瀏覽器行程樹的 RSS，超過 memory_reload_mb 時在原位置
+        # 重新載入閱讀器，重新載入後仍超過或超過 memory_recycle_mb 時重新啟動瀏覽器
+        self.memory_check_pages = self.config.get('memory_check_pages', 20)
+        self.memory_reload_mb = self.config.get('memory_reload_mb', 0)
+        self.memory_recycle_mb = self.config.get('memory_recycle_mb', 0)
+        self.memory_reloads = 0
+        self._memory_reloaded = False
+        if driver is None:
+            try:
+                self.setup_driver()
+            except Exception:
+                if self.watchdog:
+                    self.watchdog.close()
+                raise
+        else:
+            self.driver = driver
+            self.wait = WebDriverWait(self.driver, 5)
 
+    @timed("setup_driver")
     def setup_driver(self):
         """根據設定檔動態設定 WebDriver"""
         browser = self.config.get('browser', 'firefox').lower()
         logger.info(f"使用 {browser.capitalize()} WebDriver")
+        stopwatch = self.metrics.stopwatch("setup_driver")
 
         try:
             if browser == 'chrome':
@@ -65,8 +230,7 @@ class BooksCrawler:
                 })
                 if self.headless:
                     options.add_argument('--headless')
-                service = ChromeService()
-                self.driver = webdriver.Chrome(service=service, options=options)
+                service_cls, service_kwargs, launcher = ChromeService, {}, webdriver.Chrome
 
             elif browser == 'edge':
                 options = webdriver.EdgeOptions()
@@ -79,23 +243,13 @@ class BooksCrawler:
                 options.add_argument('--disable-notifications')
                 options.add_argument('--disable-blink-features=AutomationControlled')
                 options.add_argument('--disable-animations')
-                options.add_argument('--remote-debugging-port=9222')
+                # 同時啟動多個瀏覽器時（DriverPool）需設為 0，由系統分配可用的埠
+                options.add_argument(
+                    f"--remote-debugging-port={self.config.get('remote_debugging_port', 9222)}"
+                )
                 if self.headless:
                     options.add_argument('--headless')
-                webdriver_path = self.config.get('webdriver_path')
-                # 檢查使用者是否在 config.json 中手動指定了 WebDriver 的路徑。
-                # 這是為了解決 Selenium Manager 在某些網路環境（例如有特殊 DNS 設定或防火牆）
-                # 下自動下載 WebDriver 失敗的問題。
-                # 如果提供了有效的路徑，則使用該路徑來初始化 WebDriver 服務。
-                if webdriver_path and os.path.exists(webdriver_path):
-                    logger.info(f"使用指定的 WebDriver: {webdriver_path}")
-                    service = EdgeService(executable_path=webdriver_path)
-                else:
-                    # 如果未提供路徑或路徑無效，則退回使用 Selenium Manager 的預設行為，
-                    # 它會嘗試自動下載並管理 WebDriver。
-                    logger.info("未指定或找不到 WebDriver 路徑，將使用 Selenium Manager。")
-                    service = EdgeService()
-                self.driver = webdriver.Edge(service=service, options=options)
+                service_cls, service_kwargs, launcher = EdgeService, {}, webdriver.Edge
 
             else:  # Default to firefox
                 options = webdriver.FirefoxOptions()
@@ -114,15 +268,49 @@ class BooksCrawler:
                 # Firefox 優化設定
                 options.set_preference("dom.webdriver.enabled", False)
                 options.set_preference('useAutomationExtension', False)
-                service = FirefoxService(log_output='geckodriver.log')
-                self.driver = webdriver.Firefox(service=service, options=options)
+                if self.config.get('block_trackers', False):
+                    # Firefox 不支援 CDP 的 Network.setBlockedURLs，改用內建的追蹤保護
+                    options.set_preference('privacy.trackingprotection.enabled', True)
+                    options.set_preference('privacy.trackingprotection.socialtracking.enabled', True)
+                    options.set_preference('privacy.trackingprotection.cryptomining.enabled', True)
+                service_cls, service_kwargs, launcher = (
+                    FirefoxService, {'log_output': 'geckodriver.log'}, webdriver.Firefox
+                )
+
+            self._use_browser_profile(browser, options)
+            stopwatch.lap("options")
+
+            driver_path = self._resolve_driver_path(browser, service_cls, service_kwargs, options)
+            stopwatch.lap("resolve_driver")
+            cache_file = self.config.get('driver_cache_file')
+            try:
+                self.driver = self._launch(
+                    launcher, service_cls(executable_path=driver_path, **service_kwargs), options
+                )
+            except SessionNotCreatedException:
+                if not cache_file or driver_path == self.config.get('webdriver_path'):
+                    raise
+                # 快取的 WebDriver 可能與更新後的瀏覽器版本不符：清除快取、重新解析後再試一次
+                logger.warning("⚠️ 以快取的 WebDriver 啟動失敗，重新解析後再試一次。")
+                forget_driver_path(browser, cache_file)
+                driver_path = self._resolve_driver_path(browser, service_cls, service_kwargs, options)
+                self.driver = self._launch(
+                    launcher, service_cls(executable_path=driver_path, **service_kwargs), options
+                )
+            stopwatch.lap("launch")
+            if self.watchdog:
+                self.watchdog.attach(self.driver)
 
+            if apply_url_blocklist(self.driver, self.blocked_urls):
+                logger.info(f"🚫 已封鎖 {len(self.blocked_urls)} 種第三方請求")
             self.wait = WebDriverWait(self.driver, 5)
             self.driver.set_page_load_timeout(60)
 
             logger.info(f"✅ {browser.capitalize()} WebDriver 啟動成功")
 
         except Exception as e:
+            if self.profile:
+                self.profile.release()
             logger.error(f"❌ {browser.capitalize()} WebDriver 啟動失敗: {e}")
             if "Could not reach host" in str(e):
                 logger.error("="*60)
@@ -131,36 +319,97 @@ class BooksCrawler:
                 logger.error("="*60)
             raise
 
+    def _use_browser_profile(self, browser, options):
+        """
+        使用持久化的設定檔目錄 (browser_profile_dir/<瀏覽器>)，保留快取、cookies 與閱讀器的教學已讀狀態。
+        """
+        base_dir = self.config.get('browser_profile_dir')
+        if not base_dir:
+            return
+        self.profile = BrowserProfile(Path(base_dir) / browser)
+        path = self.profile.acquire()
+        if path is None:
+            return
+        if browser == 'firefox':
+            options.add_argument('-profile')
+            options.add_argument(str(path))
+        else:
+            options.add_argument(f'--user-data-dir={path}')
+        logger.info(f"🗂️ 使用瀏覽器設定檔: {path}")
+
+    def _resolve_driver_path(self, browser, service_cls, service_kwargs, options):
+        """
+        決定 WebDriver 執行檔路徑。Selenium Manager 的解析結果寫入 driver_cache_file，
+        之後的啟動直接使用，不必再執行 Selenium Manager。
+        """
+        if browser == 'edge':
+            webdriver_path = self.config.get('webdriver_path')
+            # 檢查使用者是否在 config.json 中手動指定了 WebDriver 的路徑。
+            # 這是為了解決 Selenium Manager 在某些網路環境（例如有特殊 DNS 設定或防火牆）
+            # 下自動下載 WebDriver 失敗的問題。
+            # 如果提供了有效的路徑，則使用該路徑來初始化 WebDriver 服務。
+            if webdriver_path and os.path.exists(webdriver_path):
+                logger.info(f"使用指定的 WebDriver: {webdriver_path}")
+                return webdriver_path
+            # 如果未提供路徑或路徑無效，則退回使用 Selenium Manager 的預設行為，
+            # 它會嘗試自動下載並管理 WebDriver。
+            logger.info("未指定或找不到 WebDriver 路徑，將使用 Selenium Manager。")
+        # 此 Service 只供 Selenium Manager 解析路徑、不會啟動，但建立時已開啟日誌檔；
+        # 解析後即關閉，否則每次啟動（含 restart_browser）都會遺留一個檔案代碼
+        service = service_cls(**service_kwargs)
+        try:
+            return resolve_driver_path(browser, service, options, self.config.get('driver_cache_file'))
+        finally:
+            close_service_log(service)
+
+    @staticmethod
+    def _launch(launcher, service, options):
+        """以 service 啟動瀏覽器；建立 session 失敗時結束已啟動的 WebDriver 行程並關閉其日誌檔。"""
+        try:
+            return launcher(service=service, options=options)
+        except Exception:
+            if getattr(service, 'process', None) is not None:
+                try:
+                    service.stop()
+                except Exception as e:
+                    logger.debug(f"結束啟動失敗的 WebDriver 時出錯: {e}")
+            close_service_log(service)
+            raise
+
     def login(self, auto_captcha=False):
         """
         執行一個線性的、無條件的登入流程。
         該流程會自動點擊登入、填寫帳號密碼，然後暫停，等待使用者手動處理 CAPTCHA。
         """
+        with self.metrics.span("login.restore_session"):
+            restored = self.restore_saved_session()
+        if restored:
+            return True
+
         logger.info("🚀 開始執行線性登入流程...")
-        self.driver.get("https://www.books.com.tw/")
+        laps = self.metrics.stopwatch("login")
+        self._throttle()
+        self.driver.get(self.base_url)
+        laps.lap("load_home")
 
         try:
-            # 步驟 0：處理彈出式視窗
-            try:
-                logger.info("步驟 0/5：檢查彈出式視窗...")
-                close_selectors = [
-                    (By.ID, "close_top_banner"),
-                    (By.CSS_SELECTOR, "button.close"),
-                    (By.XPATH, "//button[contains(text(), '關閉')]")
-                ]
-                for by, value in close_selectors:
-                    try:
-                        close_button = WebDriverWait(self.driver, 2).until(
-                            EC.element_to_be_clickable((by, value))
-                        )
-                        close_button.click()
-                        logger.info(f"✅ 步驟 0/5：偵測到並關閉彈窗 ({by}, {value})。")
-                        break
-                    except Exception:
-                        continue
-            except Exception:
+            # 步驟 0：處理彈出式視窗（可選；所有候選同時等待，沒有彈窗時最多只花 2 秒）
+            logger.info("步驟 0/5：檢查彈出式視窗...")
+            close_selectors = [
+                (By.ID, "close_top_banner"),
+                (By.CSS_SELECTOR, "button.close"),
+                (By.XPATH, "//button[contains(text(), '關閉')]")
+            ]
+            index, close_button = self.wait_for_any(close_selectors, 2)
+            if close_button:
+                close_button.click()
+                by, value = close_selectors[index]
+                logger.info(f"✅ 步驟 0/5：偵測到並關閉彈窗 ({by}, {value})。")
+            else:
                 logger.info("ℹ️ 步驟 0/5：未偵測到彈出式視窗，繼續執行。")
 
+            laps.lap("close_popup")
+
             # 步驟一：點擊「會員登入」
             logger.info("步驟 1/5：等待『會員登入』按鈕...")
             login_selectors = [
@@ -168,43 +417,35 @@ class BooksCrawler:
                 (By.LINK_TEXT, "會員登入"),
                 (By.XPATH, "//span[contains(text(), '會員登入')]")
             ]
-            login_link = None
-            for by, value in login_selectors:
-                try:
-                    login_link = self.driver.find_element(by, value)
-                    login_link.click()
-                    break
-                except Exception:
-                    continue
+            _, login_link = self.wait_for_any(login_selectors, LOGIN_STEP_TIMEOUT)
             if not login_link:
                 logger.error("❌ 找不到『會員登入』按鈕。")
                 self._save_diagnostic_snapshot("login_no_login_button")
                 return False
+            login_link.click()
+
+            laps.lap("open_form")
 
             # 步驟二：填寫帳號
             logger.info("步驟 2/5：等待帳號輸入框...")
+            email_value = self.email or self.config.get("email")
+            if not email_value:
+                logger.error("❌ 未設定 email，請檢查 config.json。")
+                return False
             username_selectors = [
                 (By.ID, "login_id_width01"),
                 (By.NAME, "login_id"),
                 (By.CSS_SELECTOR, "input[type='text']")
             ]
-            username_input = None
-            for by, value in username_selectors:
-                try:
-                    username_input = self.driver.find_element(by, value)
-                    username_input.clear()
-                    email_value = self.email or self.config.get("email")
-                    if not email_value:
-                        logger.error("❌ 未設定 email，請檢查 config.json。")
-                        return False
-                    username_input.send_keys(email_value)
-                    break
-                except Exception:
-                    continue
+            _, username_input = self.wait_for_any(username_selectors, LOGIN_STEP_TIMEOUT)
             if not username_input:
                 logger.error("❌ 找不到帳號輸入框。")
                 self._save_diagnostic_snapshot("login_no_username_input")
                 return False
+            username_input.clear()
+            username_input.send_keys(email_value)
+
+            laps.lap("username")
 
             # 步驟三：填寫密碼
             logger.info("步驟 3/5：等待密碼輸入框...")
@@ -213,19 +454,15 @@ class BooksCrawler:
                 (By.NAME, "login_pswd"),
                 (By.CSS_SELECTOR, "input[type='password']")
             ]
-            password_input = None
-            for by, value in password_selectors:
-                try:
-                    password_input = self.driver.find_element(by, value)
-                    password_input.clear()
-                    password_input.send_keys(self.config["password"])
-                    break
-                except Exception:
-                    continue
+            _, password_input = self.wait_for_any(password_selectors, LOGIN_STEP_TIMEOUT)
             if not password_input:
                 logger.error("❌ 找不到密碼輸入框。")
                 self._save_diagnostic_snapshot("login_no_password_input")
                 return False
+            password_input.clear()
+            password_input.send_keys(self.config["password"])
+
+            laps.lap("password")
 
             # 步驟四：點擊「登入」按鈕以觸發 CAPTCHA
             logger.info("步驟 4/5：等待『登入』按鈕...")
@@ -235,18 +472,14 @@ class BooksCrawler:
                 (By.CSS_SELECTOR, "button[type='submit']"),
                 (By.XPATH, "//button[contains(text(), '登入')]")
             ]
-            login_button = None
-            for by, value in login_btn_selectors:
-                try:
-                    login_button = self.driver.find_element(by, value)
-                    login_button.click()
-                    break
-                except Exception:
-                    continue
+            _, login_button = self.wait_for_any(login_btn_selectors, LOGIN_STEP_TIMEOUT)
             if not login_button:
                 logger.error("❌ 找不到『登入』按鈕。")
                 self._save_diagnostic_snapshot("login_no_login_btn")
                 return False
+            login_button.click()
+
+            laps.lap("submit")
 
             # 步驟五：人工確認 CAPTCHA 驗證（僅主進程）
             if not auto_captcha:
@@ -256,6 +489,16 @@ class BooksCrawler:
                 print("="*60)
                 input() # 等待使用者按 Enter
                 logger.info("🎉 使用者已確認完成手動驗證，繼續執行。")
+            laps.lap("captcha")
+            if self.is_logged_in():
+                self._session_state = self.export_session_state()
+                self.save_session(self._session_state)
+            elif auto_captcha:
+                # 無人值守時沒有人完成驗證，登入狀態必須實際確認
+                logger.error("❌ 送出登入後仍未登入（可能需要手動完成 CAPTCHA）。")
+                self._save_diagnostic_snapshot("login_not_logged_in")
+                return False
+            laps.lap("save_session")
             return True
 
         except TimeoutException as e:
@@ -267,133 +510,154 @@ class BooksCrawler:
             self._save_diagnostic_snapshot("login_generic_failure")
             return False
 
+    def wait_for_any(self, locators, timeout, interactable=True):
+        """
+        同時等待多個定位器，返回最先出現的可用元素。
+
+        所有候選在同一次 execute_async_script 中競速（MutationObserver，見 WAIT_FOR_ANY_JS），
+        最壞情況只等 timeout 秒，而不是每個候選各等一次；同一時間有多個候選符合時以清單中較前面的為準。
+
+        Args:
+            locators (list): [(By, value), ...]，依優先順序。
+            timeout (float): 最長等待秒數。
+            interactable (bool): 只接受可見且未停用（可點擊 / 可輸入）的元素。
+
+        Returns:
+            tuple: (候選索引, WebElement)；逾時或頁面在等待中換頁時為 (None, None)。
+        """
+        self._set_script_timeout(timeout + 1)
         try:
-            # 步驟 0：處理彈出式視窗
-            try:
-                logger.info("步驟 0/5：檢查彈出式視窗...")
-                close_selectors = [
-                    (By.ID, "close_top_banner"),
-                    (By.CSS_SELECTOR, "button.close"),
-                    (By.XPATH, "//button[contains(text(), '關閉')]"),
-                ]
-                for by, value in close_selectors:
-                    try:
-                        close_button = WebDriverWait(self.driver, 2).until(
-                            EC.element_to_be_clickable((by, value))
-                        )
-                        close_button.click()
-                        logger.info(f"✅ 步驟 0/5：偵測到並關閉彈窗 ({by}, {value})。")
-                        break
-                    except Exception:
-                        continue
-            except Exception:
-                logger.info("ℹ️ 步驟 0/5：未偵測到彈出式視窗，繼續執行。")
+            result = self.driver.execute_async_script(
+                WAIT_FOR_ANY_JS, [list(locator) for locator in locators], int(timeout * 1000), interactable
+            )
+        except WebDriverException as e:
+            logger.debug(f"等待元素時發生錯誤: {e}")
+            result = None
+        return (result[0], result[1]) if result else (None, None)
 
-            # 步驟一：點擊「會員登入」
-            logger.info("步驟 1/5：等待『會員登入』按鈕...")
-            login_selectors = [
-                (By.CSS_SELECTOR, "span.member_class_name"),
-                (By.LINK_TEXT, "會員登入"),
-                (By.XPATH, "//span[contains(text(), '會員登入')]")
-            ]
-            login_link = None
-            for by, value in login_selectors:
-                try:
-                    login_link = self.driver.find_element(by, value)
-                    login_link.click()
-                    break
-                except Exception:
-                    continue
-            if not login_link:
-                logger.error("❌ 找不到『會員登入』按鈕。")
-                self._save_diagnostic_snapshot("login_no_login_button")
-                return False
+    def _throttle(self):
+        """對博客來發出請求（開啟網頁、翻頁）前，遵守全域速率上限。"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
 
-            # 步驟二：填寫帳號
-            logger.info("步驟 2/5：等待帳號輸入框...")
-            username_selectors = [
-                (By.ID, "login_id_width01"),
-                (By.NAME, "login_id"),
-                (By.CSS_SELECTOR, "input[type='text']")
-            ]
-            username_input = None
-            for by, value in username_selectors:
-                try:
-                    username_input = self.driver.find_element(by, value)
-                    username_input.clear()
-                    email_value = self.email or self.config.get("email")
-                    if not email_value:
-                        logger.error("❌ 未設定 email，請檢查 config.json。")
-                        return False
-                    username_input.send_keys(email_value)
-                    break
-                except Exception:
-                    continue
-            if not username_input:
-                logger.error("❌ 找不到帳號輸入框。")
-                self._save_diagnostic_snapshot("login_no_username_input")
-                return False
+    def export_session_state(self):
+        """
+        匯出目前的登入狀態（cookies 與 localStorage），供其他瀏覽器直接沿用而不必重新登入。
 
-            # 步驟三：填寫密碼
-            logger.info("步驟 3/5：等待密碼輸入框...")
-            password_selectors = [
-                (By.ID, "login_pswd"),
-                (By.NAME, "login_pswd"),
-                (By.CSS_SELECTOR, "input[type='password']")
-            ]
-            password_input = None
-            for by, value in password_selectors:
-                try:
-                    password_input = self.driver.find_element(by, value)
-                    password_input.clear()
-                    password_input.send_keys(self.config["password"])
-                    break
-                except Exception:
-                    continue
-            if not password_input:
-                logger.error("❌ 找不到密碼輸入框。")
-                self._save_diagnostic_snapshot("login_no_password_input")
-                return False
+        Returns:
+            dict: {"origin", "cookies", "local_storage"}
+        """
+        self._switch_to_default_content()
+        return {
+            "origin": self.base_url,
+            "cookies": self.driver.get_cookies(),
+            "local_storage": self.driver.execute_script(EXPORT_LOCAL_STORAGE_JS) or {},
+        }
+
+    def restore_session_state(self, state):
+        """
+        還原 export_session_state() 匯出的登入狀態。
 
-            # 步驟四：點擊「登入」按鈕以觸發 CAPTCHA
-            logger.info("步驟 4/5：等待『登入』按鈕...")
-            login_btn_selectors = [
-                (By.ID, "show-captcha"),
-                (By.ID, "login_btn"),
-                (By.CSS_SELECTOR, "button[type='submit']"),
-                (By.XPATH, "//button[contains(text(), '登入')]")
-            ]
-            login_button = None
-            for by, value in login_btn_selectors:
-                try:
-                    login_button = self.driver.find_element(by, value)
-                    login_button.click()
-                    break
-                except Exception:
-                    continue
-            if not login_button:
-                logger.error("❌ 找不到『登入』按鈕。")
-                self._save_diagnostic_snapshot("login_no_login_btn")
-                return False
+        Cookie 只能設定在目前網域上，因此會先開啟 origin 頁面，設定完成後再重新整理。
+        """
+        origin = state.get("origin") or self.base_url
+        self._session_state = state
+        self._throttle()
+        self.driver.get(origin)
+        self._invalidate_reader_state("restore_session_state")
+        restored = 0
+        for cookie in state.get("cookies", []):
+            cookie = dict(cookie)
+            # 部分瀏覽器匯出的 sameSite 值無法再寫回
+            if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+                cookie.pop("sameSite", None)
+            try:
+                self.driver.add_cookie(cookie)
+                restored += 1
+            except Exception as e:
+                logger.debug(f"略過無法還原的 cookie {cookie.get('name')}: {e}")
+        if state.get("local_storage"):
+            self.driver.execute_script(RESTORE_LOCAL_STORAGE_JS, state["local_storage"])
+        self.driver.refresh()
+        logger.info(f"🍪 已還原登入狀態 ({restored} 個 cookie)")
+
+    def is_logged_in(self):
+        """以一次 execute_script 檢查目前頁面是否為登入狀態。"""
+        try:
+            self._switch_to_default_content()
+            return bool(self.driver.execute_script(IS_LOGGED_IN_JS))
+        except Exception:
+            return False
 
-            # 步驟五：等待使用者介入
-            logger.info("步驟 5/5：暫停程式，等待使用者手動處理 CAPTCHA...")
-            # CAPTCHA 驗證步驟已略過，流程自動繼續
-            return True
+    def save_session(self, state=None):
+        """將目前的登入狀態（或已匯出的 state）加密保存到 session_file，下次啟動可跳過 login()。"""
+        session_file = self.config.get('session_file')
+        if not session_file:
+            return False
+        try:
+            if save_session(session_file, state or self.export_session_state(), session_secret(self.config)):
+                logger.info(f"🔐 登入狀態已加密保存: {session_file}")
+                return True
+        except Exception as e:
+            logger.warning(f"⚠️ 保存登入狀態失敗: {e}")
+        return False
 
-        except TimeoutException as e:
-            logger.error(f"❌ 登入流程中的某個元素等待逾時: {e}", exc_info=True)
-            self._save_diagnostic_snapshot("login_timeout_failure")
+    def restore_saved_session(self):
+        """
+        從 session_file 還原登入狀態，並以重新整理後的首頁驗證是否仍有效。
+
+        Returns:
+            bool: 登入狀態有效時返回 True；否則需執行完整的 login()。
+        """
+        session_file = self.config.get('session_file')
+        if not session_file:
+            return False
+        state = load_session(session_file, session_secret(self.config))
+        if not state:
             return False
+
+        now = time.time()
+        state["cookies"] = [
+            cookie for cookie in state.get("cookies", [])
+            if not cookie.get("expiry") or cookie["expiry"] > now
+        ]
+        if not state["cookies"]:
+            logger.info("ℹ️ 保存的登入狀態已過期，執行完整登入。")
+            return False
+
+        try:
+            self.restore_session_state(state)
         except Exception as e:
-            logger.error(f"❌ 登入流程失敗: {e}", exc_info=True)
-            self._save_diagnostic_snapshot("login_generic_failure")
+            logger.warning(f"⚠️ 還原登入狀態失敗: {e}")
             return False
+        if self.is_logged_in():
+            logger.info("✅ 已使用保存的登入狀態，略過登入流程。")
+            return True
+        logger.info("ℹ️ 保存的登入狀態已失效，執行完整登入。")
+        return False
+
+    @timed("navigate_to_book")
+    def navigate_to_book(self, book_url, output_dir=None):
+        """
+        導航到電子書頁面 - 改進版
 
-    def navigate_to_book(self, book_url):
-        """導航到電子書頁面 - 改進版"""
+        Args:
+            book_url (str): 電子書網址。
+            output_dir (str | Path): 沿用既有的輸出目錄（續傳時使用）；預設建立新的時間戳目錄。
+        """
         logger.info(f"前往: {book_url}")
+        self._close_assembler()
+        self._close_store()
+        self.book_url = book_url
+        self._throttle()
         self.driver.get(book_url)
+        self._invalidate_reader_state("navigate_to_book")
+        self._book_domain = urlparse(book_url).netloc
+        self._page_turn_strategy = self._load_page_turn_strategy()
+        self.origin_location = None
+        self._at_book_start = True
+        self._previous_capture = None
+        self._seen_digests = {}
 
         # 等待頁面完全載入 (等待 iframe 出現)
         logger.info("等待頁面載入...")
@@ -406,11 +670,379 @@ class BooksCrawler:
             logger.warning("⚠️ 等待電子書 iframe 超時，繼續執行...")
 
         # 建立輸出目錄
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.output_dir = Path(f"output/ebook_{timestamp}")
+        if output_dir:
+            self.output_dir = Path(output_dir)
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.output_dir = Path(f"output/ebook_{timestamp}")
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest = BookManifest(
+            self.output_dir, book_url, self.config.get('manifest_checkpoint_seconds', 5)
+        )
         logger.info(f"輸出目錄: {self.output_dir}")
 
+    def get_current_location(self, cached=False):
+        """
+        讀取閱讀器目前的位置。
+
+        Args:
+            cached (bool): 優先使用輔助物件翻頁後一併回報的位置，省去一次 WebDriver 呼叫。
+
+        Returns:
+            dict | None: {cfi, percentage, href}；找不到 epub.js Rendition 時返回 None。
+        """
+        if cached and self._reader_state is not None:
+            return self._reader_state.get('location')
+        try:
+            self._reader_state = self._reader_call(READER_STATE_JS)
+            return (self._reader_state or {}).get('location')
+        except Exception as e:
+            logger.warning(f"⚠️ 無法讀取閱讀器位置: {e}")
+            return None
+
+    def display_location(self, target, timeout=10):
+        """
+        透過閱讀器自身的 rendition.display() 跳到指定位置。
+
+        Args:
+            target (str): CFI 或章節 href。
+
+        Returns:
+            bool: 閱讀器回報跳轉成功時返回 True。
+        """
+        try:
+            if self._frame_context != 'default':
+                self._switch_to_default_content()
+            self._set_script_timeout(timeout)
+            self._throttle()
+            self._reader_state = self._settled_png = None
+            self._at_book_start = False
+            return bool(self.driver.execute_async_script(DISPLAY_LOCATION_JS, target))
+        except Exception as e:
+            logger.warning(f"⚠️ 跳轉到 {target} 失敗: {e}")
+            return False
+
+    def seek(self, target, timeout=None):
+        """
+        透過閱讀器自身的導覽 (rendition.display) 跳到指定位置，並確認已抵達。
+
+        Args:
+            target (str | float | int): CFI、章節 href、0–1 的閱讀進度，或本書輸出的頁碼（見 seek_page()）。
+            timeout (float): 最長等待秒數（含第一次以進度跳轉時產生位置索引），預設為 seek_timeout；
+                以頁碼跳轉時為每次翻頁的最長等待秒數。
+
+        Returns:
+            dict | None: 抵達的位置 {cfi, percentage, href}；跳轉失敗或抵達的位置不符時返回 None。
+        """
+        if isinstance(target, int) and not isinstance(target, bool):
+            return self.seek_page(target, timeout)
+        try:
+            if self._frame_context != 'default':
+                self._switch_to_default_content()
+            self._set_script_timeout(timeout or self.config.get('seek_timeout', 60))
+            self._throttle()
+            self._reader_state = self._settled_png = None
+            self._at_book_start = False
+            with self.metrics.span("seek"):
+                location = self.driver.execute_async_script(SEEK_LOCATION_JS, target)
+        except Exception as e:
+            logger.warning(f"⚠️ 跳轉到 {target} 失敗: {e}")
+            return None
+        if not location or not self._location_matches(target, location):
+            logger.warning(f"⚠️ 跳轉到 {target} 後位置不符: {location}")
+            return None
+        logger.info(f"📍 已跳到 {target}: {location.get('cfi')}")
+        return location
+
+    def _location_matches(self, target, location):
+        """確認 seek() 抵達的位置與目標一致（進度允許 seek_tolerance 的誤差）。"""
+        if isinstance(target, float):
+            if location.get('percentage') is None:
+                # 閱讀器沒有位置索引時無法比對進度，只能確認已顯示某個位置
+                return bool(location.get('cfi'))
+            return abs(location['percentage'] - target) <= self.config.get('seek_tolerance', 0.02)
+        if target.startswith('epubcfi('):
+            return location.get('cfi') == target
+        return (location.get('href') or '').split('#')[0] == target.split('#')[0]
+
+    def _reached_location(self, stop_at):
+        """目前的位置是否已到達（或超過）stop_at。"""
+        location = self.get_current_location(cached=True)
+        if not location or not stop_at:
+            return False
+        if stop_at.get('cfi') and location.get('cfi') == stop_at['cfi']:
+            return True
+        if location.get('percentage') is not None and stop_at.get('percentage') is not None:
+            return location['percentage'] > stop_at['percentage']
+        return False
+
+    def resume_capture(self, output_dir, total_pages=None, delay=5):
+        """
+        依輸出目錄中的 manifest.json 續傳：重新開啟書籍、跳到最後一張成功截圖的位置，
+        翻到下一頁後以接續的頁碼繼續截圖。
+        """
+        if not BookManifest.exists(output_dir):
+            logger.error(f"❌ {output_dir} 中找不到 manifest.json，無法續傳。")
+            return False
+        book_url = BookManifest(output_dir).book_url
+        if not book_url:
+            logger.error("❌ manifest.json 中沒有書籍網址，無法續傳。")
+            return False
+
+        self.navigate_to_book(book_url, output_dir=output_dir)
+        if not self.find_and_switch_to_ebook_iframe():
+            logger.error("❌ 無法續傳，因為找不到電子書 iframe。")
+            return False
+
+        last_page = self.manifest.last_good_page()
+        if last_page == 0:
+            logger.info("ℹ️ 尚未有任何成功的頁面，從第 1 頁開始。")
+            return self.auto_capture_mode(total_pages, delay) is not None
+
+        # seek_page() 以 seek() 確認抵達記錄的 CFI；位置不符時改由較早的錨點或第 1 頁逐頁翻（不截圖），
+        # 不會在錯誤的位置以接續的頁碼覆寫既有頁面
+        if self.seek_page(last_page, delay) is None:
+            logger.error(f"❌ 無法回到第 {last_page} 頁的位置，停止續傳以免覆寫既有頁面。")
+            return False
+
+        if not self.turn_page(delay):
+            logger.info("ℹ️ 已是最後一頁，沒有需要續傳的內容。")
+            return True
+        logger.info(f"▶️ 從第 {last_page + 1} 頁繼續截圖。")
+        return self.auto_capture_mode(total_pages, delay, start_page=last_page + 1) is not None
+
+    def recapture_pages(self, output_dir, pages=None, delay=5):
+        """
+        重新截取輸出目錄中的指定頁面（預設為 manifest 記錄的失敗頁）。每頁以 seek_page() 直接跳轉，
+        成本與頁數成正比，不必從第 1 頁翻起；設定 assemble_format 時完成後重新組成整本書。
+
+        Returns:
+            dict | None: {"output_dir", "recaptured", "failed_pages"}；無法開啟書籍時返回 None。
+        """
+        if not BookManifest.exists(output_dir):
+            logger.error(f"❌ {output_dir} 中找不到 manifest.json，無法重新截取。")
+            return None
+        book_url = BookManifest(output_dir).book_url
+        if not book_url:
+            logger.error("❌ manifest.json 中沒有書籍網址，無法重新截取。")
+            return None
+
+        self.navigate_to_book(book_url, output_dir=output_dir)
+        pages = sorted(set(pages or self.manifest.failed_pages()))
+        if not pages:
+            print("ℹ️ 沒有需要重新截取的頁面。")
+            return {"output_dir": str(self.output_dir), "recaptured": [], "failed_pages": []}
+        if not self.find_and_switch_to_ebook_iframe():
+            logger.error("❌ 無法重新截取，因為找不到電子書 iframe。")
+            return None
+
+        print(f"🔁 重新截取 {len(pages)} 頁: {pages}")
+        self._capture_delay = delay
+        recaptured, failed_pages = [], []
+        for page_num in pages:
+            print(f"\n進度: [第 {page_num} 頁]")
+            # 跳轉後的畫面不是上一次截圖的下一頁，不做「畫面未變化」的比對
+            self._previous_capture = None
+            if self.seek_page(page_num, delay) is None:
+                logger.error(f"❌ 無法跳到第 {page_num} 頁")
+                self.manifest.record_failure(page_num, "seek failed")
+                failed_pages.append(page_num)
+            elif self.capture_page_with_retry(page_num):
+                recaptured.append(page_num)
+                self.manifest.record_location(page_num, self.get_current_location(cached=True))
+            else:
+                self.manifest.record_failure(page_num, "capture failed")
+                failed_pages.append(page_num)
+
+        if self.writer:
+            self.writer.flush()
+            for failed_page, reason in sorted(self.writer.pop_failures().items()):
+                self.manifest.record_failure(failed_page, reason)
+                if failed_page in recaptured:
+                    recaptured.remove(failed_page)
+                    failed_pages.append(failed_page)
+        if self.assemble_format:
+            # 依 manifest 從頁面儲存讀回所有頁面，重新組成整本書
+            last_page = max((int(page) for page in self.manifest.data.get("pages", {})), default=0)
+            self._open_assembler(last_page + 1)
+            self._close_assembler()
+        self._close_store()
+
+        print(f"\n✅ 重新截取成功: {len(recaptured)} 頁")
+        if failed_pages:
+            print(f"❌ 仍然失敗: {sorted(failed_pages)}")
+        return {"output_dir": str(self.output_dir), "recaptured": recaptured, "failed_pages": sorted(failed_pages)}
+
+    def _needs_restart(self):
+        return self.watchdog is not None and self.watchdog.reason is not None
+
+    def restart_browser(self, page_num, reason=None):
+        """
+        watchdog 偵測到瀏覽器卡住、崩潰或記憶體膨脹後重新啟動：以 setup_driver() 建立新的 driver，
+        還原登入狀態、重新開啟書籍並回到第 page_num 頁。輸出目錄、頁面儲存、manifest、
+        背景寫入器與組書都沿用，頁碼不變。
+
+        Args:
+            reason (str): 主動回收（例如記憶體上限）的原因；此類重新啟動不計入 watchdog_max_restarts。
+
+        Returns:
+            bool: 已回到第 page_num 頁時返回 True；超過 watchdog_max_restarts 次或重新啟動失敗時返回 False。
+        """
+        planned = reason is not None
+        if not planned:
+            reason = self.watchdog.reason if self.watchdog else None
+            failures = sum(1 for restart in self.restarts if not restart["planned"])
+            if failures >= self.max_restarts:
+                logger.error(f"❌ 瀏覽器已因異常重新啟動 {failures} 次，達到上限 ({reason})。")
+                return False
+        self.restarts.append({"page": page_num, "reason": reason, "planned": planned})
+        logger.warning(f"🔄 重新啟動瀏覽器 (第 {len(self.restarts)} 次)，之後回到第 {page_num} 頁...")
+
+        with self.metrics.span("browser_restart"):
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.debug(f"關閉異常的瀏覽器時出錯: {e}")
+                if self.watchdog:
+                    self.watchdog.kill()
+                close_service_log(getattr(self.driver, 'service', None))
+            if self.profile:
+                self.profile.release()
+                self.profile = None
+            self._invalidate_reader_state("browser_restart")
+            self._script_timeout = None
+            self._memory_reloaded = False
+            try:
+                self.setup_driver()
+                if self._session_state:
+                    self.restore_session_state(self._session_state)
+                else:
+                    self.restore_saved_session()
+                self._throttle()
+                self.driver.get(self.book_url)
+                self._invalidate_reader_state("browser_restart")
+                self._at_book_start = True
+                if not self.find_and_switch_to_ebook_iframe():
+                    logger.error("❌ 重新啟動後找不到電子書 iframe。")
+                    return False
+                if self.seek_page(page_num) is None:
+                    logger.error(f"❌ 重新啟動後無法回到第 {page_num} 頁。")
+                    return False
+            except Exception as e:
+                logger.error(f"❌ 重新啟動瀏覽器失敗: {e}")
+                return False
+        logger.info(f"✅ 瀏覽器已重新啟動，從第 {page_num} 頁繼續。")
+        return True
+
+    def seek_page(self, page_num, delay=None):
+        """
+        跳到本書輸出的第 page_num 頁：以 manifest 中該頁或之前最近一個已記錄位置 (CFI) 的頁面為錨點跳轉，
+        其餘逐頁翻過（不截圖）。失敗頁沒有位置記錄，通常由前一頁跳轉後再翻一頁。
+        沒有任何錨點時，先回到段落起點 (origin_location) 或書籍開頭（必要時重新開啟書籍）再逐頁翻。
+
+        Returns:
+            dict | None: 抵達的位置（閱讀器不回報位置時為空 dict）；跳轉或翻頁失敗時返回 None。
+        """
+        delay = delay or self._capture_delay
+        anchor = None
+        for known in range(page_num, 0, -1):
+            location = self.manifest.location_of(known) if self.manifest else None
+            if location and location.get('cfi'):
+                if self.seek(location['cfi']):
+                    anchor = known
+                break
+        if anchor is None:
+            anchor = 1
+            if not self._return_to_start():
+                logger.error(f"❌ 無法回到第 1 頁，不能定位第 {page_num} 頁。")
+                return None
+            if page_num > 1:
+                logger.warning(f"⚠️ 沒有可用的位置記錄，從第 1 頁逐頁翻到第 {page_num} 頁...")
+        if anchor == page_num:
+            self.wait_for_page_settle(delay)
+        for _ in range(page_num - anchor):
+            if not self.turn_page(delay):
+                return None
+        return self.get_current_location(cached=True) or {}
+
+    def _return_to_start(self):
+        """
+        讓閱讀器回到第 1 頁：段落起點以 seek() 跳回；否則除非剛載入書籍，重新開啟書籍。
+
+        Returns:
+            bool: 已確定在第 1 頁時返回 True。
+        """
+        if self.origin_location:
+            return self.seek(self.origin_location['cfi']) is not None
+        if self._at_book_start:
+            return True
+        logger.info("↩️ 沒有位置記錄，重新開啟書籍以回到第 1 頁...")
+        try:
+            self._switch_to_default_content()
+            self._throttle()
+            self.driver.get(self.book_url)
+            self._invalidate_reader_state("return_to_start")
+            self._at_book_start = True
+            return self.find_and_switch_to_ebook_iframe()
+        except Exception as e:
+            logger.warning(f"⚠️ 重新開啟書籍失敗: {e}")
+            return False
+
+    def browser_rss(self):
+        """WebDriver 與瀏覽器行程樹目前的 RSS (bytes)；共用的瀏覽器或非 Linux 平台返回 None。"""
+        process = getattr(getattr(self.driver, 'service', None), 'process', None)
+        if not self._owns_driver or getattr(process, 'pid', None) is None:
+            return None
+        return process_tree_rss(process.pid)
+
+    def reload_reader(self, page_num):
+        """
+        重新載入閱讀器頁面並回到第 page_num 頁，釋放 epub.js 在大量翻頁後累積的記憶體。
+
+        Returns:
+            bool: 已回到第 page_num 頁時返回 True。
+        """
+        with self.metrics.span("memory_reload"):
+            self._switch_to_default_content()
+            self._throttle()
+            self.driver.refresh()
+            self._invalidate_reader_state("memory_reload")
+            if not self.find_and_switch_to_ebook_iframe():
+                return False
+            return self.seek_page(page_num) is not None
+
+    def _govern_memory(self, page_num):
+        """
+        在頁面交界處（第 page_num 頁已截圖、尚未翻頁）依瀏覽器記憶體用量重新載入閱讀器或重新啟動瀏覽器。
+
+        Returns:
+            bool: 閱讀器仍停在第 page_num 頁時返回 True；重新載入與重新啟動都失敗時返回 False。
+        """
+        if not (self.memory_reload_mb or self.memory_recycle_mb) or page_num % max(1, self.memory_check_pages):
+            return True
+        rss = self.browser_rss()
+        if rss is None:
+            return True
+        rss_mb = rss / 1024 / 1024
+        over_reload = bool(self.memory_reload_mb) and rss_mb > self.memory_reload_mb
+        over_recycle = bool(self.memory_recycle_mb) and rss_mb > self.memory_recycle_mb
+        if not over_reload and not over_recycle:
+            self._memory_reloaded = False
+            return True
+
+        if over_recycle or self._memory_reloaded:
+            # 重新載入閱讀器後仍超過上限：記憶體不在閱讀器頁面本身，只能重新啟動瀏覽器
+            return self.restart_browser(page_num, reason=f"記憶體 {rss_mb:.0f} MB，主動回收瀏覽器")
+        logger.warning(f"🧹 瀏覽器記憶體 {rss_mb:.0f} MB 超過 {self.memory_reload_mb} MB，重新載入閱讀器...")
+        self.memory_reloads += 1
+        self._memory_reloaded = True
+        try:
+            if self.reload_reader(page_num):
+                return True
+        except Exception as e:
+            logger.warning(f"⚠️ 重新載入閱讀器失敗: {e}")
+        return self.restart_browser(page_num, reason="重新載入閱讀器失敗，改為重新啟動瀏覽器")
+
     def _click_tutorial_next_button(self, selectors, step_count):
         """
         輔助函式：嘗試使用多個選擇器策略來尋找並點擊教學引導的「下一步」按鈕。
@@ -422,25 +1054,22 @@ class BooksCrawler:
         Returns:
             bool: 如果成功找到並點擊按鈕，返回 True；否則返回 False。
         """
-        for by, value in selectors:
-            try:
-                # 使用 WebDriverWait 等待按鈕可被點擊，取代固定等待
-                button = WebDriverWait(self.driver, 2).until(
-                    EC.element_to_be_clickable((by, value))
-                )
-                logger.info(f"🖱️ 找到教學按鈕 (策略: {by}='{value}')，正在點擊第 {step_count} 次...")
-                button.click()
-                
-                # 已移除教學引導截圖
+        # 所有選擇器同時等待，找不到按鈕時最多只花 2 秒（而不是每個選擇器各 2 秒）
+        index, button = self.wait_for_any(selectors, 2)
+        if button is None:
+            return False
+        by, value = selectors[index]
+        try:
+            logger.info(f"🖱️ 找到教學按鈕 (策略: {by}='{value}')，正在點擊第 {step_count} 次...")
+            button.click()
+        except Exception:
+            return False
 
-                # 短暫等待動畫效果
-                time.sleep(0.1)
-                return True
-            except Exception:
-                # 如果這個選擇器失敗，繼續嘗試下一個
-                continue
-        return False
+        # 短暫等待動畫效果
+        time.sleep(0.1)
+        return True
 
+    @timed("handle_tutorial")
     def handle_tutorial(self):
         """
         自動化處理電子書閱讀器初始可能出現的教學引導畫面。
@@ -450,10 +1079,18 @@ class BooksCrawler:
         2. 持續點擊直到教學結束 (按鈕消失)。
         3. 包含重試機制，以應對頁面載入延遲等問題。
         """
+        # 持久化的設定檔已看過此網域的教學：畫面上沒有教學按鈕時不必逐一等待每個選擇器
+        marker = f"tutorial_{self._book_domain or 'default'}"
+        if self.profile and self.profile.has_marker(marker):
+            self._switch_to_default_content()
+            if not self.driver.find_elements(By.CSS_SELECTOR, TUTORIAL_QUICK_SELECTOR):
+                logger.info("ℹ️ 此瀏覽器設定檔已看過教學引導，略過檢查。")
+                return
+
         max_retries = 3
         for i in range(max_retries):
             try:
-                self.driver.switch_to.default_content()
+                self._switch_to_default_content()
                 logger.info(f"🔄 正在檢查教學引導頁面... (第 {i + 1}/{max_retries} 次嘗試)")
 
                 # 定義多個可能的選擇器來尋找「下一步」按鈕
@@ -478,6 +1115,8 @@ class BooksCrawler:
                         break  # 跳出 while 迴圈
                 
                 logger.info(f"✅ 第 {i + 1} 次嘗試成功，結束教學引導處理。")
+                if self.profile:
+                    self.profile.set_marker(marker)
                 return  # 成功處理後，結束整個函式
 
             except Exception as e:
@@ -485,6 +1124,7 @@ class BooksCrawler:
                 if i < max_retries - 1:
                     logger.info("🔄 正在重新整理頁面並重試...")
                     self.driver.refresh()
+                    self._invalidate_reader_state("refresh", keep_tutorial=True)
                     time.sleep(1)  # 等待頁面重新載入
                 else:
                     logger.error(f"❌ 在 {max_retries} 次嘗試後，處理教學引導失敗。")
@@ -492,43 +1132,127 @@ class BooksCrawler:
                     self._save_diagnostic_snapshot("tutorial_handling_failed")
                     logger.info("ℹ️ 將繼續執行後續步驟...")
 
+    def _switch_to_default_content(self):
+        """切換回主文件，並同步更新 frame 狀態快取。"""
+        self.driver.switch_to.default_content()
+        self._frame_context = 'default'
+
+    def _invalidate_reader_state(self, reason, keep_tutorial=False):
+        """
+        清除閱讀器狀態快取。
+
+        Args:
+            reason (str): 失效原因，僅用於日誌。
+            keep_tutorial (bool): 僅 iframe 失效（例如元素過期）時保留「教學已處理」的狀態。
+        """
+        logger.info(f"♻️ 閱讀器狀態快取失效 ({reason})")
+        self._ebook_iframe = None
+        self._frame_context = None
+        self._reader_state = None
+        self._settled_png = None
+        if not keep_tutorial:
+            self._tutorial_handled = False
+
+    def _set_script_timeout(self, seconds):
+        """只在需要更長的時限時才呼叫 set_script_timeout，避免每頁多一次 WebDriver 往返。"""
+        if self._script_timeout is None or self._script_timeout < seconds:
+            self.driver.set_script_timeout(seconds)
+            self._script_timeout = seconds
+
+    def _reader_call(self, script, *args, asynchronous=False):
+        """
+        在主文件中呼叫閱讀器輔助物件 window.__books。
+
+        輔助物件每次載入文件只注入一次；導覽或重新整理後不存在時（腳本回傳 null）自動重新注入再呼叫。
+        """
+        if self._frame_context != 'default':
+            self._switch_to_default_content()
+        run = self.driver.execute_async_script if asynchronous else self.driver.execute_script
+        result = run(script, *args)
+        if result is None:
+            self.driver.execute_script(READER_HELPER_JS)
+            result = run(script, *args)
+        return result
+
+    def _reader_ready(self):
+        """
+        依輔助物件最近回報的狀態判斷電子書內容是否已渲染；已就緒時視窗截圖不必切換進 iframe。
+        """
+        if not self._tutorial_handled or self._ebook_iframe is None:
+            return False
+        if self._reader_state is None:
+            self._reader_state = self._reader_call(READER_STATE_JS)
+        return bool(self._reader_state and self._reader_state.get('ready'))
+
+    def _switch_to_cached_iframe(self):
+        """
+        使用快取的 iframe 元素快速切換，穩定狀態下只需一次 WebDriver 呼叫。
+
+        Returns:
+            bool: 成功切換（或已在 iframe 中）時返回 True；快取失效時返回 False。
+        """
+        try:
+            if self._frame_context == 'ebook':
+                # 已在 iframe 中：確認該 iframe 仍掛在文件上即可
+                if self.driver.execute_script(
+                    "return !!(window.frameElement && window.frameElement.isConnected);"
+                ):
+                    return True
+                self._switch_to_default_content()
+            elif self._frame_context != 'default':
+                self._switch_to_default_content()
+            self.driver.switch_to.frame(self._ebook_iframe)
+            self._frame_context = 'ebook'
+            return True
+        except (StaleElementReferenceException, NoSuchFrameException):
+            self._invalidate_reader_state("stale iframe", keep_tutorial=True)
+            return False
+
+    @timed("iframe_switch")
     def find_and_switch_to_ebook_iframe(self):
         """精準定位並切換到電子書 iframe，並驗證內部內容"""
-        self.driver.switch_to.default_content()
+        if self._ebook_iframe is not None and self._tutorial_handled:
+            if self._switch_to_cached_iframe():
+                return True
+
+        self._switch_to_default_content()
         try:
-            # 1. 處理教學引導
-            self.handle_tutorial()
-            self.driver.switch_to.default_content()
+            # 1. 處理教學引導（每本書只需一次）
+            if not self._tutorial_handled:
+                self.handle_tutorial()
+                self._tutorial_handled = True
+                self._switch_to_default_content()
 
             # 2. 精準定位 iframe
             logger.info("🔍 開始精準尋找電子書 iframe...")
-            iframe_selector = "iframe[id^='epubjs-view-']"
-            
+
             try:
-                # 等待 iframe 出現
-                # 策略更新：使用 'frame_to_be_available_and_switch_to_it'
-                # 這個條件會等待 iframe 存在並且可以被成功切換，一步到位解決時序問題。
-                self.wait.until(
-                    EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, iframe_selector))
+                # 等待 iframe 出現並保留元素參考，之後的頁面直接以該元素切換
+                iframe = self.wait.until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, EBOOK_IFRAME_SELECTOR))
                 )
+                self.driver.switch_to.frame(iframe)
+                self._frame_context = 'ebook'
                 logger.info("✅ 已成功切換到電子書 iframe，正在驗證內部內容...")
 
                 # 3. 驗證 iframe 內部內容
-                #    此驗證邏輯現在是正確的，因為我們已經在 iframe 內部。
                 #    等待 body > div 的出現，確保 epub.js 已渲染內容。
                 self.wait.until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, "body > div"))
                 )
+                self._ebook_iframe = iframe
                 logger.info("✅ iframe 內部內容驗證成功。")
                 return True
                 
             except Exception as e:
                 logger.error(f"❌ 未找到、無法切換或驗證電子書 iframe: {e}")
+                self._ebook_iframe = None
                 self.diagnose_page_structure() # 失敗時執行診斷
                 return False
 
         except Exception as e:
             logger.error(f"iframe 處理過程中發生嚴重錯誤: {e}", exc_info=True)
+            self._frame_context = None
             return False
 
     def diagnose_page_structure(self):
@@ -536,7 +1260,7 @@ class BooksCrawler:
         logger.info("🕵️‍♂️ 開始進行頁面結構診斷...")
 
         # 確保切換回主內容
-        self.driver.switch_to.default_content()
+        self._switch_to_default_content()
 
         # 建立診斷檔案的儲存路徑
         diag_dir = self.output_dir or Path("output/diagnostics")
@@ -575,31 +1299,271 @@ class BooksCrawler:
         else:
             logger.warning("⚠️ 在頁面上未找到任何 <iframe> 或 <frame> 元素。")
 
+    def _get_encoder(self):
+        """取得（必要時建立）編碼行程池；設定為原始 PNG 時返回 None。"""
+        if self.encoder is None and needs_encoding(self.encode_options):
+            try:
+                self.encoder = PageEncoder(self.encode_options, workers=self.config.get('encode_workers'))
+            except ValueError as e:
+                logger.error(f"❌ {e}，改為保留原始 PNG。")
+                self.encode_options = encode_options({})
+        return self.encoder
+
+    def _get_writer(self):
+        """取得（必要時建立）背景截圖寫入器。"""
+        if self.writer is None:
+            encoder = self._get_encoder()
+            workers = self.config.get('writer_threads', 2)
+            if encoder:
+                # 寫入執行緒只等待編碼結果，數量至少與編碼行程數相同才能用滿所有核心
+                workers = max(workers, encoder.workers)
+            self.writer = ScreenshotWriter(
+                workers=workers,
+                queue_size=self.config.get('writer_queue_size', 8),
+                reencode=encoder,
+                metrics=self.metrics,
+            )
+            self.writer.listeners.append(self._on_page_written)
+            self.writer.failure_listeners.append(self._on_page_failed)
+        return self.writer
+
+    def _get_ocr(self):
+        """取得（必要時建立）OCR 階段；未啟用或無法啟用時返回 None。"""
+        if self.ocr is None and self.ocr_enabled:
+            try:
+                self.ocr = OcrStage(
+                    workers=self.config.get('ocr_workers'),
+                    lang=self.config.get('ocr_lang', 'chi_tra'),
+                    cache_dir=self.config.get('ocr_cache_dir', 'output/.ocr_cache'),
+                )
+            except Exception as e:
+                logger.error(f"❌ 無法啟用 OCR: {e}")
+                self.ocr_enabled = False
+        return self.ocr
+
+    def _on_page_written(self, page_num, written):
+        """頁面寫入磁碟後更新 manifest 並送交 OCR（可能在背景寫入執行緒中呼叫）。"""
+        if self.manifest:
+            self.manifest.record_page(page_num, written)
+        if self.assembler:
+            self.assembler.add(page_num, written)
+        ocr = self._get_ocr()
+        if ocr:
+            for path, data in written:
+                ocr.submit(page_num, path, data, store=self.store)
+
+    def _on_page_failed(self, page_num, error):
+        """頁面寫入失敗（背景寫入執行緒中呼叫）：組書時略過此頁碼。"""
+        if self.assembler:
+            self.assembler.skip(page_num)
+
+    def _open_assembler(self, start_page=1):
+        """
+        開啟目前書籍的組書輸出。續傳時先依 manifest 從頁面儲存依序讀回已截取的頁面，
+        讓輸出的檔案仍是完整的一本書。
+        """
+        self._close_assembler()
+        if not self.assemble_format:
+            return
+        path = self.output_dir / f"book.{self.assemble_format}"
+        try:
+            self.assembler = BookAssembler(path, self.assemble_format)
+        except Exception as e:
+            logger.error(f"❌ 無法建立 {path}: {e}")
+            return
+        if start_page > 1 and self.manifest:
+            store = self._get_store()
+            entries = self.manifest.data.get("pages", {})
+            for page in range(1, start_page):
+                entry = entries.get(str(page)) or {}
+                if not entry.get("files") and entry.get("duplicate_of") is not None:
+                    self.assembler.duplicate(page, entry["duplicate_of"])
+                    continue
+                files = entry.get("files", [])
+                self.assembler.add(page, [(name, store.get(name)) for name in files if name in store])
+        logger.info(f"📕 邊截圖邊組書: {path}")
+
+    def _close_assembler(self):
+        """等待背景寫入完成後完成組書輸出（寫入交叉參照表 / ZIP 目錄）。"""
+        if self.assembler is None:
+            return
+        if self.writer:
+            self.writer.flush()
+        try:
+            self.assembler.close()
+            logger.info(f"📕 已輸出 {self.assembler.path} ({self.assembler.page_count} 頁)")
+        except Exception as e:
+            logger.warning(f"完成組書輸出時出錯: {e}")
+        self.assembler = None
+
+    def _get_store(self):
+        """取得（必要時開啟）目前書籍的頁面儲存。"""
+        if self.store is None:
+            self.store = open_store(self.output_dir, self.output_backend)
+        return self.store
+
+    def _close_store(self):
+        """等待背景寫入完成後關閉頁面儲存（pack 會在此寫入索引），並將 manifest 寫回磁碟。"""
+        if self.writer:
+            self.writer.flush()
+        if self.ocr:
+            self.ocr.flush()  # OCR 結果經由頁面儲存寫入
+        if self.manifest:
+            self.manifest.flush()
+        if self.store is None:
+            return
+        try:
+            self.store.close()
+        except Exception as e:
+            logger.warning(f"關閉頁面儲存時出錯: {e}")
+        self.store = None
+
+    def _store_page(self, page_num, png_bytes, path, spread=None):
+        """將截圖交給背景寫入器；關閉 async_write 時直接寫入。"""
+        store = self._get_store()
+        if self.async_write:
+            self._get_writer().submit(page_num, png_bytes, path, spread=spread, store=store)
+        else:
+            self._on_page_written(page_num, write_page(
+                png_bytes, path, spread=spread, store=store, reencode=self._get_encoder(),
+                metrics=self.metrics,
+            ))
+
+    def _dedupe_capture(self, page_num, *png_images):
+        """
+        比對本次截圖與先前的頁面。
+
+        - 'unchanged'：仍停在上一頁，代表翻頁沒有生效或已到書末，不寫入。以閱讀器回報的位置 (CFI)
+          是否改變為準；讀不到位置時才改以縮圖像素比對，因此連續的空白頁不會被誤判為書末。
+        - 'duplicate'：與更早的某頁（包括位置不同但畫面相同的上一頁）完全相同，
+          只在 manifest 中記錄 duplicate_of，不寫入。
+
+        Returns:
+            bool: 本次截圖不需要寫入時返回 True。
+        """
+        self._last_capture_status = None
+        self._last_capture_ref = None
+        if not self.dedupe_pages:
+            return False
+
+        fingerprint = page_fingerprint(*png_images)
+        cfi = (self.get_current_location(cached=True) or {}).get('cfi')
+        if self._previous_capture and self._previous_capture[0] != page_num:
+            previous_page, previous, previous_cfi = self._previous_capture
+            if cfi and previous_cfi:
+                unchanged = cfi == previous_cfi
+            else:
+                unchanged = is_same_page(fingerprint, previous, self.duplicate_tolerance)
+            if unchanged:
+                self._last_capture_status = 'unchanged'
+                self._last_capture_ref = previous_page
+                return True
+        self._previous_capture = (page_num, fingerprint, cfi)
+
+        first_page = self._seen_digests.setdefault(fingerprint.digest, page_num)
+        if first_page != page_num:
+            logger.info(f"🔁 第 {page_num} 頁與第 {first_page} 頁內容相同，不重複寫入。")
+            self._last_capture_status = 'duplicate'
+            self._last_capture_ref = first_page
+            if self.manifest:
+                self.manifest.record_duplicate(page_num, first_page)
+            return True
+        return False
+
+    def capture_page_element(self, page_num, screenshot_path):
+        """
+        只截取 epub.js 渲染出的頁面元素，不含閱讀器工具列與邊框。
+
+        - 畫面上只有一個頁面 iframe 且寬高比超過 spread_aspect_ratio 時，視為跨頁，
+          由寫入器從中線拆成兩頁。
+        - 有多個頁面 iframe 並排時（固定版面跨頁），每個 iframe 各自截圖。
+        多頁輸出依閱讀順序命名為 page_0001_1.png、page_0001_2.png。
+
+        Returns:
+            bool: 成功截取並送出寫入時返回 True。
+        """
+        if not self._tutorial_handled:
+            self.find_and_switch_to_ebook_iframe()
+        if self._frame_context != 'default':
+            self._switch_to_default_content()
+
+        info = self.driver.execute_script(VISIBLE_EBOOK_VIEWS_JS) or {}
+        views = info.get('views') or []
+        if not views:
+            logger.warning("⚠️ 畫面上找不到電子書頁面元素。")
+            return False
+        rtl = bool(info.get('rtl'))
+
+        with self.metrics.span("screenshot"):
+            if len(views) == 1:
+                view = views[0]
+                spread = None
+                if view['width'] > view['height'] * self.spread_aspect_ratio:
+                    spread = 'rtl' if rtl else 'ltr'
+                shots = [(view['element'].screenshot_as_png, screenshot_path, spread)]
+            else:
+                paths = spread_part_paths(screenshot_path, len(views))
+                shots = [(view['element'].screenshot_as_png, path, None) for view, path in zip(views, paths)]
+
+        if any(len(png_bytes) <= 1024 for png_bytes, _, _ in shots):
+            logger.warning(f"第 {page_num} 頁元素截圖為空。")
+            return False
+        if self._dedupe_capture(page_num, *(png_bytes for png_bytes, _, _ in shots)):
+            return True
+        for png_bytes, path, spread in shots:
+            self._store_page(page_num, png_bytes, path, spread=spread)
+        logger.info(
+            f"✅ 元素截圖成功: 第 {page_num} 頁"
+            f"{' (跨頁)' if len(shots) > 1 or shots[0][2] else ''}"
+        )
+        return True
+
     def capture_page_with_retry(self, page_num, max_retries=3, full_page=False):
-        """改進的截圖方法，包含重試機制，可選擇全頁截圖"""
+        """
+        改進的截圖方法，包含重試機制，可選擇全頁截圖
+
+        返回 True 時，self._last_capture_status 標示本次截圖是否為重複頁（見 _dedupe_capture）。
+        """
+        self._last_capture_status = None
         for attempt in range(max_retries):
+            # 瀏覽器已卡住或崩潰時，剩下的重試都會失敗：先重新啟動並回到這一頁
+            if self._needs_restart() and not self.restart_browser(page_num):
+                return False
             try:
                 logger.info(
                     f"📸 截圖第 {page_num} 頁 (嘗試 {attempt + 1}/{max_retries}) {'(全頁)' if full_page else ''}")
 
-                # 確保在正確的 frame 中 (此函式現在已包含內部驗證)
-                if not self.find_and_switch_to_ebook_iframe():
+                # 截圖路徑
+                screenshot_path = self.output_dir / f"page_{page_num:04d}.png"
+
+                if self.capture_mode == 'element' and not full_page:
+                    if self.capture_page_element(page_num, screenshot_path):
+                        return True
+                    logger.warning("⚠️ 元素截圖失敗，改為截取整個視窗。")
+
+                # 確保在正確的 frame 中 (此函式現在已包含內部驗證)；
+                # 視窗截圖時若輔助物件已回報內容就緒，則留在主文件直接截圖
+                if (full_page or not self._reader_ready()) and not self.find_and_switch_to_ebook_iframe():
                     # 如果找不到 iframe，切換回主內容並嘗試截取整個頁面
-                    self.driver.switch_to.default_content()
+                    self._switch_to_default_content()
                     logger.warning("⚠️ 未能切換到電子書 iframe，將嘗試截取整個頁面。")
                     # 即使 iframe 失敗，仍繼續嘗試截圖主頁面，而不是直接失敗
                 
                 # 等待內容穩定的邏輯已移至 find_and_switch_to_ebook_iframe，此處不再需要
 
-                # 截圖路徑
-                screenshot_path = self.output_dir / f"page_{page_num:04d}.png"
-
                 # 執行截圖
                 if full_page:
-                    success = self.capture_full_page_screenshot(str(screenshot_path))
+                    success = self.capture_full_page_screenshot(str(screenshot_path), page_num)
                 else:
-                    self.driver.save_screenshot(str(screenshot_path))
-                    success = screenshot_path.exists() and screenshot_path.stat().st_size > 1024 # 確保檔案大小至少 > 1KB
+                    # 只在瀏覽器執行緒取得 PNG 位元組，驗證與寫檔交給背景寫入器（或依 async_write 直接寫入）
+                    # 翻頁後像素比對的最後一張截圖即為目前畫面，不必再截一次
+                    png_bytes, self._settled_png = self._settled_png, None
+                    if png_bytes is None:
+                        with self.metrics.span("screenshot"):
+                            png_bytes = self.driver.get_screenshot_as_png()
+                    success = len(png_bytes) > 1024 # 確保截圖大小至少 > 1KB
+                    if success and not self._dedupe_capture(page_num, png_bytes):
+                        self._store_page(page_num, png_bytes, screenshot_path)
 
                 # 驗證截圖檔案
                 if success:
@@ -607,7 +1571,11 @@ class BooksCrawler:
                     return True
                 else:
                     logger.warning(f"截圖檔案 {screenshot_path.name} 為空或不存在。")
+                    self._reader_state = None  # 重試時重新確認內容是否就緒
 
+            except (StaleElementReferenceException, NoSuchFrameException) as e:
+                logger.warning(f"截圖時 iframe 已失效 (嘗試 {attempt + 1}): {e}")
+                self._invalidate_reader_state("stale element", keep_tutorial=True)
             except Exception as e:
                 logger.error(f"截圖失敗 (嘗試 {attempt + 1}): {e}", exc_info=True)
                 time.sleep(0.5)
@@ -615,54 +1583,47 @@ class BooksCrawler:
         logger.error(f"❌ 第 {page_num} 頁在 {max_retries} 次嘗試後仍截圖失敗。")
         return False
 
-    def capture_full_page_screenshot(self, filename):
+    @timed("screenshot_full_page")
+    def capture_full_page_screenshot(self, filename, page_num=None):
         """
         截取整個頁面的截圖，包括可滾動區域。
-        此方法會滾動頁面並拼接多張截圖。
+        此方法會滾動頁面，並在記憶體中逐段裁切重疊區域後串流寫出（見 FullPageStitcher）。
+        拼接出的條帶與其他截圖方式相同，經過重複頁比對、重新編碼、頁面儲存與 _on_page_written()。
         """
         logger.info(f"📸 嘗試截取全頁截圖: {filename}")
         try:
-            # 獲取頁面總高度和視窗高度
-            total_height = self.driver.execute_script("return document.body.scrollHeight")
-            viewport_height = self.driver.execute_script("return window.innerHeight")
-            viewport_width = self.driver.execute_script("return window.innerWidth")
-
-            # 儲存所有截圖的列表
-            screenshots = []
-            current_position = 0
-
-            while current_position < total_height:
-                # 滾動到當前位置
-                self.driver.execute_script(f"window.scrollTo(0, {current_position});")
-                time.sleep(0.1) # 等待滾動和渲染
-
-                # 截圖當前可視區域
-                temp_screenshot_path = self.output_dir / "temp_part.png"
-                self.driver.save_screenshot(str(temp_screenshot_path))
-                screenshots.append(Image.open(temp_screenshot_path))
-                os.remove(temp_screenshot_path) # 移除臨時檔案
-
-                current_position += viewport_height
-
-            # 拼接圖片
-            if not screenshots:
+            stitcher = FullPageStitcher(
+                self.driver,
+                max_strip_height=self.config.get('full_page_max_height', 16000),
+            )
+            # 已在 iframe 中時，輔助物件回報的 geometry 即為此 frame 的內容尺寸
+            geometry = None
+            if self._frame_context == 'ebook' and self._reader_state:
+                geometry = self._reader_state.get('geometry')
+            outputs = stitcher.capture(filename, geometry=geometry)
+            if not outputs:
                 logger.error("❌ 未能截取任何部分截圖。")
                 return False
-
-            # 計算最終圖片的高度
-            # 這裡需要考慮到最後一張截圖可能不是完整視窗高度
-            final_height = sum(img.height for img in screenshots)
-            
-            # 創建一個新的空白圖片，用於拼接
-            full_image = Image.new('RGB', (viewport_width, final_height))
-
-            y_offset = 0
-            for img in screenshots:
-                full_image.paste(img, (0, y_offset))
-                y_offset += img.height
-                img.close() # 關閉圖片檔案
-
-            full_image.save(filename)
+            strips = [(path, path.read_bytes()) for path in outputs]
+            if page_num is not None and self._dedupe_capture(page_num, *(data for _, data in strips)):
+                for path in outputs:
+                    path.unlink(missing_ok=True)
+                return True
+            store = self._get_store()
+            written = []
+            for path, data in strips:
+                written += write_page(
+                    data, path, min_size=0, reencode=self._get_encoder(), store=store, metrics=self.metrics,
+                )
+            # 容器格式或重新編碼改了副檔名時，刪除拼接時暫存在輸出目錄中的條帶檔案
+            kept = {Path(target) for target, _ in written} if store.backend == "loose" else set()
+            for path in outputs:
+                if Path(path) not in kept:
+                    Path(path).unlink(missing_ok=True)
+            if page_num is not None:
+                self._on_page_written(page_num, written)
+            if len(outputs) > 1:
+                logger.info(f"✂️ 頁面過高，已拆成 {len(outputs)} 個條帶檔案。")
             logger.info(f"✅ 全頁截圖成功: {filename}")
             return True
 
@@ -670,30 +1631,231 @@ class BooksCrawler:
             logger.error(f"❌ 全頁截圖失敗: {e}", exc_info=True)
             return False
 
+    def _step_and_settle(self, timeout, xpaths=None):
+        """
+        以一次 execute_async_script 完成（可選的）翻頁與渲染穩定偵測，再以像素比對確認畫面不再變化。
+
+        穩定的判斷依序為：
+        1. epub.js iframe 內的 DOM 在 settle_quiet_ms 內沒有任何變動 (MutationObserver)。
+        2. document.fonts.ready 已完成。
+        3. 所有 <img> 的 complete 皆為 True，且內容 (body > div) 已出現。
+        4. 連續兩張截圖的像素雜湊相同（可由 settle_pixel_check 關閉）；最後一張保留為該頁的截圖。
+
+        Args:
+            timeout (float): 最長等待秒數。
+            xpaths (list[str]): 翻頁按鈕候選；None 表示只等待不翻頁。
+
+        Returns:
+            tuple: (輔助物件回傳的結果 dict, 畫面是否已穩定, 等待渲染的秒數)。
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        settle_start = start
+        settled = False
+        result = {}
+        self._reader_state = self._settled_png = None
+        try:
+            self._set_script_timeout(timeout + 1)
+            result = self._reader_call(READER_STEP_JS, {
+                "xpaths": xpaths,
+                "settle": True,
+                "quietMs": self.settle_quiet_ms,
+                "timeoutMs": int(timeout * 1000),
+            }, asynchronous=True) or {}
+            if xpaths is not None and result.get('clicked', -1) < 0:
+                return result, False, 0.0
+            # 點擊與呼叫往返的時間不算在等待渲染內
+            settle_start = max(start, time.monotonic() - result.get('elapsed', 0) / 1000)
+            self._reader_state = result.get('state')
+            settled = bool(result.get('settled'))
+            if not settled:
+                logger.info(
+                    f"⏳ 頁面未在時限內穩定 (fonts={result.get('fonts')}, "
+                    f"images={result.get('images')}, quiet={result.get('quiet')})"
+                )
+
+            # 兩張連續截圖的像素雜湊相同，才視為畫面已穩定
+            if settled and self.settle_pixel_check:
+                settled = False
+                previous = hashlib.md5(self.driver.get_screenshot_as_png()).digest()
+                while time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    png_bytes = self.driver.get_screenshot_as_png()
+                    current = hashlib.md5(png_bytes).digest()
+                    if current == previous:
+                        settled = True
+                        self._settled_png = png_bytes
+                        break
+                    previous = current
+        except Exception as e:
+            logger.warning(f"⚠️ 渲染穩定偵測失敗，改為等待剩餘時間: {e}")
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+
+        elapsed = time.monotonic() - settle_start
+        self.settle_times.append(elapsed)
+        logger.info(f"⏱️ 頁面穩定耗時 {elapsed:.3f} 秒{'' if settled else ' (逾時)'}")
+        return result, settled, elapsed
+
+    def wait_for_page_settle(self, timeout):
+        """
+        等待翻頁後的電子書頁面渲染穩定，取代固定的 time.sleep(delay)（判斷方式見 _step_and_settle）。
+
+        Args:
+            timeout (float): 最長等待秒數（即原本的 delay），逾時後直接繼續截圖。
+
+        Returns:
+            float: 實際等待的秒數。
+        """
+        return self._step_and_settle(timeout)[2]
+
+    def _load_page_turn_strategy(self):
+        """讀取此網域先前成功的翻頁策略，讓新的執行直接跳過探測。"""
+        cache_path = self.config.get('page_turn_cache')
+        if not cache_path or not self._book_domain:
+            return None
+        strategy = (load_json_file(cache_path, {}) or {}).get(self._book_domain)
+        if strategy in NEXT_PAGE_XPATHS:
+            logger.info(f"📌 使用已儲存的翻頁策略 ({self._book_domain}): {strategy}")
+            return strategy
+        return None
+
+    def _save_page_turn_strategy(self, strategy):
+        """將此網域成功的翻頁策略寫入快取檔。"""
+        cache_path = self.config.get('page_turn_cache')
+        if not cache_path or not self._book_domain:
+            return
+        try:
+            strategies = load_json_file(cache_path, {}) or {}
+            if strategies.get(self._book_domain) != strategy:
+                strategies[self._book_domain] = strategy
+                save_json_file(cache_path, strategies)
+        except Exception as e:
+            logger.warning(f"⚠️ 無法儲存翻頁策略: {e}")
+
+    def _next_page_candidates(self):
+        """翻頁按鈕候選：已確認可用的策略排在最前面，失效時在同一次呼叫內改試其餘候選。"""
+        if not self._page_turn_strategy:
+            return list(NEXT_PAGE_XPATHS)
+        return [self._page_turn_strategy] + [x for x in NEXT_PAGE_XPATHS if x != self._page_turn_strategy]
+
+    def _record_page_turn(self, candidates, index):
+        """依輔助物件回報的候選索引更新翻頁策略，返回成功點擊的 XPath 或 None。"""
+        if index is None or index < 0:
+            if self._page_turn_strategy:
+                logger.info(f"🔄 翻頁策略失效: {self._page_turn_strategy}")
+                self._page_turn_strategy = None
+            return None
+        strategy = candidates[index]
+        if strategy != self._page_turn_strategy:
+            if self._page_turn_strategy:
+                logger.info(f"🔄 翻頁策略失效，重新探測: {self._page_turn_strategy}")
+            self._page_turn_strategy = strategy
+            logger.info(f"✅ 成功點擊翻頁按鈕 (策略: {strategy})")
+            self._save_page_turn_strategy(strategy)
+        return strategy
+
+    @timed("page_turn")
+    def click_next_page_button(self):
+        """
+        點擊下一頁按鈕。
+
+        以一次 WebDriver 呼叫依序嘗試已確認可用的策略與其餘候選 XPath，
+        並記住成功的那一個供之後的頁面使用。
+
+        Returns:
+            str | None: 成功點擊的 XPath；找不到任何可點擊的按鈕時返回 None。
+        """
+        self._throttle()
+        self._at_book_start = False
+        candidates = self._next_page_candidates()
+        result = self._reader_call(
+            READER_STEP_JS, {"xpaths": candidates, "settle": False}, asynchronous=True
+        ) or {}
+        # 點擊後內容尚未重新渲染，先前回報的狀態與截圖都已過期
+        self._reader_state = self._settled_png = None
+        index = result.get('clicked')
+        if index is None or index < 0:
+            index = self._wait_for_next_button(candidates)
+        return self._record_page_turn(candidates, index)
+
+    def _wait_for_next_button(self, candidates):
+        """
+        一次探測找不到可點擊的翻頁按鈕時（例如工具列暫時隱藏、尚未載入），
+        同時等待所有候選最多 NEXT_BUTTON_WAIT 秒，出現即點擊。
+
+        Returns:
+            int: 被點擊的候選索引；仍找不到時返回 -1。
+        """
+        index, button = self.wait_for_any([(By.XPATH, xpath) for xpath in candidates], NEXT_BUTTON_WAIT)
+        if button is None:
+            return -1
+        button.click()
+        self._reader_state = self._settled_png = None
+        return index
+
+    def turn_page(self, delay):
+        """
+        翻到下一頁並依 settle_mode 等待頁面就緒。
+
+        adaptive 模式下，點擊翻頁、等待渲染穩定與讀取新位置合併為一次 WebDriver 呼叫，
+        像素比對的最後一張截圖直接作為下一頁的截圖。
+
+        Returns:
+            str | None: 成功點擊的 XPath；找不到翻頁按鈕時返回 None。
+        """
+        if self.settle_mode != 'adaptive':
+            strategy = self.click_next_page_button()
+            if strategy:
+                self._wait_after_turn(delay)
+            return strategy
+
+        print(f"等待頁面渲染穩定 (最多 {delay} 秒)...")
+        self._throttle()
+        self._at_book_start = False
+        start = time.monotonic()
+        candidates = self._next_page_candidates()
+        result, _, settle_seconds = self._step_and_settle(delay, candidates)
+        index = result.get('clicked')
+        if index is None or index < 0:
+            index = self._wait_for_next_button(candidates)
+            if index >= 0:
+                settle_seconds = self.wait_for_page_settle(delay)
+        self.metrics.record("page_turn", time.monotonic() - start - settle_seconds)
+        strategy = self._record_page_turn(candidates, index)
+        if strategy:
+            self.metrics.record("settle", settle_seconds)
+        return strategy
+
+    def probe_page_settled(self, reset=False):
+        """
+        wait_for_page_settle() 的非阻塞版本：立即回報頁面是否已渲染穩定，供多分頁輪詢。
+
+        Args:
+            reset (bool): 剛翻頁時傳入 True，重新開始計算 DOM 靜止時間。
+        """
+        probe = self._reader_call(READER_PROBE_JS, self.settle_quiet_ms, reset) or {}
+        if probe.get('state'):
+            self._reader_state = probe['state']
+        return bool(probe.get('settled'))
+
+    @timed("settle")
+    def _wait_after_turn(self, delay):
+        """翻頁後依 settle_mode 等待頁面就緒。"""
+        if self.settle_mode == 'adaptive':
+            print(f"等待頁面渲染穩定 (最多 {delay} 秒)...")
+            self.wait_for_page_settle(delay)
+        else:
+            print(f"等待 {delay} 秒後截取下一頁...")
+            time.sleep(delay)
+
     def smart_next_page(self):
         """智慧翻頁方法"""
         try:
-            # 方法1: 嘗試點擊下一頁按鈕
-            next_buttons = [
-                "//button[contains(@class, 'next')]",
-                "//button[contains(@class, 'right')]",
-                "//div[contains(@class, 'viewer-right')]",
-                "//a[contains(@class, 'next')]",
-                "//*[@aria-label='Next page']",
-                "//*[@id='next-page']"
-            ]
-
-            # 優先切換回主內容
-            self.driver.switch_to.default_content()
-            for xpath in next_buttons:
-                try:
-                    # 使用 WebDriverWait 提高穩定性
-                    next_btn = self.wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
-                    next_btn.click()
-                    logger.info(f"✅ 成功點擊翻頁按鈕 (策略: {xpath})")
-                    return True
-                except Exception:
-                    continue # 嘗試下一個策略
+            # 方法1: 點擊下一頁按鈕
+            if self.click_next_page_button():
+                return True
 
             # 方法2: 使用鍵盤右鍵
             ActionChains(self.driver).send_keys(Keys.ARROW_RIGHT).perform()
@@ -733,60 +1895,106 @@ class BooksCrawler:
         except Exception as e:
             logger.error(f"❌ 儲存診斷快照失敗 ({filename_prefix}): {e}")
 
-    def auto_capture_mode(self, total_pages=None, delay=5):
-        """自動截圖模式 - 智慧分頁版"""
+    def auto_capture_mode(self, total_pages=None, delay=5, start_page=1, stop_at=None):
+        """
+        自動截圖模式 - 智慧分頁版
+
+        Args:
+            total_pages (int): 截到第幾頁為止（頁碼上限，續傳時亦同）。
+            delay (float): 每頁等待秒數；adaptive 模式下為最長等待時間。
+            start_page (int): 目前畫面對應的頁碼，續傳時由 resume_capture() 指定。
+            stop_at (dict): 翻到此位置 {cfi, percentage} 時停止且不截圖（分段截圖時為下一段的起點）。
+
+        Returns:
+            dict | None: {"output_dir", "successful", "failed_pages", "duplicate_pages"}；
+            找不到電子書 iframe 而無法開始時返回 None。
+        """
         print("\n" + "="*60)
         print("📸 自動截圖模式 (智慧分頁)")
         print("="*60)
-        print(f"⏱️ 每頁間隔 {delay} 秒")
+        if self.settle_mode == 'adaptive':
+            print(f"⏱️ 偵測頁面渲染穩定後截圖 (最多等待 {delay} 秒)")
+        else:
+            print(f"⏱️ 每頁間隔 {delay} 秒")
         print("="*60)
         print("\n✅ 已自動開始截圖流程...")
         # 確保已切換到 iframe
         if not self.find_and_switch_to_ebook_iframe():
             logger.error("❌ 無法開始截圖，因為找不到電子書 iframe。")
-            return
+            return None
+        self._open_assembler(start_page)
+        self._capture_delay = delay
 
-        page_num = 1
+        page_num = start_page
         successful_pages = 0
         failed_pages = []
+        duplicate_pages = []
+        unchanged_count = 0
+        self.settle_times = []
 
         while True:
             if total_pages is not None and page_num > total_pages:
                 break
+            if stop_at and page_num > start_page and self._reached_location(stop_at):
+                print(f"⏹️ 已到達下一段的起點，本段截到第 {page_num - 1} 頁。")
+                break
             print(f"\n進度: [第 {page_num} 頁]")
-            if self.capture_page_with_retry(page_num):
+            captured = self.capture_page_with_retry(page_num)
+            if captured and self._last_capture_status == 'unchanged':
+                # 畫面與上一頁相同：翻頁可能沒有生效，頁碼不前進並重試翻頁
+                unchanged_count += 1
+                logger.info(f"🔁 翻頁後仍停在第 {self._last_capture_ref} 頁 (連續 {unchanged_count} 次)")
+                if unchanged_count >= self.duplicate_end_threshold:
+                    print(f"📕 連續 {unchanged_count} 次翻頁後仍停在同一頁，判定已到書末。")
+                    break
+                if not self._turn_or_restart(delay, page_num):
+                    break
+                continue
+            unchanged_count = 0
+
+            if captured:
                 successful_pages += 1
+                self.metrics.count_page()
+                if self._created_at is not None:
+                    self.metrics.record("cold_start", time.monotonic() - self._created_at)
+                    self._created_at = None
+                if self._last_capture_status == 'duplicate':
+                    duplicate_pages.append(page_num)
+                    if self.assembler:
+                        self.assembler.duplicate(page_num, self._last_capture_ref)
+                if self.manifest:
+                    self.manifest.record_location(page_num, self.get_current_location(cached=True))
+                if not self._govern_memory(page_num):
+                    break
             else:
                 failed_pages.append(page_num)
                 logger.error(f"❌ 第 {page_num} 頁截圖失敗")
+                if self.manifest:
+                    self.manifest.record_failure(page_num, "capture failed")
+                if self.assembler:
+                    self.assembler.skip(page_num)
 
             # 智慧分頁邏輯：嘗試尋找並點擊下一頁按鈕，如果找不到則結束
-            try:
-                self.driver.switch_to.default_content()
-                next_buttons_xpaths = [
-                    "//button[contains(@class, 'next')]",
-                    "//button[contains(@class, 'right')]",
-                    "//div[contains(@class, 'viewer-right')]",
-                    "//a[contains(@class, 'next')]",
-                    "//*[@aria-label='Next page']",
-                    "//*[@id='next-page']"
-                ]
-                next_button_found = False
-                for xpath in next_buttons_xpaths:
-                    try:
-                        next_btn = self.driver.find_element(By.XPATH, xpath)
-                        next_btn.click()
-                        next_button_found = True
-                        break
-                    except Exception:
-                        continue
-                if not next_button_found:
-                    break
-                print(f"等待 {delay} 秒後截取下一頁...")
-                time.sleep(delay)
-                page_num += 1
-            except Exception as e:
+            if not self._turn_or_restart(delay, page_num + 1):
                 break
+            page_num += 1
+
+        # 等待背景寫入完成，並將寫入失敗的頁面併入摘要
+        write_failures = {}
+        if self.writer:
+            print("\n💾 等待截圖寫入完成...")
+            self.writer.flush()
+            write_failures = self.writer.pop_failures()
+            for failed_page in sorted(write_failures):
+                if self.manifest:
+                    self.manifest.record_failure(failed_page, write_failures[failed_page])
+                if failed_page not in failed_pages:
+                    successful_pages -= 1
+                    failed_pages.append(failed_page)
+            failed_pages.sort()
+        book_path = self.assembler.path if self.assembler else None
+        self._close_assembler()
+        self._close_store()
 
         # 顯示結果摘要
         print("\n" + "="*60)
@@ -796,14 +2004,96 @@ class BooksCrawler:
         print(f"❌ 失敗: {len(failed_pages)} 頁")
         if failed_pages:
             print(f"失敗頁面: {failed_pages}")
+        for failed_page, reason in sorted(write_failures.items()):
+            print(f"💾 第 {failed_page} 頁寫入失敗: {reason}")
+        if duplicate_pages:
+            print(f"🔁 重複頁 (未另外寫入): {duplicate_pages}")
+        if book_path:
+            print(f"📕 已組成: {book_path}")
+        if self.memory_reloads:
+            print(f"🧹 因記憶體重新載入閱讀器: {self.memory_reloads} 次")
+        if self.restarts:
+            print(f"🔄 瀏覽器重新啟動: {len(self.restarts)} 次")
+            for restart in self.restarts:
+                print(f"   第 {restart['page']} 頁: {restart['reason']}")
+        if self.watchdog:
+            stats = self.watchdog.stats()
+            peak = f"，瀏覽器峰值記憶體 {stats['peak_rss_mb']} MB" if stats['peak_rss_mb'] else ""
+            print(
+                f"🩺 WebDriver 指令: {stats['commands']} 次，最慢 {stats['slowest_seconds']}s "
+                f"({stats['slowest_command']}){peak}"
+            )
+        if self.ocr:
+            stats = self.ocr.stats()  # _close_store() 已等待 OCR 完成
+            print(
+                f"🔤 OCR: {stats['processed']} 頁 (快取命中 {stats['cache_hits']}，失敗 {stats['failures']})，"
+                f"{stats['pages_per_second_per_core']} 頁/秒/核心"
+            )
+        if self.settle_times:
+            ordered = sorted(self.settle_times)
+            p50 = ordered[len(ordered) // 2]
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            print(f"⏱️ 頁面穩定耗時: p50 {p50:.2f}s / p95 {p95:.2f}s / 最長 {ordered[-1]:.2f}s")
+        print("⏱️ 各階段耗時 (本次執行累計):")
+        for line in self.metrics.format_table():
+            print(f"   {line}")
+        self.metrics.save()
         print(f"📁 檔案位置: {self.output_dir}")
+        return {
+            "output_dir": str(self.output_dir),
+            "successful": successful_pages,
+            "failed_pages": failed_pages,
+            "duplicate_pages": duplicate_pages,
+            "restarts": list(self.restarts),
+        }
+
+    def _turn_or_restart(self, delay, next_page):
+        """
+        翻到下一頁；翻頁失敗且 watchdog 判定瀏覽器異常時，重新啟動瀏覽器並直接回到第 next_page 頁。
+
+        Returns:
+            bool: 已在第 next_page 頁時返回 True；到達書末或無法恢復時返回 False。
+        """
+        try:
+            if self.turn_page(delay):
+                return True
+        except Exception as e:
+            logger.warning(f"⚠️ 翻頁失敗: {e}")
+        return self._needs_restart() and self.restart_browser(next_page)
 
 
     def close(self):
         """關閉瀏覽器"""
+        if self.writer:
+            try:
+                self.writer.close()
+                for failed_page, reason in sorted(self.writer.pop_failures().items()):
+                    logger.error(f"❌ 第 {failed_page} 頁寫入失敗: {reason}")
+            except Exception as e:
+                logger.warning(f"關閉截圖寫入器時出錯: {e}")
+            self.writer = None
+        self._close_assembler()
+        self._close_store()
+        if self.encoder:
+            self.encoder.close()
+            self.encoder = None
+        if self.ocr:
+            try:
+                self.ocr.close()
+            except Exception as e:
+                logger.warning(f"關閉 OCR 階段時出錯: {e}")
+            self.ocr = None
+        if self.watchdog:
+            self.watchdog.close()
+        if self._owns_metrics:
+            self.metrics.close()
+        if self.driver and not self._owns_driver:
+            return
         if self.driver:
             try:
                 self.driver.quit()
                 logger.info("瀏覽器已關閉")
             except Exception as e:
                 logger.warning(f"關閉瀏覽器時出錯: {e}")
+        if self.profile:
+            self.profile.release()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+縮短瀏覽器冷啟動時間的輔助功能：
+
+- WebDriver 執行檔路徑快取：Selenium Manager 只在第一次解析（可能需要連網下載），之後直接使用快取的路徑。
+- 持久化的瀏覽器設定檔：保留快取、cookies 與閱讀器的教學已讀狀態，同一目錄同時只給一個瀏覽器使用。
+- 第三方請求封鎖：以 CDP Network.setBlockedURLs 擋掉廣告、追蹤與分析腳本（Chrome / Edge）。
+"""
+
+import io
+import shutil
+import logging
+import threading
+from pathlib import Path
+
+from selenium.webdriver.common.driver_finder import DriverFinder
+
+from src.utils import load_json_file, save_json_file
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+# 閱讀與登入不需要的廣告、追蹤與分析服務（CDP URL 樣式，* 為萬用字元）
+DEFAULT_BLOCKED_URLS = [
+    "*googletagmanager.com*",
+    "*google-analytics.com*",
+    "*googleadservices.com*",
+    "*googlesyndication.com*",
+    "*doubleclick.net*",
+    "*adservice.google.*",
+    "*connect.facebook.net*",
+    "*facebook.com/tr*",
+    "*analytics.tiktok.com*",
+    "*clarity.ms*",
+    "*hotjar.com*",
+    "*scorecardresearch.com*",
+    "*criteo.com*",
+    "*criteo.net*",
+    "*taboola.com*",
+    "*outbrain.com*",
+    "*tagtoo.com*",
+]
+
+PROFILE_LOCK_NAME = ".books_profile.lock"
+# 複製設定檔作為新目錄的種子時略過瀏覽器自己的鎖定檔
+_PROFILE_SEED_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "parent.lock", ".parentlock", "lock", "Crashpad", PROFILE_LOCK_NAME,
+)
+# 瀏覽器池平行啟動時，避免兩個執行緒同時建立同一個設定檔目錄
+_profile_create_lock = threading.Lock()
+
+
+def resolve_driver_path(browser, service, options, cache_file=None):
+    """
+    取得 WebDriver 執行檔路徑：優先使用快取中仍存在的路徑，否則以 Selenium Manager 解析並寫入快取。
+
+    Args:
+        browser (str): "chrome"、"edge" 或 "firefox"，作為快取的鍵。
+        service: 尚未指定路徑的 Service，供 Selenium Manager 解析。
+        options: 瀏覽器 Options。
+        cache_file (str): 快取檔路徑；未設定時不快取，每次都交給 Selenium Manager。
+
+    Returns:
+        str | None: 執行檔路徑；解析失敗時返回 None，由 Selenium 在啟動時自行處理。
+    """
+    cache = (load_json_file(cache_file, {}) or {}) if cache_file else {}
+    cached = cache.get(browser)
+    if cached and Path(cached).is_file():
+        logger.info(f"📌 使用快取的 WebDriver: {cached}")
+        return cached
+
+    try:
+        path = DriverFinder.get_path(service, options)
+    except Exception as e:
+        logger.warning(f"⚠️ Selenium Manager 無法解析 {browser} 的 WebDriver: {e}")
+        return None
+    if cache_file:
+        cache[browser] = str(Path(path).resolve())
+        save_json_file(cache_file, cache)
+        logger.info(f"💾 已快取 WebDriver 路徑: {cache[browser]}")
+    return path
+
+
+def forget_driver_path(browser, cache_file):
+    """移除快取的 WebDriver 路徑（例如瀏覽器更新後版本不符），下次啟動重新解析。"""
+    if not cache_file:
+        return
+    cache = load_json_file(cache_file, {}) or {}
+    if cache.pop(browser, None) is not None:
+        save_json_file(cache_file, cache)
+        logger.info(f"♻️ 已清除 {browser} 的 WebDriver 路徑快取")
+
+
+def close_service_log(service):
+    """
+    關閉 Service 建立時開啟的日誌檔（log_output 為路徑時開啟的檔案，或預設的 os.devnull）。
+    Service.stop() 也會關閉，但未啟動的 Service 呼叫 stop() 會出錯；重複關閉無害。
+    """
+    log_output = getattr(service, 'log_output', None)
+    if isinstance(log_output, io.IOBase):
+        log_output.close()
+
+
+def _try_lock(path):
+    handle = open(path, 'a+')
+    try:
+        if fcntl:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+class BrowserProfile:
+    """
+    持久化的瀏覽器設定檔目錄。
+
+    同一個目錄同時只能給一個瀏覽器使用（以鎖定檔判斷，行程結束時自動釋放）；已被占用時
+    依序改用 <目錄>-2、<目錄>-3 ...。新建立的目錄以第一個目錄的內容為種子，
+    瀏覽器池中的每個瀏覽器因此都能沿用已登入的 cookies 與閱讀器狀態。
+    """
+
+    def __init__(self, base_dir, max_slots=16):
+        self.base_dir = Path(base_dir).resolve()
+        self.max_slots = max_slots
+        self.path = None
+        self._lock = None
+
+    def _slot_dir(self, slot):
+        return self.base_dir if slot == 1 else self.base_dir.with_name(f"{self.base_dir.name}-{slot}")
+
+    def acquire(self):
+        """
+        鎖定一個可用的設定檔目錄。
+
+        Returns:
+            Path | None: 設定檔目錄；所有目錄都被占用時返回 None（改用暫時的設定檔）。
+        """
+        for slot in range(1, self.max_slots + 1):
+            path = self._slot_dir(slot)
+            with _profile_create_lock:
+                if not path.exists():
+                    if slot > 1 and self.base_dir.is_dir():
+                        shutil.copytree(self.base_dir, path, ignore=_PROFILE_SEED_IGNORE)
+                        logger.info(f"🌱 以 {self.base_dir.name} 為種子建立設定檔: {path.name}")
+                    else:
+                        path.mkdir(parents=True)
+            lock = _try_lock(path / PROFILE_LOCK_NAME)
+            if lock is not None:
+                self.path, self._lock = path, lock
+                return path
+        logger.warning(f"⚠️ {self.base_dir} 的 {self.max_slots} 個設定檔目錄都在使用中，改用暫時的設定檔。")
+        return None
+
+    def has_marker(self, name):
+        """設定檔中是否已記錄某個狀態（例如某網域的教學引導已看過）。"""
+        return self.path is not None and (self.path / f".books_{name}").exists()
+
+    def set_marker(self, name):
+        if self.path is not None:
+            (self.path / f".books_{name}").touch()
+
+    def release(self):
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+        self.path = None
+
+
+def apply_url_blocklist(driver, patterns):
+    """
+    以 CDP 封鎖符合樣式的請求，只作用於目前的分頁（新分頁需再次呼叫）。
+
+    Returns:
+        bool: 已套用時返回 True；瀏覽器不支援 CDP (Firefox) 或沒有樣式時返回 False。
+    """
+    if not patterns or not hasattr(driver, 'execute_cdp_cmd'):
+        return False
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ 無法套用請求封鎖清單: {e}")
+        return False
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import logging
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageChops
+
+logger = logging.getLogger(__name__)
+
+IMAGE_MODES = ("color", "grayscale", "bw", "palette")
+IMAGE_FORMATS = ("png", "webp", "jpeg")
+_SUFFIXES = {"png": ".png", "webp": ".webp", "jpeg": ".jpg"}
+
+
+def encode_options(config):
+    """從 config 取出編碼設定（見 load_config 的 image_* 鍵）。"""
+    return {
+        "mode": config.get('image_mode', 'color'),
+        "format": config.get('image_format', 'png'),
+        "png_compress_level": config.get('png_compress_level'),
+        "jpeg_quality": config.get('jpeg_quality', 85),
+        "palette_colors": config.get('palette_colors', 16),
+        "bw_threshold": config.get('bw_threshold', 160),
+        "trim_margins": config.get('trim_margins', False),
+        "trim_padding": config.get('trim_padding', 8),
+    }
+
+
+def needs_encoding(options):
+    """設定與瀏覽器原始輸出（全彩 PNG）相同時不需重新編碼。"""
+    return (
+        options["mode"] != "color"
+        or options["format"] != "png"
+        or options["png_compress_level"] is not None
+        or options["trim_margins"]
+    )
+
+
+def trim_margins(img, padding=8, tolerance=16):
+    """
+    裁掉與背景色相近的空白邊界，保留 padding 像素。整頁空白時原樣返回。
+
+    背景色取四角灰階值的中位數，單一角落有頁碼或裝飾時不會被誤當成背景。
+    """
+    gray = img.convert('L')
+    right, bottom = gray.width - 1, gray.height - 1
+    corners = sorted(gray.getpixel(xy) for xy in ((0, 0), (right, 0), (0, bottom), (right, bottom)))
+    background = Image.new('L', gray.size, corners[len(corners) // 2])
+    diff = ImageChops.difference(gray, background).point(lambda v: 255 if v > tolerance else 0)
+    bbox = diff.getbbox()
+    if not bbox:
+        return img
+    left, top, right, bottom = bbox
+    return img.crop((
+        max(0, left - padding), max(0, top - padding),
+        min(img.width, right + padding), min(img.height, bottom + padding),
+    ))
+
+
+def encode_page(data, target, options):
+    """
+    依設定重新編碼一頁（可在子行程中執行）。
+
+    Args:
+        data (bytes): 原始 PNG。
+        target (Path): 原本的輸出路徑；副檔名會依 format 調整。
+        options (dict): encode_options() 的結果。
+
+    Returns:
+        tuple: (編碼後的位元組, 輸出路徑)
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+    if options["trim_margins"]:
+        img = trim_margins(img, options["trim_padding"])
+
+    mode = options["mode"]
+    fmt = options["format"]
+    if mode == "grayscale":
+        img = img.convert('L')
+    elif mode == "bw":
+        threshold = options["bw_threshold"]
+        img = img.convert('L').point(lambda v: 255 if v >= threshold else 0).convert('1', dither=Image.Dither.NONE)
+    elif mode == "palette":
+        img = img.convert('RGB').quantize(colors=options["palette_colors"], dither=Image.Dither.NONE)
+    elif img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+
+    buf = io.BytesIO()
+    if fmt == "jpeg":
+        # JPEG 不支援 1-bit 與調色盤
+        if img.mode == 'P':
+            img = img.convert('RGB')
+        elif img.mode == '1':
+            img = img.convert('L')
+        img.save(buf, format='JPEG', quality=options["jpeg_quality"], optimize=True)
+    elif fmt == "webp":
+        if img.mode in ('1', 'P'):
+            img = img.convert('L' if img.mode == '1' else 'RGB')
+        img.save(buf, format='WEBP', lossless=True, method=4)
+    else:
+        level = options["png_compress_level"]
+        img.save(buf, format='PNG', compress_level=6 if level is None else level)
+    return buf.getvalue(), Path(target).with_suffix(_SUFFIXES[fmt])
+
+
+class PageEncoder:
+    """
+    截圖後的編碼階段，作為 ScreenshotWriter / write_page 的 reencode 函式使用。
+
+    解碼、量化、裁邊與壓縮都是 CPU 密集且受 GIL 限制，因此在行程池中執行；
+    寫入執行緒只負責送出並等待結果，寫入執行緒數不少於行程數時即可讓所有核心同時編碼。
+    """
+
+    def __init__(self, options, workers=None):
+        if options["mode"] not in IMAGE_MODES:
+            raise ValueError(f"未知的 image_mode: {options['mode']}（可用: {', '.join(IMAGE_MODES)}）")
+        if options["format"] not in IMAGE_FORMATS:
+            raise ValueError(f"未知的 image_format: {options['format']}（可用: {', '.join(IMAGE_FORMATS)}）")
+        self.options = options
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def __call__(self, data, target):
+        return self._executor.submit(encode_page, data, target, self.options).result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import hashlib
+from collections import namedtuple
+from PIL import Image, ImageChops, ImageStat
+
+# digest: 解碼後灰階像素的 SHA-1，用於判斷完全相同的頁面
+# thumbnail: 縮小的灰階圖，用於容許少量差異（游標、反鋸齒）的比較
+PageFingerprint = namedtuple('PageFingerprint', ['digest', 'thumbnail'])
+
+THUMBNAIL_WIDTH = 128
+
+
+def page_fingerprint(*png_images):
+    """
+    計算一次截圖（可能含多張，例如跨頁的兩個 iframe）的指紋。
+
+    所有像素運算都在 PIL 的 C 實作中整批完成（convert / tobytes / resize），
+    不在 Python 中逐像素迴圈。
+    """
+    digest = hashlib.sha1()
+    thumbnail = None
+    for png_bytes in png_images:
+        with Image.open(io.BytesIO(png_bytes)) as img:
+            gray = img.convert('L')
+        digest.update(f"{gray.width}x{gray.height}".encode())
+        digest.update(gray.tobytes())
+        if thumbnail is None:
+            height = max(1, round(gray.height * THUMBNAIL_WIDTH / gray.width))
+            thumbnail = gray.resize((THUMBNAIL_WIDTH, height), Image.BILINEAR)
+    return PageFingerprint(digest.hexdigest(), thumbnail)
+
+
+def is_same_page(a, b, tolerance=2.0):
+    """
+    判斷兩個指紋是否為同一頁。
+
+    Args:
+        tolerance (float): 縮圖灰階差異的 RMS 上限（0-255）；0 表示必須完全相同。
+    """
+    if a is None or b is None:
+        return False
+    if a.digest == b.digest:
+        return True
+    if tolerance <= 0 or a.thumbnail.size != b.thumbnail.size:
+        return False
+    diff = ImageChops.difference(a.thumbnail, b.thumbnail)
+    return ImageStat.Stat(diff).rms[0] <= tolerance
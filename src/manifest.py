@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+
+from src.utils import load_json_file, save_json_file
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+CHECKPOINT_SECONDS = 5
+
+
+class BookManifest:
+    """
+    每本書輸出目錄中的 manifest.json：記錄書籍網址、已截取的頁面、內容雜湊、
+    每頁在閱讀器中的位置 (CFI) 與失敗頁面。
+
+    更新先保留在記憶體中，距離上次寫入超過 checkpoint_seconds 秒時才以原子方式整份寫回磁碟（檢查點），
+    避免每頁都重寫整份 JSON；flush() 立即寫入尚未保存的更新，擷取流程在每本書結束與關閉時呼叫。
+    程式中斷後可由 --resume 從最後一個檢查點接續（之後的頁面會重新截取）。
+    背景寫入執行緒與瀏覽器執行緒都會更新，所有操作皆以鎖保護。
+    """
+
+    def __init__(self, output_dir, book_url=None, checkpoint_seconds=CHECKPOINT_SECONDS):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_FILENAME
+        self.checkpoint_seconds = checkpoint_seconds
+        self._dirty = False
+        self._saved_at = None
+        self._lock = threading.Lock()
+        now = datetime.now().isoformat(timespec='seconds')
+        self.data = load_json_file(self.path) or {
+            "book_url": book_url,
+            "created_at": now,
+            "updated_at": now,
+            "pages": {},
+            "failures": {},
+        }
+        if book_url and not self.data.get("book_url"):
+            self.data["book_url"] = book_url
+
+    @classmethod
+    def exists(cls, output_dir):
+        return (Path(output_dir) / MANIFEST_FILENAME).exists()
+
+    @property
+    def book_url(self):
+        return self.data.get("book_url")
+
+    def _page(self, page_num):
+        return self.data["pages"].setdefault(str(page_num), {})
+
+    def _save(self, force=False):
+        """標記有未保存的更新；距離上次寫入已超過 checkpoint_seconds（或 force）時寫回磁碟。"""
+        self._dirty = True
+        now = time.monotonic()
+        if not force and self._saved_at is not None and now - self._saved_at < self.checkpoint_seconds:
+            return
+        self.data["updated_at"] = datetime.now().isoformat(timespec='seconds')
+        try:
+            save_json_file(self.path, self.data)
+            self._dirty = False
+            self._saved_at = now
+        except Exception as e:
+            logger.warning(f"⚠️ 無法寫入 manifest: {e}")
+
+    def flush(self):
+        """立即寫入尚未保存的更新（檢查點）。"""
+        with self._lock:
+            if self._dirty:
+                self._save(force=True)
+
+    def record_page(self, page_num, written):
+        """
+        記錄已寫入磁碟的頁面。
+
+        Args:
+            written (list): [(path, data)]，一次翻頁可能輸出多個檔案（跨頁拆分）。
+        """
+        with self._lock:
+            entry = self._page(page_num)
+            entry["files"] = [Path(path).name for path, _ in written]
+            entry["sha256"] = [hashlib.sha256(data).hexdigest() for _, data in written]
+            entry["captured_at"] = datetime.now().isoformat(timespec='seconds')
+            self.data["failures"].pop(str(page_num), None)
+            self._save()
+
+    def record_duplicate(self, page_num, of_page):
+        """記錄與先前某頁內容完全相同、未另外寫入磁碟的頁面。"""
+        with self._lock:
+            entry = self._page(page_num)
+            entry["duplicate_of"] = of_page
+            entry["captured_at"] = datetime.now().isoformat(timespec='seconds')
+            self.data["failures"].pop(str(page_num), None)
+            self._save()
+
+    def record_location(self, page_num, location):
+        """記錄頁面在閱讀器中的位置（get_current_location() 的結果）。"""
+        if not location:
+            return
+        with self._lock:
+            self._page(page_num)["location"] = location
+            self._save()
+
+    def record_failure(self, page_num, reason):
+        with self._lock:
+            self.data["failures"][str(page_num)] = reason
+            self._save()
+
+    def failed_pages(self):
+        with self._lock:
+            return sorted(int(page) for page in self.data["failures"])
+
+    def location_of(self, page_num):
+        with self._lock:
+            return (self.data["pages"].get(str(page_num)) or {}).get("location")
+
+    def last_good_page(self):
+        """已寫入檔案（或判定為重複頁）的最大頁碼；尚無任何頁面時返回 0。"""
+        with self._lock:
+            pages = [
+                int(page) for page, entry in self.data["pages"].items()
+                if entry.get("files") or entry.get("duplicate_of")
+            ]
+        return max(pages, default=0)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import logging
+import functools
+import threading
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.utils import save_json_file
+
+logger = logging.getLogger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class _Stopwatch:
+    """記錄多步驟流程中每一步的耗時：lap(step) 記錄距上一次 lap 的時間為 "<prefix>.<step>"。"""
+
+    def __init__(self, metrics, prefix):
+        self.metrics = metrics
+        self.prefix = prefix
+        self._last = time.monotonic()
+
+    def lap(self, step):
+        now = time.monotonic()
+        self.metrics.record(f"{self.prefix}.{step}", now - self._last)
+        self._last = now
+
+
+class Metrics:
+    """
+    一次執行的各階段耗時（setup_driver、login、navigate_to_book、截圖、寫入、翻頁、等待渲染...）。
+
+    可由多個執行緒（背景寫入、瀏覽器池）同時記錄。save() 輸出 JSON（每階段 p50/p95/max 與頁/分鐘），
+    並可選擇輸出 OpenMetrics 文字檔或以 HTTP 提供 /metrics。
+    """
+
+    def __init__(self, json_path=None, openmetrics_path=None):
+        self.json_path = Path(json_path) if json_path else None
+        self.openmetrics_path = Path(openmetrics_path) if openmetrics_path else None
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._spans = {}
+        self.pages = 0
+        self._server = None
+
+    @classmethod
+    def for_run(cls, config):
+        """依 config 建立本次執行的 Metrics：metrics_dir 下的 run_<時間戳>_<pid>.json。"""
+        metrics_dir = config.get('metrics_dir')
+        if not metrics_dir:
+            metrics = cls()
+        else:
+            stem = f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+            metrics = cls(
+                Path(metrics_dir) / f"{stem}.json",
+                Path(metrics_dir) / f"{stem}.prom" if config.get('metrics_openmetrics') else None,
+            )
+        if config.get('metrics_port'):
+            metrics.serve(config['metrics_port'])
+        return metrics
+
+    def record(self, phase, seconds):
+        with self._lock:
+            self._spans.setdefault(phase, []).append(seconds)
+
+    @contextmanager
+    def span(self, phase):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(phase, time.monotonic() - start)
+
+    def stopwatch(self, prefix):
+        return _Stopwatch(self, prefix)
+
+    def count_page(self, count=1):
+        with self._lock:
+            self.pages += count
+
+    def summary(self):
+        """返回 {"started_at", "elapsed", "pages", "pages_per_minute", "phases": {階段: {count, total, p50, p95, max}}}。"""
+        with self._lock:
+            spans = {phase: sorted(values) for phase, values in self._spans.items()}
+            pages = self.pages
+        elapsed = time.monotonic() - self._started
+        return {
+            "started_at": self.started_at,
+            "elapsed": round(elapsed, 3),
+            "pages": pages,
+            "pages_per_minute": round(pages / elapsed * 60, 2) if elapsed else 0.0,
+            "phases": {
+                phase: {
+                    "count": len(ordered),
+                    "total": round(sum(ordered), 4),
+                    "p50": round(_percentile(ordered, 0.5), 4),
+                    "p95": round(_percentile(ordered, 0.95), 4),
+                    "max": round(ordered[-1], 4),
+                }
+                for phase, ordered in sorted(spans.items())
+            },
+        }
+
+    def format_table(self):
+        """以文字表格列出各階段耗時，依總耗時排序。"""
+        summary = self.summary()
+        phases = sorted(summary["phases"].items(), key=lambda item: item[1]["total"], reverse=True)
+        lines = [f"{'階段':<28} {'次數':>6} {'總計(s)':>9} {'p50(s)':>8} {'p95(s)':>8} {'最長(s)':>8}"]
+        for phase, stats in phases:
+            lines.append(
+                f"{phase:<28} {stats['count']:>6} {stats['total']:>9.2f} "
+                f"{stats['p50']:>8.3f} {stats['p95']:>8.3f} {stats['max']:>8.3f}"
+            )
+        lines.append(f"共 {summary['pages']} 頁，{summary['pages_per_minute']} 頁/分鐘")
+        return lines
+
+    def openmetrics(self):
+        """OpenMetrics 文字格式。"""
+        summary = self.summary()
+        lines = [
+            "# TYPE books_phase_seconds summary",
+            "# UNIT books_phase_seconds seconds",
+            "# HELP books_phase_seconds Duration of each crawler phase.",
+        ]
+        for phase, stats in summary["phases"].items():
+            label = f'phase="{phase}"'
+            lines.append(f'books_phase_seconds{{{label},quantile="0.5"}} {stats["p50"]}')
+            lines.append(f'books_phase_seconds{{{label},quantile="0.95"}} {stats["p95"]}')
+            lines.append(f"books_phase_seconds_sum{{{label}}} {stats['total']}")
+            lines.append(f"books_phase_seconds_count{{{label}}} {stats['count']}")
+        lines.append("# TYPE books_phase_max_seconds gauge")
+        lines.append("# UNIT books_phase_max_seconds seconds")
+        for phase, stats in summary["phases"].items():
+            lines.append(f'books_phase_max_seconds{{phase="{phase}"}} {stats["max"]}')
+        lines += [
+            "# TYPE books_pages counter",
+            f"books_pages_total {summary['pages']}",
+            "# TYPE books_pages_per_minute gauge",
+            f"books_pages_per_minute {summary['pages_per_minute']}",
+            "# EOF",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def save(self):
+        """寫出 JSON（與可選的 OpenMetrics 檔）；未設定路徑時不做任何事。"""
+        try:
+            if self.json_path:
+                save_json_file(self.json_path, self.summary())
+            if self.openmetrics_path:
+                self.openmetrics_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.openmetrics_path.with_name(self.openmetrics_path.name + '.tmp')
+                tmp_path.write_text(self.openmetrics(), encoding='utf-8')
+                os.replace(tmp_path, self.openmetrics_path)
+        except Exception as e:
+            logger.warning(f"⚠️ 無法寫入效能指標: {e}")
+
+    def serve(self, port, host="127.0.0.1"):
+        """在背景執行緒以 HTTP 提供 /metrics（OpenMetrics 格式）。"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.openmetrics().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            logger.warning(f"⚠️ 無法在 port {port} 提供 /metrics: {e}")
+            return
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"📈 效能指標: http://{host}:{port}/metrics")
+
+    def close(self):
+        self.save()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def timed(phase):
+    """方法裝飾器：以 self.metrics 記錄整個方法的耗時。"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.span(phase):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
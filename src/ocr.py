@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from src.utils import load_json_file, save_json_file
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pytesseract
+except ImportError:  # 未安裝時停用 OCR
+    pytesseract = None
+
+OCR_ENGINE_VERSION = "tesseract-1"
+
+
+def sidecar_path(image_path):
+    """頁面圖片對應的 OCR 結果檔：page_0001.png -> page_0001.ocr.json。"""
+    image_path = Path(image_path)
+    return image_path.with_name(f"{image_path.stem}.ocr.json")
+
+
+def save_sidecar(image_path, result, store=None):
+    """
+    寫出頁面的 OCR 結果。指定 store 時經由頁面儲存寫入（pack / cbz 時存進容器，與頁面放在一起）。
+    """
+    if store is None:
+        save_json_file(sidecar_path(image_path), result)
+        return
+    store.put(sidecar_path(image_path), json.dumps(result, indent=4, ensure_ascii=False).encode('utf-8'))
+
+
+def ocr_image(data, lang):
+    """
+    在子行程中對單張圖片執行 OCR（Tesseract，離線）。
+
+    Returns:
+        dict: {"width", "height", "text", "words": [{"text", "conf", "bbox": [x, y, w, h]}]}
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert('L')
+        result = pytesseract.image_to_data(img, lang=lang, output_type=pytesseract.Output.DICT)
+        width, height = img.size
+
+    words = []
+    lines = {}
+    for i, text in enumerate(result['text']):
+        text = text.strip()
+        if not text:
+            continue
+        words.append({
+            "text": text,
+            "conf": float(result['conf'][i]),
+            "bbox": [result['left'][i], result['top'][i], result['width'][i], result['height'][i]],
+        })
+        key = (result['block_num'][i], result['par_num'][i], result['line_num'][i])
+        lines.setdefault(key, []).append(text)
+    return {
+        "width": width,
+        "height": height,
+        "text": "\n".join(" ".join(parts) for _, parts in sorted(lines.items())),
+        "words": words,
+    }
+
+
+class OcrStage:
+    """
+    截圖後的 OCR 階段。
+
+    由 ScreenshotWriter 的 listener 餵入剛寫好的頁面，在有界的行程池中執行 OCR，
+    截圖流程不必等待。結果以圖片內容的 SHA-256 快取，重新執行或重複頁面不會再跑一次 OCR；
+    每頁輸出 page_NNNN.ocr.json（文字與字詞座標），供組書時嵌入可搜尋的文字層。
+    submit() 傳入頁面儲存時，結果經由該儲存寫入；關閉儲存前須先 flush()。
+    """
+
+    def __init__(self, workers=None, lang="chi_tra", cache_dir="output/.ocr_cache", max_pending=None):
+        if pytesseract is None:
+            raise RuntimeError("未安裝 pytesseract，無法啟用 OCR。")
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.lang = lang
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # 限制排隊中的頁面數，避免 OCR 跟不上時記憶體無限增長
+        self._slots = threading.Semaphore(max_pending or self.workers * 2)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self.processed = 0
+        self.cache_hits = 0
+        self.failures = {}
+        self._started = None
+
+    def _cache_path(self, digest):
+        return self.cache_dir / f"{digest}.json"
+
+    def submit(self, page_num, image_path, data, store=None):
+        """送出一頁；命中快取時立即寫出 sidecar。"""
+        digest = hashlib.sha256(data + f"|{self.lang}|{OCR_ENGINE_VERSION}".encode()).hexdigest()
+        cached = load_json_file(self._cache_path(digest))
+        if cached is not None:
+            save_sidecar(image_path, cached, store)
+            with self._lock:
+                self.cache_hits += 1
+            return
+
+        self._slots.acquire()
+        with self._lock:
+            if self._started is None:
+                self._started = time.monotonic()
+        future = self._executor.submit(ocr_image, data, self.lang)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(lambda f: self._on_done(f, page_num, image_path, digest, store))
+
+    def _on_done(self, future, page_num, image_path, digest, store):
+        try:
+            result = future.result()
+            result["engine"] = OCR_ENGINE_VERSION
+            result["lang"] = self.lang
+            save_json_file(self._cache_path(digest), result)
+            save_sidecar(image_path, result, store)
+            with self._lock:
+                self.processed += 1
+        except Exception as e:
+            logger.error(f"❌ 第 {page_num} 頁 OCR 失敗: {e}")
+            with self._lock:
+                self.failures[page_num] = str(e)
+        finally:
+            with self._lock:
+                self._pending.discard(future)
+            self._slots.release()
+
+    def flush(self):
+        """等待所有已送出的頁面完成 OCR。"""
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return
+            for future in pending:
+                try:
+                    future.result()
+                except Exception:
+                    pass  # 已在 _on_done 中記錄
+            time.sleep(0.01)  # 等待 done callback 更新 _pending
+
+    def stats(self):
+        """返回處理頁數、快取命中數與每核心每秒頁數。"""
+        with self._lock:
+            elapsed = time.monotonic() - self._started if self._started else 0.0
+            rate = self.processed / elapsed / self.workers if elapsed else 0.0
+            return {
+                "processed": self.processed,
+                "cache_hits": self.cache_hits,
+                "failures": len(self.failures),
+                "pages_per_second_per_core": round(rate, 3),
+            }
+
+    def close(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+
+def load_sidecar(image_path, store=None):
+    """讀取頁面的 OCR 結果（指定 store 時從頁面儲存讀取）；尚未產生時返回 None。"""
+    path = sidecar_path(image_path)
+    if store is not None:
+        return json.loads(bytes(store.get(path.name))) if path.name in store else None
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+行程樹的記憶體用量與強制結束（WebDriver 與它啟動的瀏覽器行程）。
+
+以 /proc 讀取，不需額外套件；非 Linux 平台只能處理行程本身，不含子孫行程。
+"""
+
+import os
+import signal
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _children_map():
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                # 第 2 欄 (comm) 可能含空白，從最後一個 ')' 之後解析
+                fields = f.read().rsplit(b')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+def process_tree_pids(pid):
+    """pid 與其所有子孫行程的 pid（父行程在前）；非 Linux 時只有 pid 本身。"""
+    if not os.path.isdir('/proc'):
+        return [pid]
+    children = _children_map()
+    pids, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(children.get(current, []))
+    return pids
+
+
+def process_tree_rss(pid):
+    """pid 與其所有子孫行程的 RSS 總和 (bytes)；非 Linux 時返回 None。"""
+    if not os.path.isdir('/proc'):
+        return None
+    total = 0
+    for current in process_tree_pids(pid):
+        try:
+            with open(f'/proc/{current}/statm') as f:
+                total += int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError):
+            pass
+    return total
+
+
+def kill_process_tree(pid):
+    """強制結束 pid 與其所有子孫行程（子行程先結束，避免被重新啟動或成為孤兒）。"""
+    for current in reversed(process_tree_pids(pid)):
+        try:
+            os.kill(current, getattr(signal, 'SIGKILL', signal.SIGTERM))
+        except OSError as e:
+            logger.debug(f"無法結束行程 {current}: {e}")
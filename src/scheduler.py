@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import time
+import random
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+
+from src.utils import load_json_file, save_json_file
+
+logger = logging.getLogger(__name__)
+
+
+def load_job_file(path):
+    """
+    讀取工作檔。
+
+    - .json：[{"url": ..., "pages": 300, "priority": 1}, ...]
+    - 其他：每行 `網址[,頁數[,優先順序]]`，# 開頭為註解。
+
+    優先順序數字越大越先執行，未指定為 0；頁數未指定則使用 config 的 total_pages。
+    頁數或優先順序不是整數的行會記錄警告並略過，不影響其他工作。
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        entries = load_json_file(path, [])
+    else:
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if not row or not row[0].strip() or row[0].strip().startswith('#'):
+                    continue
+                fields = [field.strip() for field in row]
+                try:
+                    entries.append({
+                        "url": fields[0],
+                        "pages": int(fields[1]) if len(fields) > 1 and fields[1] else None,
+                        "priority": int(fields[2]) if len(fields) > 2 and fields[2] else 0,
+                    })
+                except ValueError:
+                    logger.warning(f"⚠️ {path.name} 第 {reader.line_num} 行格式錯誤，略過: {','.join(row)}")
+    return [entry for entry in entries if entry.get("url")]
+
+
+class RateLimiter:
+    """
+    全域請求速率上限（token bucket），所有工作執行緒共用。
+
+    每次開啟網頁或翻頁前呼叫 acquire()；超過 rate 次/秒時會阻塞等待。
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class JobQueue:
+    """
+    有優先順序、失敗重試（指數退避）且可持久化的書籍工作佇列。
+
+    狀態每次變更都寫回 state_path；程式重新啟動時，上次執行到一半的工作會回到待處理，
+    並記得其輸出目錄，讓 DriverPool 以 resume_capture() 接續。
+    """
+
+    def __init__(self, state_path=None, max_attempts=3, backoff_base=30):
+        self.state_path = Path(state_path) if state_path else None
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self._cond = threading.Condition()
+        self.jobs = []
+        if self.state_path:
+            self.jobs = load_json_file(self.state_path, []) or []
+            for job in self.jobs:
+                if job.get("status") == "running":
+                    job["status"] = "pending"
+                    job["next_attempt_at"] = 0
+
+    def _save(self):
+        if self.state_path:
+            save_json_file(self.state_path, self.jobs)
+
+    def add(self, url, pages=None, priority=0):
+        """加入工作；相同網址已在佇列中時只更新頁數與優先順序。"""
+        with self._cond:
+            for job in self.jobs:
+                if job["url"] == url:
+                    if job["status"] == "pending":
+                        job["pages"] = pages if pages is not None else job.get("pages")
+                        job["priority"] = priority
+                    break
+            else:
+                self.jobs.append({
+                    "url": url,
+                    "pages": pages,
+                    "priority": priority,
+                    "status": "pending",
+                    "attempts": 0,
+                    "next_attempt_at": 0,
+                    "output_dir": None,
+                    "last_error": None,
+                })
+            self._save()
+            self._cond.notify_all()
+
+    def next_job(self):
+        """
+        取出下一個可執行的工作（優先順序高者先）；暫無可執行的工作時等待。
+
+        Returns:
+            dict | None: 工作；所有工作都已結束時返回 None。
+        """
+        with self._cond:
+            while True:
+                now = time.time()
+                pending = [job for job in self.jobs if job["status"] == "pending"]
+                ready = [job for job in pending if job["next_attempt_at"] <= now]
+                if ready:
+                    job = max(ready, key=lambda j: j.get("priority", 0))
+                    job["status"] = "running"
+                    job["started_at"] = datetime.now().isoformat(timespec='seconds')
+                    self._save()
+                    return job
+                running = any(job["status"] == "running" for job in self.jobs)
+                if not pending and not running:
+                    return None
+                timeout = min((job["next_attempt_at"] - now for job in pending), default=None)
+                self._cond.wait(timeout)
+
+    def started(self, job, output_dir):
+        """記錄工作的輸出目錄，供中斷後續傳。"""
+        with self._cond:
+            job["output_dir"] = str(output_dir)
+            self._save()
+
+    def complete(self, job, output_dir=None):
+        with self._cond:
+            job["status"] = "done"
+            if output_dir:
+                job["output_dir"] = str(output_dir)
+            job["finished_at"] = datetime.now().isoformat(timespec='seconds')
+            self._save()
+            self._cond.notify_all()
+
+    def fail(self, job, error):
+        """記錄失敗；未超過 max_attempts 時以指數退避重新排入佇列。"""
+        with self._cond:
+            job["attempts"] += 1
+            job["last_error"] = str(error)
+            if job["attempts"] < self.max_attempts:
+                delay = self.backoff_base * (2 ** (job["attempts"] - 1)) * random.uniform(0.8, 1.2)
+                job["status"] = "pending"
+                job["next_attempt_at"] = time.time() + delay
+                logger.warning(
+                    f"🔁 {job['url']} 失敗（第 {job['attempts']} 次），{delay:.0f} 秒後重試: {error}"
+                )
+            else:
+                job["status"] = "failed"
+                logger.error(f"❌ {job['url']} 已失敗 {job['attempts']} 次，放棄: {error}")
+            self._save()
+            self._cond.notify_all()
+
+    def summary(self):
+        with self._cond:
+            counts = {}
+            for job in self.jobs:
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
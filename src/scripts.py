@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+注入閱讀器頁面的 JavaScript 片段。
+
+集中放在這裡，讓 crawler.py 只負責流程控制；所有腳本都在主文件 (default content)
+中執行，並透過 iframe 的 contentDocument 讀取電子書內容（epub.js 的 iframe 為同源）。
+"""
+
+EBOOK_IFRAME_SELECTOR = "iframe[id^='epubjs-view-']"
+
+# 找出目前顯示中的 epub.js 頁面 iframe（依閱讀順序），供元素截圖使用。
+# 回傳 {views: [{element, left, width, height}], rtl}
+VISIBLE_EBOOK_VIEWS_JS = """
+var frames = Array.prototype.slice.call(document.querySelectorAll("%s"));
+var views = [];
+var rtl = false;
+frames.forEach(function (frame) {
+    var rect = frame.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) { return; }
+    if (rect.right <= 0 || rect.left >= window.innerWidth) { return; }  // 預先渲染、尚未顯示的頁面
+    try {
+        var doc = frame.contentDocument;
+        var root = doc.defaultView.getComputedStyle(doc.body || doc.documentElement);
+        if (root.direction === 'rtl' || (root.writingMode || '').indexOf('vertical-rl') === 0) {
+            rtl = true;
+        }
+    } catch (e) {}
+    views.push({element: frame, left: rect.left, width: rect.width, height: rect.height});
+});
+views.sort(function (a, b) { return a.left - b.left; });
+if (rtl) { views.reverse(); }
+return {views: views, rtl: rtl};
+""" % EBOOK_IFRAME_SELECTOR
+
+# 尋找 epub.js 的 Rendition 物件（具有 currentLocation() 與 display() 的全域物件），
+# 找到後快取在 window.__booksRendition。以下與位置相關的腳本都以此為前導。
+_FIND_RENDITION_JS = """
+function findRendition() {
+    if (window.__booksRendition) { return window.__booksRendition; }
+    var isRendition = function (v) {
+        return v && typeof v === 'object' &&
+            typeof v.currentLocation === 'function' && typeof v.display === 'function';
+    };
+    var candidates = [
+        window.rendition,
+        window.reader && window.reader.rendition,
+        window.book && window.book.rendition
+    ];
+    for (var i = 0; i < candidates.length; i++) {
+        if (isRendition(candidates[i])) { return (window.__booksRendition = candidates[i]); }
+    }
+    for (var key in window) {
+        try {
+            var value = window[key];
+            if (isRendition(value)) { return (window.__booksRendition = value); }
+            if (value && isRendition(value.rendition)) { return (window.__booksRendition = value.rendition); }
+        } catch (e) {}
+    }
+    return null;
+}
+"""
+
+# 讓閱讀器跳到指定位置 (execute_async_script)。arguments[0]: CFI 或 href
+DISPLAY_LOCATION_JS = _FIND_RENDITION_JS + """
+var done = arguments[arguments.length - 1];
+var rendition = findRendition();
+if (!rendition) { done(false); return; }
+Promise.resolve(rendition.display(arguments[0])).then(
+    function () { done(true); },
+    function () { done(false); }
+);
+"""
+
+# 以閱讀器自身的導覽跳到指定位置，並回報抵達的位置 {cfi, percentage, href} (execute_async_script)。
+# arguments[0]: CFI / href 字串，或 0–1 的閱讀進度。以進度跳轉需要 book.locations，
+# 尚未產生時先以 locations.generate() 產生（每次載入文件一次，長篇書籍可能需要數秒）。
+SEEK_LOCATION_JS = _FIND_RENDITION_JS + """
+var done = arguments[arguments.length - 1];
+var target = arguments[0];
+var rendition = findRendition();
+if (!rendition) { done(null); return; }
+var locations = rendition.book && rendition.book.locations;
+var resolved = Promise.resolve(target);
+if (typeof target === 'number' && locations && typeof locations.cfiFromPercentage === 'function') {
+    resolved = Promise.resolve(locations.length() ? null : locations.generate(1600)).then(
+        function () { return locations.cfiFromPercentage(target); }
+    );
+}
+resolved.then(function (where) { return rendition.display(where); }).then(
+    function () {
+        var loc = rendition.currentLocation();
+        var start = (loc && loc.start) || {};
+        done({
+            cfi: start.cfi || null,
+            percentage: (typeof start.percentage === 'number') ? start.percentage : null,
+            href: start.href || null
+        });
+    },
+    function () { done(null); }
+);
+"""
+
+# 匯出 / 還原 localStorage（登入狀態的一部分）
+EXPORT_LOCAL_STORAGE_JS = """
+var items = {};
+for (var i = 0; i < window.localStorage.length; i++) {
+    var key = window.localStorage.key(i);
+    items[key] = window.localStorage.getItem(key);
+}
+return items;
+"""
+
+RESTORE_LOCAL_STORAGE_JS = """
+var items = arguments[0] || {};
+for (var key in items) {
+    if (Object.prototype.hasOwnProperty.call(items, key)) {
+        window.localStorage.setItem(key, items[key]);
+    }
+}
+"""
+
+# 判斷是否已登入：頁面上出現「登出」連結
+IS_LOGGED_IN_JS = """
+var links = document.querySelectorAll('a, span, button');
+for (var i = 0; i < links.length; i++) {
+    if ((links[i].textContent || '').indexOf('登出') !== -1) { return true; }
+}
+return false;
+"""
+
+# 閱讀器輔助物件 window.__books：每本書（每次載入文件）注入一次，之後每頁只需一次
+# WebDriver 呼叫即可完成「翻頁 → 等待渲染穩定 → 回報狀態」，取代原本逐一下達的
+# switch_to / execute_script / execute_async_script 指令鏈。
+#
+# state()          → {ready, location, geometry}
+#                    ready: 電子書 iframe 已渲染內容 (body > div)；location: {cfi, percentage, href}；
+#                    geometry: [內容高度, 視窗高度, 視窗寬度]（以 iframe 文件為準）
+# step(opts, done) → 依序 (1) 點擊 opts.xpaths 中第一個可見、可用的按鈕 (2) opts.settle 時等待
+#                    DOM 靜止 opts.quietMs、字型與圖片載入完成且內容已出現，最多 opts.timeoutMs
+#                    回傳 {clicked, settled, elapsed, fonts, images, quiet, state}；clicked 為候選索引或 -1
+# probe(quietMs, reset) → step 等待部分的非阻塞版本，供多分頁輪詢：{settled, quietFor[, state]}
+READER_HELPER_JS = """
+if (!window.__books) {
+window.__books = (function () {
+    var selector = "%(selector)s";
+    %(find_rendition)s
+
+    function frameDoc() {
+        var frame = document.querySelector(selector);
+        try {
+            return (frame && frame.contentDocument) || null;
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function hasContent(doc) {
+        return !!(doc && doc.querySelector('body > div'));
+    }
+
+    function location() {
+        try {
+            var rendition = findRendition();
+            var loc = rendition && rendition.currentLocation();
+            if (!loc || !loc.start) { return null; }
+            return {
+                cfi: loc.start.cfi || null,
+                percentage: (typeof loc.start.percentage === 'number') ? loc.start.percentage : null,
+                href: loc.start.href || null
+            };
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function state() {
+        var doc = frameDoc();
+        var win = (doc && doc.defaultView) || window;
+        var body = (doc && doc.body) || document.body;
+        return {
+            ready: hasContent(doc),
+            location: location(),
+            geometry: [body.scrollHeight, win.innerHeight, win.innerWidth]
+        };
+    }
+
+    function clickFirst(xpaths) {
+        for (var i = 0; i < xpaths.length; i++) {
+            var el = document.evaluate(
+                xpaths[i], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+            ).singleNodeValue;
+            if (!el || el.disabled) { continue; }
+            var rect = el.getBoundingClientRect();
+            var style = window.getComputedStyle(el);
+            if (rect.width === 0 || rect.height === 0 ||
+                style.display === 'none' || style.visibility === 'hidden') {
+                continue;
+            }
+            el.click();
+            return i;
+        }
+        return -1;
+    }
+
+    function imagesComplete(doc) {
+        var images = doc.images || [];
+        for (var i = 0; i < images.length; i++) {
+            if (!images[i].complete) { return false; }
+        }
+        return true;
+    }
+
+    // 監看目前的內容文件；epub.js 翻頁時可能換掉整個 iframe，此時重新掛上 observer
+    var watch = {doc: null, last: 0, fonts: false, observer: null};
+
+    function track() {
+        var doc = frameDoc() || document;
+        if (watch.doc === doc) { return false; }
+        if (watch.observer) { watch.observer.disconnect(); }
+        var current = watch = {doc: doc, last: performance.now(), fonts: false, observer: null};
+        current.observer = new MutationObserver(function () { current.last = performance.now(); });
+        current.observer.observe(doc.documentElement || doc, {
+            subtree: true, childList: true, attributes: true, characterData: true
+        });
+        var ready = (doc.fonts && doc.fonts.ready) ? doc.fonts.ready : Promise.resolve();
+        ready.then(function () { current.fonts = true; }, function () { current.fonts = true; });
+        return true;
+    }
+
+    function check(quietMs) {
+        var quietFor = performance.now() - watch.last;
+        var images = imagesComplete(watch.doc);
+        // 內容尚未出現時（翻頁後 iframe 被清空）即使 DOM 靜止也不算穩定
+        var content = watch.doc === document || hasContent(watch.doc);
+        return {
+            settled: watch.fonts && images && content && quietFor >= quietMs,
+            quietFor: quietFor, fonts: watch.fonts, images: images, quiet: quietFor >= quietMs
+        };
+    }
+
+    function settle(quietMs, timeoutMs, callback) {
+        var start = performance.now();
+        track();
+        watch.last = start;
+        (function poll() {
+            track();
+            var result = check(quietMs);
+            var elapsed = performance.now() - start;
+            if (result.settled || elapsed >= timeoutMs) {
+                callback({settled: result.settled, elapsed: elapsed, fonts: result.fonts,
+                          images: result.images, quiet: result.quiet});
+                return;
+            }
+            setTimeout(poll, 50);
+        })();
+    }
+
+    return {
+        state: state,
+        step: function (opts, done) {
+            var clicked = -1;
+            if (opts.xpaths) {
+                clicked = clickFirst(opts.xpaths);
+                if (clicked < 0) {
+                    done({clicked: -1, settled: false, elapsed: 0, state: state()});
+                    return;
+                }
+            }
+            if (!opts.settle) {
+                done({clicked: clicked, settled: false, elapsed: 0, state: state()});
+                return;
+            }
+            settle(opts.quietMs, opts.timeoutMs, function (result) {
+                result.clicked = clicked;
+                result.state = state();
+                done(result);
+            });
+        },
+        probe: function (quietMs, reset) {
+            if (track() || reset) {
+                watch.last = performance.now();
+                return {settled: false, quietFor: 0};
+            }
+            var result = check(quietMs);
+            var probe = {settled: result.settled, quietFor: result.quietFor};
+            if (result.settled) { probe.state = state(); }
+            return probe;
+        }
+    };
+})();
+}
+""" % {"selector": EBOOK_IFRAME_SELECTOR, "find_rendition": _FIND_RENDITION_JS}
+
+# 呼叫輔助物件；頁面重新載入後 window.__books 不存在時回傳 null，由 crawler 重新注入後再呼叫
+READER_STATE_JS = "return window.__books ? window.__books.state() : null;"
+
+READER_PROBE_JS = "return window.__books ? window.__books.probe(arguments[0], arguments[1]) : null;"
+
+# execute_async_script；arguments[0]: {xpaths, settle, quietMs, timeoutMs}
+READER_STEP_JS = """
+var done = arguments[arguments.length - 1];
+if (!window.__books) { done(null); return; }
+window.__books.step(arguments[0], done);
+"""
+
+# 同時等待多個定位器 (execute_async_script)：任一個找到可用的元素就立即返回，
+# 以 MutationObserver 在 DOM 變動時重新檢查，另每 100ms 檢查一次以涵蓋樣式與版面的變化。
+# arguments[0]: [[By 策略, 值], ...]（依優先順序）
+# arguments[1]: 最長等待時間 (ms)
+# arguments[2]: true 時只接受可見且未停用的元素（可點擊 / 可輸入）
+# 回傳 [定位器索引, 元素]；逾時回傳 null
+WAIT_FOR_ANY_JS = """
+var done = arguments[arguments.length - 1];
+var locators = arguments[0];
+var timeoutMs = arguments[1];
+var interactable = arguments[2];
+var finished = false;
+var observer = null;
+var timer = null;
+
+function byText(exact, value) {
+    return Array.prototype.filter.call(document.links, function (a) {
+        var text = (a.textContent || '').trim();
+        return exact ? text === value : text.indexOf(value) !== -1;
+    });
+}
+
+function find(using, value) {
+    switch (using) {
+        case 'id': return [document.getElementById(value)];
+        case 'name': return document.getElementsByName(value);
+        case 'css selector': return document.querySelectorAll(value);
+        case 'class name': return document.getElementsByClassName(value);
+        case 'tag name': return document.getElementsByTagName(value);
+        case 'link text': return byText(true, value);
+        case 'partial link text': return byText(false, value);
+        case 'xpath':
+            var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var nodes = [];
+            for (var i = 0; i < result.snapshotLength; i++) { nodes.push(result.snapshotItem(i)); }
+            return nodes;
+    }
+    return [];
+}
+
+function usable(el) {
+    if (!el || el.nodeType !== 1) { return false; }
+    if (!interactable) { return true; }
+    if (el.disabled) { return false; }
+    var rect = el.getBoundingClientRect();
+    var style = window.getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 && style.display !== 'none' && style.visibility !== 'hidden';
+}
+
+function check() {
+    for (var i = 0; i < locators.length; i++) {
+        var elements;
+        try { elements = find(locators[i][0], locators[i][1]); } catch (e) { continue; }
+        for (var j = 0; j < elements.length; j++) {
+            if (usable(elements[j])) { return [i, elements[j]]; }
+        }
+    }
+    return null;
+}
+
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(timer);
+    done(result);
+}
+
+var start = performance.now();
+var first = check();
+if (first) {
+    finish(first);
+} else {
+    observer = new MutationObserver(function () {
+        var match = check();
+        if (match) { finish(match); }
+    });
+    observer.observe(document.documentElement, {subtree: true, childList: true, attributes: true});
+    (function poll() {
+        var match = check();
+        if (match || performance.now() - start >= timeoutMs) {
+            finish(match);
+            return;
+        }
+        timer = setTimeout(poll, 100);
+    })();
+}
+"""
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+import threading
+
+from src.crawler import BooksCrawler
+from src.manifest import BookManifest
+from src.scheduler import JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+class PooledDriver:
+    """DriverPool 中的一個瀏覽器，以及它已處理的書籍數。"""
+
+    def __init__(self, slot, crawler):
+        self.slot = slot
+        self.crawler = crawler
+        self.books_done = 0
+
+
+class DriverPool:
+    """
+    預先啟動並登入的瀏覽器池。
+
+    只有第一個瀏覽器執行完整的 login()，其餘瀏覽器直接還原它匯出的 cookies / localStorage。
+    書籍網址放入工作佇列，由空閒的瀏覽器依序取出處理；每個瀏覽器處理 max_books_per_driver
+    本書或發生崩潰後會被關閉並以新的瀏覽器（同樣還原登入狀態）取代。
+    """
+
+    def __init__(self, config, size=None, max_books_per_driver=None, rate_limiter=None):
+        # 多個 Edge 不能共用同一個 remote debugging port
+        self.config = dict(config, remote_debugging_port=0)
+        self.size = max(1, size or config.get('pool_size', 2))
+        self.max_books_per_driver = max_books_per_driver or config.get('max_books_per_driver', 20)
+        # 失敗頁占比超過此值（或沒有任何頁面成功）的書籍視為失敗，交給佇列重試
+        self.max_failed_ratio = config.get('job_max_failed_ratio', 0.2)
+        self.rate_limiter = rate_limiter
+        self.session_state = None
+        self.drivers = []
+        # 池中所有瀏覽器共用同一份效能指標
+        self.metrics = None
+
+    def _new_crawler(self):
+        crawler = BooksCrawler(self.config, metrics=self.metrics)
+        crawler.rate_limiter = self.rate_limiter
+        if self.session_state:
+            crawler.restore_session_state(self.session_state)
+        return crawler
+
+    def start(self, primary=None, auto_captcha=False):
+        """
+        啟動瀏覽器池。
+
+        Args:
+            primary (BooksCrawler): 已登入的瀏覽器；提供時直接加入池中並匯出其登入狀態。
+            auto_captcha (bool): primary 未提供時，傳給第一個瀏覽器 login() 的參數。
+
+        Raises:
+            RuntimeError: 第一個瀏覽器登入失敗；此時不會啟動其餘瀏覽器，也不會散布未登入的狀態。
+        """
+        if primary is None:
+            primary = BooksCrawler(self.config)
+            primary.rate_limiter = self.rate_limiter
+            if not primary.login(auto_captcha=auto_captcha):
+                primary.close()
+                raise RuntimeError("登入失敗，未啟動瀏覽器池")
+        elif self.rate_limiter:
+            primary.rate_limiter = self.rate_limiter
+        self.metrics = primary.metrics
+        primary._owns_metrics = False  # primary 可能被回收，指標改由瀏覽器池在 close() 寫出
+        self.session_state = primary.export_session_state()
+        self.drivers = [PooledDriver(0, primary)]
+
+        # 其餘瀏覽器平行啟動，啟動成本只付一次（每個瀏覽器各一次）
+        launched = [None] * (self.size - 1)
+
+        def launch(index):
+            try:
+                launched[index] = self._new_crawler()
+            except Exception as e:
+                logger.error(f"❌ 瀏覽器 #{index + 1} 啟動失敗: {e}")
+
+        threads = [threading.Thread(target=launch, args=(i,)) for i in range(self.size - 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for crawler in launched:
+            if crawler is not None:
+                self.drivers.append(PooledDriver(len(self.drivers), crawler))
+        logger.info(f"🚗 瀏覽器池已就緒: {len(self.drivers)}/{self.size} 個瀏覽器")
+
+    def _recycle(self, pooled, reason):
+        logger.info(f"♻️ 回收瀏覽器 #{pooled.slot} ({reason})")
+        pooled.crawler.close()
+        pooled.crawler = self._new_crawler()
+        pooled.books_done = 0
+
+    def _is_alive(self, pooled):
+        try:
+            pooled.crawler.driver.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def _run_book(self, pooled, job, jobs, total_pages, delay):
+        """
+        處理一本書；工作已有輸出目錄（先前中斷或失敗）時先重新截取失敗頁，再以 resume_capture() 接續。
+        """
+        crawler = pooled.crawler
+        pages = job.get("pages") or total_pages
+        output_dir = job.get("output_dir")
+        if output_dir and BookManifest.exists(output_dir):
+            logger.info(f"▶️ 接續先前的輸出: {output_dir}")
+            if BookManifest(output_dir).failed_pages():
+                crawler.recapture_pages(output_dir, delay=delay)
+            if not crawler.resume_capture(output_dir, pages, delay):
+                raise RuntimeError("續傳失敗")
+        else:
+            crawler.navigate_to_book(job["url"])
+            output_dir = str(crawler.output_dir)
+            jobs.started(job, output_dir)
+            if crawler.auto_capture_mode(pages, delay) is None:
+                raise RuntimeError("找不到電子書 iframe")
+        self._check_output(output_dir)
+        return output_dir
+
+    def _check_output(self, output_dir):
+        """依 manifest 判斷這本書是否算成功；沒有任何成功頁或失敗頁過多時拋出 RuntimeError。"""
+        manifest = BookManifest(output_dir)
+        failed = manifest.failed_pages()
+        good = sum(
+            1 for page, entry in manifest.data.get("pages", {}).items()
+            if (entry.get("files") or entry.get("duplicate_of")) and int(page) not in failed
+        )
+        if good == 0:
+            raise RuntimeError("沒有任何頁面截圖成功")
+        if failed and len(failed) / (good + len(failed)) > self.max_failed_ratio:
+            raise RuntimeError(f"{len(failed)} 頁截圖失敗 (成功 {good} 頁): {failed[:20]}")
+
+    def _worker(self, pooled, jobs, total_pages, delay):
+        while True:
+            job = jobs.next_job()
+            if job is None:
+                return
+            book_url = job["url"]
+            logger.info(f"📚 瀏覽器 #{pooled.slot} 開始處理: {book_url}")
+            try:
+                output_dir = self._run_book(pooled, job, jobs, total_pages, delay)
+            except Exception as e:
+                logger.error(f"❌ 瀏覽器 #{pooled.slot} 處理 {book_url} 失敗: {e}", exc_info=True)
+                jobs.fail(job, e)
+                reason = "處理書籍時發生錯誤"
+            else:
+                jobs.complete(job, output_dir)
+                pooled.books_done += 1
+                reason = None
+                if pooled.books_done >= self.max_books_per_driver:
+                    reason = f"已處理 {pooled.books_done} 本書"
+                elif not self._is_alive(pooled):
+                    reason = "瀏覽器已無回應"
+
+            # 回收瀏覽器的錯誤與書籍無關，不影響已完成（或已記錄失敗）的工作
+            if reason:
+                try:
+                    self._recycle(pooled, reason)
+                except Exception as restart_error:
+                    logger.error(f"❌ 瀏覽器 #{pooled.slot} 無法重新啟動，停止此工作執行緒: {restart_error}")
+                    return
+
+    def run_jobs(self, jobs, total_pages=None, delay=5):
+        """
+        以池中的瀏覽器處理 JobQueue 中的所有工作，直到佇列中沒有待處理或重試中的工作。
+
+        Args:
+            jobs (JobQueue): 工作佇列。
+            total_pages (int): 工作未指定頁數時的預設值。
+        """
+        if not self.drivers:
+            self.start()
+        threads = [
+            threading.Thread(
+                target=self._worker, args=(pooled, jobs, total_pages, delay),
+                name=f"driver-pool-{pooled.slot}",
+            )
+            for pooled in self.drivers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run(self, book_urls, total_pages=None, delay=5):
+        """
+        以池中的瀏覽器處理所有書籍（不重試），完成後返回 {書籍網址: 輸出目錄或 None}。
+        """
+        jobs = JobQueue(max_attempts=1)
+        for url in book_urls:
+            jobs.add(url)
+        self.run_jobs(jobs, total_pages, delay)
+        return {
+            job["url"]: job["output_dir"] if job["status"] == "done" else None
+            for job in jobs.jobs
+        }
+
+    def close(self):
+        for pooled in self.drivers:
+            pooled.crawler.close()
+        self.drivers = []
+        if self.metrics:
+            self.metrics.close()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import base64
+import hashlib
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # 未安裝 cryptography 時停用登入狀態的保存
+    Fernet = None
+    InvalidToken = Exception
+
+KDF_ITERATIONS = 200_000
+
+
+def _fernet(secret, salt):
+    key = hashlib.pbkdf2_hmac('sha256', secret.encode('utf-8'), salt, KDF_ITERATIONS)
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+def session_secret(config):
+    """加密金鑰來源：環境變數 BOOKS_SESSION_KEY > config 的 session_key > 帳號密碼。"""
+    return (
+        os.environ.get('BOOKS_SESSION_KEY')
+        or config.get('session_key')
+        or config.get('password')
+        or None
+    )
+
+
+def save_session(path, state, secret):
+    """
+    以 Fernet (AES-128-CBC + HMAC) 加密並寫入登入狀態；金鑰由 secret 經 PBKDF2 衍生。
+
+    Returns:
+        bool: 成功寫入時返回 True。
+    """
+    if Fernet is None:
+        logger.warning("⚠️ 未安裝 cryptography，無法保存登入狀態。")
+        return False
+    if not secret:
+        logger.warning("⚠️ 未設定 session_key 或密碼，無法加密登入狀態。")
+        return False
+    path = Path(path)
+    salt = os.urandom(16)
+    token = _fernet(secret, salt).encrypt(json.dumps(state).encode('utf-8'))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'salt': base64.b64encode(salt).decode('ascii'),
+            'token': token.decode('ascii'),
+        }, f)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, path)
+    return True
+
+
+def load_session(path, secret):
+    """讀取並解密登入狀態；檔案不存在、金鑰錯誤或內容損毀時返回 None。"""
+    path = Path(path)
+    if Fernet is None or not secret or not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        salt = base64.b64decode(stored['salt'])
+        data = _fernet(secret, salt).decrypt(stored['token'].encode('ascii'))
+        return json.loads(data)
+    except InvalidToken:
+        logger.warning(f"⚠️ 無法解密 {path}（金鑰可能已變更），將重新登入。")
+    except Exception as e:
+        logger.warning(f"⚠️ 讀取登入狀態失敗: {e}")
+    return None
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import time
+import zlib
+import struct
+import logging
+from pathlib import Path
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# 一次回傳捲動後的實際位置，避免額外的 round trip
+PAGE_GEOMETRY_JS = (
+    "return [document.body.scrollHeight, window.innerHeight, window.innerWidth];"
+)
+SCROLL_TO_JS = "window.scrollTo(0, arguments[0]); return window.scrollY;"
+
+
+def _png_chunk(chunk_type, data):
+    body = chunk_type + data
+    return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body) & 0xffffffff)
+
+
+class StreamingPngWriter:
+    """
+    逐列寫入的 RGB PNG 編碼器。
+
+    圖片高度在寫入前不需要已知：IHDR 先以 0 佔位，close() 時再回填實際高度，
+    因此整張圖不必同時存在記憶體中。
+    """
+
+    def __init__(self, path, width, compress_level=6):
+        self.path = Path(path)
+        self.width = width
+        self.height = 0
+        self._tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self._file = open(self._tmp_path, 'wb')
+        self._compressor = zlib.compressobj(compress_level)
+        self._file.write(PNG_SIGNATURE)
+        self._ihdr_offset = self._file.tell()
+        self._file.write(self._ihdr(0))
+
+    def _ihdr(self, height):
+        # 8-bit RGB、無交錯
+        return _png_chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, height, 8, 2, 0, 0, 0))
+
+    def write(self, image):
+        """附加一段與輸出同寬的圖片列。"""
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        if image.width != self.width:
+            raise ValueError(f"圖片寬度不符: {image.width} != {self.width}")
+        raw = image.tobytes()
+        stride = self.width * 3
+        # 每列前加上 filter type 0 (None)
+        rows = b''.join(
+            b'\x00' + raw[offset:offset + stride] for offset in range(0, len(raw), stride)
+        )
+        data = self._compressor.compress(rows)
+        if data:
+            self._file.write(_png_chunk(b'IDAT', data))
+        self.height += image.height
+
+    def close(self):
+        """寫入結尾並回填 IHDR 的實際高度。"""
+        self._file.write(_png_chunk(b'IDAT', self._compressor.flush()))
+        self._file.write(_png_chunk(b'IEND', b''))
+        self._file.seek(self._ihdr_offset)
+        self._file.write(self._ihdr(self.height))
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """放棄寫入並刪除暫存檔。"""
+        self._file.close()
+        if self._tmp_path.exists():
+            os.remove(self._tmp_path)
+
+
+class FullPageStitcher:
+    """
+    捲動頁面並逐段拼接全頁截圖。
+
+    每段截圖直接從記憶體中的 PNG 位元組解碼，依 scrollHeight 與實際捲動位置精確裁掉
+    與上一段重疊的部分後立即寫出，因此峰值記憶體約為一個視窗大小。
+    超過 max_strip_height 的頁面會拆成多個條帶檔案：page.png、page_part02.png ...
+    """
+
+    def __init__(self, driver, max_strip_height=16000, scroll_pause=0.1, compress_level=6):
+        self.driver = driver
+        self.max_strip_height = max_strip_height
+        self.scroll_pause = scroll_pause
+        self.compress_level = compress_level
+
+    def _strip_path(self, filename, index):
+        path = Path(filename)
+        if index == 1:
+            return path
+        return path.with_name(f"{path.stem}_part{index:02d}{path.suffix}")
+
+    def capture(self, filename, geometry=None):
+        """
+        截取全頁並寫入 filename（過高時拆成多個條帶）。
+
+        Args:
+            geometry (list): [內容高度, 視窗高度, 視窗寬度]；呼叫端已取得時傳入，省去一次 execute_script。
+
+        Returns:
+            list[Path]: 寫出的檔案路徑；未截取到任何內容時為空列表。
+        """
+        total_height, viewport_height, _ = geometry or self.driver.execute_script(PAGE_GEOMETRY_JS)
+        covered = 0  # 已寫出的 CSS 像素高度
+        outputs = []
+        strip = None
+        try:
+            while covered < total_height:
+                actual = self.driver.execute_script(SCROLL_TO_JS, covered)
+                actual = int(round(actual if actual is not None else covered))
+                time.sleep(self.scroll_pause)
+
+                with Image.open(io.BytesIO(self.driver.get_screenshot_as_png())) as shot:
+                    scale = shot.height / viewport_height
+                    bottom_css = min(total_height, actual + viewport_height)
+                    # 以絕對位置換算，避免縮放比例的誤差逐段累積
+                    top = int(round(covered * scale)) - int(round(actual * scale))
+                    bottom = int(round(bottom_css * scale)) - int(round(actual * scale))
+                    top, bottom = max(0, top), min(shot.height, bottom)
+                    if bottom <= top:
+                        logger.warning("⚠️ 捲動位置沒有前進，停止拼接。")
+                        break
+
+                    row = top
+                    while row < bottom:
+                        if strip is None:
+                            strip = StreamingPngWriter(
+                                self._strip_path(filename, len(outputs) + 1),
+                                shot.width, self.compress_level,
+                            )
+                        take = min(bottom - row, self.max_strip_height - strip.height)
+                        strip.write(shot.crop((0, row, shot.width, row + take)))
+                        row += take
+                        if strip.height >= self.max_strip_height:
+                            strip.close()
+                            outputs.append(strip.path)
+                            strip = None
+
+                covered = bottom_css
+
+            if strip is not None and strip.height > 0:
+                strip.close()
+                outputs.append(strip.path)
+            elif strip is not None:
+                strip.abort()
+            return outputs
+        except Exception:
+            if strip is not None:
+                strip.abort()
+            raise
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import mmap
+import struct
+import time
+import zipfile
+import logging
+import warnings
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("loose", "cbz", "pack")
+CBZ_FILENAME = "pages.cbz"
+PACK_FILENAME = "pages.pack"
+IMAGE_SUFFIXES = (".png", ".webp", ".jpg")
+
+# pack 格式：檔頭 | 頁面記錄 ... | 索引 (JSON) | 檔尾
+#   頁面記錄：b"PAGE" + 名稱長度 (uint16) + 資料長度 (uint32) + 名稱 (UTF-8) + 資料
+#   檔尾：索引長度 (uint64) + PACK_FOOTER_MAGIC，只在 close() 時寫入
+PACK_MAGIC = b"BKPACK\x00\x01"
+PACK_FOOTER_MAGIC = b"BKPKIDX\x00"
+_RECORD = struct.Struct("<4sHI")
+_FOOTER = struct.Struct("<Q8s")
+
+
+def _is_page(name):
+    """頁面圖片（而非 OCR 結果等附屬檔案）。"""
+    return Path(name).suffix.lower() in IMAGE_SUFFIXES
+
+
+class LooseStore:
+    """每頁一個檔案（原本的輸出方式）。"""
+
+    backend = "loose"
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+
+    def put(self, path, data):
+        """以暫存檔加 os.replace 原子寫入 path。"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def adopt(self, path):
+        """將已寫在輸出目錄中的檔案納入儲存（loose 不需任何動作）。"""
+
+    def get(self, name):
+        return (self.output_dir / name).read_bytes()
+
+    def __contains__(self, name):
+        return (self.output_dir / name).exists()
+
+    def names(self):
+        return sorted(p.name for p in self.output_dir.glob('page_*') if _is_page(p.name))
+
+    def close(self):
+        pass
+
+
+class _MappedStore:
+    """以 mmap 隨機讀取容器中任一頁的共用邏輯；子類別維護 self._index {名稱: (offset, length)}。"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._index = {}
+        self._map = None
+
+    def _mapped(self, end):
+        """返回涵蓋到 end 的 mmap；容器在寫入中持續增長，必要時重新對應。"""
+        if self._map is None or len(self._map) < end:
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def get(self, name):
+        """不解開容器，直接從 mmap 取出一頁的位元組。"""
+        with self._lock:
+            offset, length = self._index[Path(name).name]
+            self._flush()
+            return self._mapped(offset + length)[offset:offset + length]
+
+    def __contains__(self, name):
+        with self._lock:
+            return Path(name).name in self._index
+
+    def names(self):
+        """容器中的頁面圖片名稱（不含 page_NNNN.ocr.json 等附屬檔案）。"""
+        with self._lock:
+            return sorted(name for name in self._index if _is_page(name))
+
+    def adopt(self, path):
+        """將寫在容器外的檔案（例如全頁拼接的條帶）搬進容器。"""
+        path = Path(path)
+        self.put(path, path.read_bytes())
+        path.unlink()
+
+    def _flush(self):
+        """讓寫入中的資料在 mmap 讀取前落到檔案上；唯讀或沒有寫入緩衝時不需任何動作，有寫入時由子類別覆寫。"""
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class PackStore(_MappedStore):
+    """
+    每本書一個只增不減的 pages.pack。
+
+    頁面到達時直接附加在檔尾，close() 時才寫入索引與檔尾；程式中斷而缺少檔尾時，
+    重新開啟會逐筆掃描記錄重建索引，並截掉最後一筆不完整的記錄，可直接續寫。
+    同名頁面（例如重新截圖）以最後寫入的為準。
+    """
+
+    backend = "pack"
+
+    def __init__(self, path, readonly=False):
+        super().__init__(path)
+        self._file = None
+        if readonly:
+            self._load_index()
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size >= len(PACK_MAGIC):
+            end = self._load_index()
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(self.path, 'wb')
+            self._file.write(PACK_MAGIC)
+
+    def _load_index(self):
+        """讀取（或重建）索引，返回可續寫的位置（原索引或不完整記錄的起點）。"""
+        size = self.path.stat().st_size
+        with open(self.path, 'rb') as f:
+            if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+                raise ValueError(f"{self.path} 不是 pack 檔案")
+            if size >= len(PACK_MAGIC) + _FOOTER.size:
+                f.seek(size - _FOOTER.size)
+                index_size, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+                if magic == PACK_FOOTER_MAGIC:
+                    index_start = size - _FOOTER.size - index_size
+                    f.seek(index_start)
+                    entries = json.loads(f.read(index_size).decode('utf-8'))
+                    self._index = {name: (offset, length) for name, offset, length in entries}
+                    return index_start
+
+            logger.warning(f"⚠️ {self.path.name} 缺少索引（上次未正常關閉），正在掃描重建...")
+            position = len(PACK_MAGIC)
+            f.seek(position)
+            while True:
+                header = f.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    break
+                tag, name_size, data_size = _RECORD.unpack(header)
+                data_offset = position + _RECORD.size + name_size
+                if tag != b"PAGE" or data_offset + data_size > size:
+                    break
+                name = f.read(name_size).decode('utf-8')
+                self._index[name] = (data_offset, data_size)
+                position = data_offset + data_size
+                f.seek(position)
+            logger.info(f"📦 已從 {self.path.name} 重建 {len(self._index)} 頁的索引")
+            return position
+
+    def put(self, path, data):
+        name = Path(path).name.encode('utf-8')
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(_RECORD.pack(b"PAGE", len(name), len(data)))
+            self._file.write(name)
+            self._file.write(data)
+            self._index[name.decode('utf-8')] = (offset + _RECORD.size + len(name), len(data))
+
+    def _flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        """寫入索引與檔尾（唯讀開啟時只釋放 mmap）。"""
+        with self._lock:
+            self._unmap()
+            if not self._file:
+                return
+            entries = [[name, offset, length] for name, (offset, length) in sorted(self._index.items())]
+            index = json.dumps(entries, ensure_ascii=False).encode('utf-8')
+            self._file.write(index)
+            self._file.write(_FOOTER.pack(len(index), PACK_FOOTER_MAGIC))
+            self._file.close()
+            self._file = None
+
+
+class CbzStore(_MappedStore):
+    """
+    每本書一個不壓縮 (ZIP_STORED) 的 pages.cbz，一般漫畫閱讀器即可開啟。
+
+    ZIP 的中央目錄只在 close() 時寫入，程式中斷後的 CBZ 無法續寫；需要可續傳時請使用 pack。
+    ZIP 無法就地取代項目：同名頁面（例如重新截圖）先附加在檔尾並以最後寫入的為準，
+    close() 時再重寫整個容器去除舊的項目，避免閱讀器看到重複的頁面。
+    """
+
+    backend = "cbz"
+
+    def __init__(self, path, readonly=False):
+        super().__init__(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 'a' 模式遇到不是 ZIP 的檔案不會報錯，而是在檔尾另外附加一個新的 ZIP，舊頁面就此遺失：先確認
+        damaged = self.path.exists() and self.path.stat().st_size > 0 and not zipfile.is_zipfile(self.path)
+        try:
+            if damaged:
+                raise zipfile.BadZipFile
+            self._zip = zipfile.ZipFile(self.path, 'r' if readonly else 'a', compression=zipfile.ZIP_STORED)
+        except zipfile.BadZipFile:
+            raise ValueError(f"{self.path} 已損毀（上次未正常關閉），無法續寫；請改用 pack 格式") from None
+        self._infos = {}
+        for info in self._zip.infolist():
+            self._infos[info.filename] = info
+        # 既有容器中已有重複項目（舊版本寫入）時，續寫後一併整理
+        self._stale = not readonly and len(self._infos) < len(self._zip.infolist())
+
+    def put(self, path, data):
+        name = Path(path).name
+        with self._lock:
+            info = zipfile.ZipInfo(name, time.localtime()[:6])
+            if name in self._infos:
+                self._stale = True
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", "Duplicate name", UserWarning)
+                self._zip.writestr(info, data, compress_type=zipfile.ZIP_STORED)
+            self._infos[name] = self._zip.getinfo(name)
+            self._index.pop(name, None)
+
+    def get(self, name):
+        name = Path(name).name
+        with self._lock:
+            if name not in self._index:
+                info = self._infos[name]
+                self._flush()
+                header = self._mapped(info.header_offset + 30)[info.header_offset:info.header_offset + 30]
+                name_size, extra_size = struct.unpack("<HH", header[26:30])
+                self._index[name] = (info.header_offset + 30 + name_size + extra_size, info.file_size)
+        return super().get(name)
+
+    def __contains__(self, name):
+        with self._lock:
+            return Path(name).name in self._infos
+
+    def names(self):
+        with self._lock:
+            return sorted(name for name in self._infos if _is_page(name))
+
+    def _flush(self):
+        if self._zip and self._zip.fp:
+            self._zip.fp.flush()
+
+    def close(self):
+        """寫入中央目錄；有被取代的頁面時重寫容器，只保留每個名稱最後寫入的項目。"""
+        with self._lock:
+            if not self._zip:
+                return
+            self._unmap()
+            self._zip.close()
+            self._zip = None
+            if self._stale:
+                self._compact()
+                self._stale = False
+
+    def _compact(self):
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with zipfile.ZipFile(self.path) as source:
+            latest = {}
+            for info in source.infolist():
+                latest[info.filename] = info  # 保留第一次出現的順序、最後寫入的內容
+            with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as target:
+                for info in latest.values():
+                    target.writestr(info, source.read(info), compress_type=zipfile.ZIP_STORED)
+        os.replace(tmp_path, self.path)
+        logger.info(f"🧹 已去除 {self.path.name} 中被取代的頁面")
+
+
+def detect_backend(output_dir):
+    """依輸出目錄中已存在的容器判斷儲存方式；沒有容器時返回 None。"""
+    output_dir = Path(output_dir)
+    if (output_dir / PACK_FILENAME).exists():
+        return "pack"
+    if (output_dir / CBZ_FILENAME).exists():
+        return "cbz"
+    return None
+
+
+def open_store(output_dir, backend=None, readonly=False):
+    """
+    開啟一本書的頁面儲存。
+
+    Args:
+        backend (str): "loose"（每頁一個 PNG）、"cbz" 或 "pack"；目錄中已有容器時沿用其格式。
+        readonly (bool): 只讀取既有的頁面（例如組成 PDF），不修改容器。
+    """
+    output_dir = Path(output_dir)
+    backend = detect_backend(output_dir) or backend or "loose"
+    if backend == "loose":
+        return LooseStore(output_dir)
+    if backend == "pack":
+        return PackStore(output_dir / PACK_FILENAME, readonly=readonly)
+    if backend == "cbz":
+        return CbzStore(output_dir / CBZ_FILENAME, readonly=readonly)
+    raise ValueError(f"未知的 output_backend: {backend}（可用: {', '.join(BACKENDS)}）")
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import asyncio
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from src.crawler import BooksCrawler
+from src.driver_setup import apply_url_blocklist
+
+logger = logging.getLogger(__name__)
+
+
+class TabCaptureEngine:
+    """
+    在同一個瀏覽器中以多個分頁同時截取多本書的 asyncio 引擎。
+
+    一個 WebDriver session 同一時間只能執行一個指令，因此所有瀏覽器指令都經由單一執行緒
+    並以 asyncio.Lock 串行化；並行的來源是「等待渲染」：某個分頁在等頁面穩定時，
+    其他分頁可以翻頁與截圖。每個分頁各自擁有一個共用 driver 的 BooksCrawler，
+    沿用其導航、iframe 快取、翻頁策略、重複頁偵測與背景寫入。
+
+    Chromium 系瀏覽器會透過 CDP 讓背景分頁維持 active 狀態，避免計時器與渲染被節流；
+    建議搭配 headless 使用。
+    """
+
+    def __init__(self, crawler, concurrency=None):
+        """
+        Args:
+            crawler (BooksCrawler): 已登入的瀏覽器，其 driver 由所有分頁共用。
+            concurrency (int): 同時開啟的分頁數上限，預設為 config 的 tab_concurrency。
+        """
+        self.crawler = crawler
+        self.driver = crawler.driver
+        self.config = crawler.config
+        self.concurrency = max(1, concurrency or self.config.get('tab_concurrency', 4))
+        self.results = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tab-engine")
+        self._lock = None
+        self._active_handle = None
+
+    async def _call(self, tab, handle, fn, *args):
+        """切換到指定分頁後，在 WebDriver 執行緒中執行 fn(*args)。"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+
+            def run():
+                if handle and self._active_handle != handle:
+                    self.driver.switch_to.window(handle)
+                    self._active_handle = handle
+                    if tab is not None:
+                        tab._frame_context = None  # 切換分頁後回到該分頁的主文件
+                return fn(*args)
+
+            return await loop.run_in_executor(self._executor, run)
+
+    def _open_tab(self):
+        self.driver.switch_to.new_window('tab')
+        handle = self.driver.current_window_handle
+        self._active_handle = handle
+        if hasattr(self.driver, 'execute_cdp_cmd'):
+            try:
+                self.driver.execute_cdp_cmd('Emulation.setFocusEmulationEnabled', {'enabled': True})
+                self.driver.execute_cdp_cmd('Page.setWebLifecycleState', {'state': 'active'})
+            except Exception as e:
+                logger.debug(f"無法設定背景分頁狀態: {e}")
+        apply_url_blocklist(self.driver, self.crawler.blocked_urls)  # CDP 封鎖只作用於單一分頁
+        return handle
+
+    def _close_tab(self, tab):
+        """等待該分頁的截圖寫完後關閉分頁，返回寫入失敗 {頁碼: 原因}。"""
+        failures = {}
+        if tab.writer:
+            tab.writer.flush()
+            failures = tab.writer.pop_failures()
+            for page_num, reason in failures.items():
+                if tab.manifest:
+                    tab.manifest.record_failure(page_num, reason)
+        tab.close()  # 只停止該分頁的寫入器，不會關閉共用的瀏覽器
+        self.driver.close()
+        self._active_handle = None
+        return failures
+
+    async def _wait_settled(self, tab, handle, timeout):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        reset = True
+        while True:
+            settled = await self._call(tab, handle, tab.probe_page_settled, reset)
+            reset = False
+            if settled or loop.time() - start >= timeout:
+                break
+            await asyncio.sleep(0.05)  # 讓出執行權給其他分頁
+        tab.settle_times.append(loop.time() - start)
+        tab.metrics.record("settle", loop.time() - start)
+
+    async def _capture_book(self, slots, index, book_url, total_pages, delay, run_stamp):
+        async with slots:
+            handle = await self._call(None, None, self._open_tab)
+            tab = BooksCrawler(self.config, driver=self.driver, metrics=self.crawler.metrics)
+            result = self.results[index]
+            try:
+                # 同一秒內開啟的分頁（甚至同一本書）各有自己的輸出目錄
+                output_dir = f"output/ebook_{run_stamp}_tab{index + 1:02d}"
+                await self._call(tab, handle, tab.navigate_to_book, book_url, output_dir)
+                result["output_dir"] = str(tab.output_dir)
+                if not await self._call(tab, handle, tab.find_and_switch_to_ebook_iframe):
+                    logger.error(f"❌ 找不到電子書 iframe: {book_url}")
+                    return
+
+                page_num = 1
+                unchanged_count = 0
+                while total_pages is None or page_num <= total_pages:
+                    captured = await self._call(tab, handle, tab.capture_page_with_retry, page_num)
+                    if captured and tab._last_capture_status == 'unchanged':
+                        unchanged_count += 1
+                        if unchanged_count >= tab.duplicate_end_threshold:
+                            break
+                    else:
+                        unchanged_count = 0
+                        if captured:
+                            result["captured"] += 1
+                            tab.metrics.count_page()
+                            location = await self._call(tab, handle, tab.get_current_location, True)
+                            if tab.manifest:
+                                tab.manifest.record_location(page_num, location)
+                        else:
+                            result["failed"].append(page_num)
+                            if tab.manifest:
+                                tab.manifest.record_failure(page_num, "capture failed")
+                        page_num += 1
+
+                    if not await self._call(tab, handle, tab.click_next_page_button):
+                        break
+                    await self._wait_settled(tab, handle, delay)
+                result["pages"] = page_num - 1
+            except Exception as e:
+                logger.error(f"❌ 分頁處理 {book_url} 失敗: {e}", exc_info=True)
+            finally:
+                write_failures = await self._call(tab, handle, self._close_tab, tab)
+                for page_num in sorted(write_failures):
+                    if page_num not in result["failed"]:
+                        result["captured"] -= 1
+                        result["failed"].append(page_num)
+                logger.info(
+                    f"📚 {book_url}: 成功 {result['captured']} 頁，失敗 {len(result['failed'])} 頁"
+                )
+
+    async def run_async(self, book_urls, total_pages=None, delay=5):
+        self._lock = asyncio.Lock()
+        slots = asyncio.Semaphore(self.concurrency)
+        original_handle = self.driver.current_window_handle
+        run_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.results = [
+            {"url": url, "output_dir": None, "captured": 0, "failed": [], "pages": 0} for url in book_urls
+        ]
+        try:
+            await asyncio.gather(*(
+                self._capture_book(slots, index, url, total_pages, delay, run_stamp)
+                for index, url in enumerate(book_urls)
+            ))
+        finally:
+            self.driver.switch_to.window(original_handle)
+            self._active_handle = original_handle
+        return list(self.results)
+
+    def run(self, book_urls, total_pages=None, delay=5):
+        """
+        以多個分頁截取所有書籍。
+
+        Returns:
+            list[dict]: 依 book_urls 順序、每個分頁一筆 {"url", "output_dir", "captured", "failed", "pages"}；
+            同一網址出現多次時各自獨立。
+        """
+        start = time.monotonic()
+        results = asyncio.run(self.run_async(book_urls, total_pages, delay))
+        elapsed = time.monotonic() - start
+        total = sum(r["captured"] for r in results)
+        if elapsed > 0:
+            logger.info(f"📈 {len(book_urls)} 本書共 {total} 頁，{total / elapsed * 60:.1f} 頁/分鐘")
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 import json
 import logging
 from pathlib import Path
@@ -38,11 +39,68 @@ def load_config():
         "password": "",
         "headless": False,
         "browser": "firefox",
+        "driver_cache_file": "config/driver_paths.json",
+        "browser_profile_dir": "",
+        "block_trackers": False,
+        "blocked_url_patterns": [],
+        "watchdog_enabled": True,
+        "watchdog_interval": 5,
+        "watchdog_hang_timeout": 90,
+        "watchdog_max_rss_mb": 0,
+        "watchdog_max_restarts": 3,
+        "memory_check_pages": 20,
+        "memory_reload_mb": 0,
+        "memory_recycle_mb": 0,
+        "seek_timeout": 60,
+        "seek_tolerance": 0.02,
         "auto_login": False,
+        "base_url": "https://www.books.com.tw/",
         "book_url": "",
         "total_pages": 100,
         "delay": 5,
-        "full_page_screenshot": False
+        "full_page_screenshot": False,
+        "full_page_max_height": 16000,
+        "image_mode": "color",
+        "image_format": "png",
+        "png_compress_level": None,
+        "jpeg_quality": 85,
+        "palette_colors": 16,
+        "bw_threshold": 160,
+        "trim_margins": False,
+        "trim_padding": 8,
+        "encode_workers": None,
+        "capture_mode": "window",
+        "spread_aspect_ratio": 1.2,
+        "ocr_enabled": False,
+        "ocr_workers": None,
+        "ocr_lang": "chi_tra",
+        "ocr_cache_dir": "output/.ocr_cache",
+        "assemble_format": "",
+        "dedupe_pages": True,
+        "duplicate_tolerance": 2.0,
+        "duplicate_end_threshold": 3,
+        "session_file": "config/session.enc",
+        "session_key": "",
+        "pool_size": 2,
+        "tab_concurrency": 4,
+        "queue_state_file": "output/queue_state.json",
+        "job_max_attempts": 3,
+        "job_retry_backoff": 30,
+        "job_max_failed_ratio": 0.2,
+        "max_requests_per_second": 2,
+        "max_books_per_driver": 20,
+        "settle_mode": "adaptive",
+        "settle_quiet_ms": 150,
+        "settle_pixel_check": True,
+        "page_turn_cache": "config/page_turn_strategies.json",
+        "output_backend": "loose",
+        "manifest_checkpoint_seconds": 5,
+        "metrics_dir": "output/metrics",
+        "metrics_openmetrics": False,
+        "metrics_port": 0,
+        "async_write": True,
+        "writer_threads": 2,
+        "writer_queue_size": 8
     }
     
     if config_path.exists():
@@ -58,3 +116,25 @@ def load_config():
         print(f"已建立設定檔: {config_path}")
     
     return default_config
+
+
+def load_json_file(path, default=None):
+    """讀取 JSON 檔案，檔案不存在或格式錯誤時返回 default。"""
+    path = Path(path)
+    if not path.exists():
+        return default
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"讀取 {path} 失敗: {e}")
+        return default
+
+def save_json_file(path, data):
+    """以「先寫暫存檔再取代」的方式寫入 JSON，避免程式中斷時留下損毀的檔案。"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
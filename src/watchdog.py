@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import time
+import logging
+import threading
+
+from src.procstat import kill_process_tree, process_tree_rss
+
+logger = logging.getLogger(__name__)
+
+# WebDriver 錯誤訊息中代表 session 已無法使用（瀏覽器或分頁崩潰、連線中斷）的片段
+CRASH_MARKERS = (
+    "invalid session id",
+    "session deleted",
+    "tab crashed",
+    "chrome not reachable",
+    "disconnected",
+    "target window already closed",
+    "browsing context has been discarded",
+    "failed to establish a new connection",
+    "connection refused",
+    "connection aborted",
+    "remote end closed connection",
+)
+
+
+class DriverWatchdog:
+    """
+    在背景執行緒中監看 WebDriver session 的健康狀態。
+
+    - 包裝 driver.execute 記錄每個指令的耗時；單一指令超過 hang_timeout 秒視為卡死，
+      直接結束 WebDriver 與瀏覽器的行程樹，讓卡住的呼叫立即以錯誤返回。
+    - 指令錯誤訊息顯示 session 已失效、分頁崩潰或連線中斷，或 WebDriver 行程已結束時，視為崩潰。
+    - 行程樹的 RSS 超過 max_rss_mb 時視為記憶體膨脹。
+
+    偵測到問題後 reason 不再是 None；重新啟動由擷取流程在安全的時間點執行
+    （見 BooksCrawler.restart_browser），之後以 attach() 監看新的 driver。
+    """
+
+    def __init__(self, metrics=None, interval=5, hang_timeout=90, max_rss_mb=0):
+        self.metrics = metrics
+        self.interval = interval
+        self.hang_timeout = hang_timeout
+        self.max_rss_mb = max_rss_mb
+        self.reason = None
+        self.commands = 0
+        self.slowest = (None, 0.0)
+        self.peak_rss = 0
+        self._driver = None
+        self._inflight = {}
+        self._killed = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="driver-watchdog", daemon=True)
+        self._thread.start()
+
+    def attach(self, driver):
+        """監看（新啟動的）driver，並清除先前的異常狀態。"""
+        execute = driver.execute
+        watchdog = self
+
+        def timed_execute(driver_command, params=None):
+            token = object()
+            start = time.monotonic()
+            with watchdog._lock:
+                watchdog._inflight[token] = (driver_command, start)
+            try:
+                return execute(driver_command, params)
+            except Exception as e:
+                message = str(e).lower()
+                if any(marker in message for marker in CRASH_MARKERS):
+                    watchdog.flag(f"session 失效 ({driver_command}: {str(e).splitlines()[0][:120]})")
+                raise
+            finally:
+                elapsed = time.monotonic() - start
+                with watchdog._lock:
+                    watchdog._inflight.pop(token, None)
+                    watchdog.commands += 1
+                    if elapsed > watchdog.slowest[1]:
+                        watchdog.slowest = (driver_command, elapsed)
+                if watchdog.metrics:
+                    watchdog.metrics.record("webdriver_command", elapsed)
+
+        driver.execute = timed_execute
+        with self._lock:
+            self._driver = driver
+            self._inflight.clear()
+            self._killed.clear()
+            self.reason = None
+
+    def flag(self, reason):
+        """標記 session 異常（只保留第一個原因）。"""
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+                logger.error(f"🚨 瀏覽器異常: {reason}")
+
+    def _service_pid(self):
+        process = getattr(getattr(self._driver, 'service', None), 'process', None)
+        return process, getattr(process, 'pid', None)
+
+    def kill(self):
+        """強制結束目前 driver 的 WebDriver 與瀏覽器行程樹。"""
+        _, pid = self._service_pid()
+        if pid:
+            kill_process_tree(pid)
+
+    def _check(self):
+        now = time.monotonic()
+        with self._lock:
+            hung = [
+                (token, command, now - start) for token, (command, start) in self._inflight.items()
+                if now - start > self.hang_timeout and token not in self._killed
+            ]
+            self._killed.update(token for token, _, _ in hung)
+        for _, command, elapsed in hung:
+            self.flag(f"指令卡住 ({command} 已 {elapsed:.0f} 秒)")
+            logger.warning("🔪 強制結束卡住的瀏覽器，讓目前的呼叫返回")
+            self.kill()
+
+        process, pid = self._service_pid()
+        if process is not None and process.poll() is not None:
+            self.flag(f"WebDriver 行程已結束 (結束代碼 {process.returncode})")
+            return
+        if pid:
+            rss = process_tree_rss(pid) or 0
+            self.peak_rss = max(self.peak_rss, rss)
+            if self.max_rss_mb and rss > self.max_rss_mb * 1024 * 1024:
+                self.flag(f"記憶體膨脹 ({rss / 1024 / 1024:.0f} MB > {self.max_rss_mb} MB)")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self._driver is None:
+                continue
+            try:
+                self._check()
+            except Exception as e:
+                logger.debug(f"watchdog 檢查失敗: {e}")
+
+    def stats(self):
+        """返回 {"commands", "slowest_command", "slowest_seconds", "peak_rss_mb"}。"""
+        with self._lock:
+            command, seconds = self.slowest
+            return {
+                "commands": self.commands,
+                "slowest_command": command,
+                "slowest_seconds": round(seconds, 3),
+                "peak_rss_mb": round(self.peak_rss / 1024 / 1024, 1) if self.peak_rss else None,
+            }
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+        self._driver = None
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import io
+import queue
+import logging
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from PIL import Image
+
+from src.storage import LooseStore
+
+logger = logging.getLogger(__name__)
+
+
+def spread_part_paths(path, count=2):
+    """一次翻頁輸出多頁時各檔案的路徑（依閱讀順序）：page_0001_1.png、page_0001_2.png ..."""
+    path = Path(path)
+    return [path.with_name(f"{path.stem}_{i}{path.suffix}") for i in range(1, count + 1)]
+
+
+def split_spread(png_bytes, rtl=False):
+    """
+    將跨頁（左右兩頁並排）的截圖從中線切成兩頁。
+
+    Args:
+        png_bytes (bytes): 跨頁截圖。
+        rtl (bool): 右翻書（直排）時右半頁在前。
+
+    Returns:
+        list[bytes]: 依閱讀順序排列的兩張 PNG。
+    """
+    parts = []
+    with Image.open(io.BytesIO(png_bytes)) as img:
+        middle = img.width // 2
+        boxes = [(0, 0, middle, img.height), (middle, 0, img.width, img.height)]
+        if rtl:
+            boxes.reverse()
+        for box in boxes:
+            buf = io.BytesIO()
+            img.crop(box).save(buf, format='PNG')
+            parts.append(buf.getvalue())
+    return parts
+
+
+def write_page(png_bytes, path, spread=None, min_size=1024, reencode=None, store=None, metrics=None):
+    """
+    驗證並寫入一張截圖，返回實際寫出的 [(path, data)]。
+
+    Args:
+        spread (str): None 表示單頁；'ltr' / 'rtl' 表示跨頁，需依閱讀方向拆成兩頁。
+        store: 頁面儲存（見 src.storage），預設每頁寫成一個檔案。
+        metrics (Metrics): 可選，記錄 encode 與 disk_write 的耗時。
+    """
+    if not png_bytes or len(png_bytes) < min_size:
+        raise ValueError(f"截圖為空或過小 ({len(png_bytes or b'')} bytes)")
+    with Image.open(io.BytesIO(png_bytes)) as img:
+        img.verify()
+
+    path = Path(path)
+    if spread:
+        pages = zip(split_spread(png_bytes, rtl=(spread == 'rtl')), spread_part_paths(path))
+    else:
+        pages = [(png_bytes, path)]
+
+    store = store or LooseStore(path.parent)
+    span = metrics.span if metrics else (lambda phase: nullcontext())
+    written = []
+    for data, target in pages:
+        if reencode:
+            with span("encode"):
+                data, target = reencode(data, target)
+        with span("disk_write"):
+            store.put(target, data)
+        written.append((target, data))
+    return written
+
+
+class ScreenshotWriter:
+    """
+    背景截圖寫入器。
+
+    瀏覽器執行緒只負責取得截圖的 PNG 位元組並呼叫 submit()，
+    解碼驗證、（可選的）重新編碼與寫入磁碟都在背景執行緒完成，
+    讓下一次翻頁可以立即開始。
+
+    佇列有上限：寫入速度跟不上截圖時，submit() 會阻塞（背壓），避免記憶體無限增長。
+    """
+
+    def __init__(self, workers=2, queue_size=8, min_size=1024, reencode=None, metrics=None):
+        """
+        Args:
+            workers (int): 背景寫入執行緒數量。
+            queue_size (int): 佇列中最多等待寫入的截圖數量。
+            min_size (int): 截圖位元組數下限，小於此值視為空白截圖。
+            reencode (callable): 可選，接收 (png_bytes, path) 並返回 (bytes, path) 的重新編碼函式。
+            metrics (Metrics): 可選，記錄每頁編碼與寫入的耗時。
+        """
+        self.min_size = min_size
+        self.reencode = reencode
+        self.metrics = metrics
+        self.written = 0
+        # 每頁寫入完成後呼叫 listener(page_num, [(path, data)])，於背景執行緒中執行
+        self.listeners = []
+        # 寫入失敗時呼叫 failure_listener(page_num, error)
+        self.failure_listeners = []
+        self._failures = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._threads = []
+        for i in range(max(1, workers)):
+            thread = threading.Thread(
+                target=self._worker, name=f"screenshot-writer-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, page_num, png_bytes, path, spread=None, store=None):
+        """將截圖放入寫入佇列；佇列已滿時會等待空位。spread、store 見 write_page()。"""
+        if self._queue.full():
+            logger.info(f"⏳ 寫入佇列已滿，等待背景寫入 (第 {page_num} 頁)...")
+        self._queue.put((page_num, png_bytes, Path(path), spread, store))
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                page_num, png_bytes, path, spread, store = job
+                try:
+                    written = write_page(
+                        png_bytes, path, spread=spread,
+                        min_size=self.min_size, reencode=self.reencode, store=store,
+                        metrics=self.metrics,
+                    )
+                    with self._lock:
+                        self.written += 1
+                    logger.info(f"💾 已寫入: {', '.join(p.name for p, _ in written)}")
+                    for listener in self.listeners:
+                        listener(page_num, written)
+                except Exception as e:
+                    logger.error(f"❌ 第 {page_num} 頁寫入失敗: {e}")
+                    with self._lock:
+                        self._failures[page_num] = str(e)
+                    for listener in self.failure_listeners:
+                        listener(page_num, e)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """等待佇列中所有截圖寫入完成。"""
+        self._queue.join()
+
+    def pop_failures(self):
+        """返回並清除目前累積的寫入失敗 {頁碼: 原因}。"""
+        with self._lock:
+            failures, self._failures = self._failures, {}
+        return failures
+
+    def close(self):
+        """寫完佇列中的截圖後停止所有背景執行緒。"""
+        self.flush()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""組書時重複頁仍佔一頁：輸出的 PDF / CBZ 頁數與原書相同。"""
+
+import io
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+from src.assembler import BookAssembler, assemble_pdf, book_page_names  # noqa: E402
+from src.manifest import BookManifest  # noqa: E402
+from src.storage import open_store  # noqa: E402
+
+
+def _png(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class BookAssemblerDuplicateTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _assemble(self, fmt):
+        assembler = BookAssembler(self.output_dir / f"book.{fmt}", fmt)
+        # 背景寫入不依頁碼順序完成：重複頁與失敗頁先於原頁到達
+        assembler.duplicate(3, 1)
+        assembler.skip(4)
+        assembler.add(2, [("page_0002.png", _png("blue"))])
+        assembler.add(1, [("page_0001.png", _png("white"))])
+        assembler.add(5, [("page_0005.png", _png("green"))])
+        assembler.close()
+        return assembler
+
+    def test_pdf_reuses_image_for_duplicate_page(self):
+        assembler = self._assemble("pdf")
+        data = assembler.path.read_bytes()
+        self.assertEqual(assembler.page_count, 4)
+        self.assertEqual(data.count(b"/Type /Page "), 4)
+        self.assertEqual(data.count(b"/Subtype /Image"), 3)
+
+    def test_cbz_repeats_duplicate_page(self):
+        assembler = self._assemble("cbz")
+        with zipfile.ZipFile(assembler.path) as archive:
+            names = archive.namelist()
+            self.assertEqual(names, ["0001.png", "0002.png", "0003.png", "0004.png"])
+            self.assertEqual(archive.read("0003.png"), archive.read("0001.png"))
+
+    def test_book_page_names_lists_duplicate_pages(self):
+        manifest = BookManifest(self.output_dir)
+        store = open_store(self.output_dir)
+        for page, color in ((1, "white"), (2, "blue")):
+            path = self.output_dir / f"page_{page:04d}.png"
+            data = _png(color)
+            store.put(path, data)
+            manifest.record_page(page, [(path, data)])
+        manifest.record_duplicate(3, 1)
+        manifest.record_failure(4, "capture failed")
+        manifest.flush()
+        store.close()
+
+        self.assertEqual(book_page_names(self.output_dir), ["page_0001.png", "page_0002.png", "page_0001.png"])
+        pdf = assemble_pdf(self.output_dir).read_bytes()
+        self.assertEqual(pdf.count(b"/Type /Page "), 3)
+        self.assertEqual(pdf.count(b"/Subtype /Image"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""編碼階段：裁邊（背景色取四角中位數）與輸出格式。"""
+
+import io
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from src.encoder import encode_options, encode_page, needs_encoding, trim_margins  # noqa: E402
+
+
+def _page(corner_mark=False):
+    """200x300 的白色頁面，內容在 (50, 60)-(149, 239)；可在左上角加上頁碼般的深色記號。"""
+    img = Image.new('RGB', (200, 300), 'white')
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((50, 60, 149, 239), fill='black')
+    if corner_mark:
+        draw.rectangle((0, 0, 3, 3), fill=(40, 40, 40))
+    return img
+
+
+def _png(img):
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class EncoderTest(unittest.TestCase):
+    def test_encode_trims_and_converts(self):
+        options = encode_options({"trim_margins": True, "image_mode": "grayscale", "image_format": "webp"})
+        self.assertTrue(needs_encoding(options))
+        data, target = encode_page(_png(_page()), Path("out/page_0001.png"), options)
+        self.assertEqual(target, Path("out/page_0001.webp"))
+        with Image.open(io.BytesIO(data)) as img:
+            self.assertEqual(img.format, "WEBP")
+            # 內容 100x180，四周各保留 trim_padding (8) 像素
+            self.assertEqual(img.size, (116, 196))
+
+    def test_corner_mark_does_not_become_background(self):
+        # 只取左上角時，深色記號會被當成背景，整頁都不會裁掉
+        trimmed = trim_margins(_page(corner_mark=True), padding=8)
+        self.assertEqual(trimmed.size, (158, 248))
+
+    def test_blank_page_is_unchanged(self):
+        img = Image.new('RGB', (40, 30), 'white')
+        self.assertEqual(trim_margins(img).size, (40, 30))
+
+    def test_default_options_keep_original_png(self):
+        self.assertFalse(needs_encoding(encode_options({})))
+        data, target = encode_page(_png(_page()), Path("page_0001.png"), encode_options({"image_format": "jpeg"}))
+        self.assertEqual(target.suffix, ".jpg")
+        with Image.open(io.BytesIO(data)) as img:
+            self.assertEqual((img.format, img.size), ("JPEG", (200, 300)))
+
+
+if __name__ == '__main__':
+    unittest.main()
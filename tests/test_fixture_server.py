@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""端對端測試用的模擬閱讀器伺服器可啟動，並回應首頁與閱讀器頁面。"""
+
+import sys
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from fixture_server import ReaderFixture  # noqa: E402
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.status, response.read().decode('utf-8')
+
+
+class ReaderFixtureTest(unittest.TestCase):
+    def test_serves_home_and_reader_pages(self):
+        with ReaderFixture(pages=7, tutorial_steps=2) as fixture:
+            status, home = _get(fixture.base_url)
+            self.assertEqual(status, 200)
+            for marker in ('id="close_top_banner"', '會員登入', 'id="login_id_width01"', 'id="login_pswd"'):
+                self.assertIn(marker, home)
+
+            status, reader = _get(fixture.book_url())
+            self.assertEqual(status, 200)
+            for marker in ('id="UIObj-demo-next-btn"', '"epubjs-view-"', 'class="next"', 'window.rendition'):
+                self.assertIn(marker, reader)
+            # 設定以 JSON 注入頁面，%% 跳脫已還原
+            self.assertIn('"pages": 7', reader)
+            self.assertIn('"tutorial_steps": 2', reader)
+            self.assertNotIn('%%', reader)
+
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                _get(fixture.base_url + "missing")
+            self.assertEqual(ctx.exception.code, 404)
+            self.assertEqual(fixture.requests, 3)
+
+    def test_http_error_injection(self):
+        with ReaderFixture(http_error_rate=1.0) as fixture:
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                _get(fixture.book_url())
+            self.assertEqual(ctx.exception.code, 503)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""全頁截圖與其他截圖方式共用寫入後的流程（manifest、組書、OCR）。"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+from src import crawler as crawler_module  # noqa: E402
+from src.crawler import BooksCrawler  # noqa: E402
+from src.manifest import BookManifest  # noqa: E402
+
+
+class _FakeStitcher:
+    """寫出兩個條帶檔案，模擬過高而拆開的頁面。"""
+
+    def __init__(self, driver, max_strip_height=16000):
+        pass
+
+    def capture(self, filename, geometry=None):
+        path = Path(filename)
+        outputs = [path, path.with_name(f"{path.stem}_part02{path.suffix}")]
+        for index, output in enumerate(outputs):
+            Image.new('RGB', (16, 16), (index * 200, 0, 0)).save(output, 'PNG')
+        return outputs
+
+
+class _RecordingOcr:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, page_num, path, data, store=None):
+        self.submitted.append((page_num, Path(path).name))
+
+
+class FullPageCaptureTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.config = {"metrics_dir": "", "page_turn_cache": "", "session_file": "", "async_write": False}
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _crawler(self, backend):
+        crawler = BooksCrawler(dict(self.config, output_backend=backend), driver=object())
+        crawler.output_dir = Path("out")
+        crawler.output_dir.mkdir()
+        crawler.manifest = BookManifest(crawler.output_dir)
+        crawler.ocr = _RecordingOcr()
+        return crawler
+
+    def test_full_page_pages_go_through_on_page_written(self):
+        for backend in ("loose", "pack"):
+            with self.subTest(backend=backend):
+                crawler = self._crawler(backend)
+                try:
+                    with mock.patch.object(crawler_module, "FullPageStitcher", _FakeStitcher):
+                        self.assertTrue(crawler.capture_full_page_screenshot("out/page_0003.png", 3))
+                    names = ["page_0003.png", "page_0003_part02.png"]
+                    self.assertEqual(crawler.manifest.data["pages"]["3"]["files"], names)
+                    self.assertEqual(crawler.ocr.submitted, [(3, name) for name in names])
+                    self.assertEqual(crawler._get_store().names(), names)
+                    on_disk = sorted(p.name for p in crawler.output_dir.iterdir() if p.suffix == ".png")
+                    self.assertEqual(on_disk, names if backend == "loose" else [])
+                finally:
+                    crawler.ocr = None
+                    crawler.close()
+                    for path in Path("out").iterdir():
+                        path.unlink()
+                    Path("out").rmdir()
+
+    def test_repeated_full_page_capture_is_a_duplicate(self):
+        crawler = self._crawler("loose")
+        try:
+            with mock.patch.object(crawler_module, "FullPageStitcher", _FakeStitcher):
+                crawler.capture_full_page_screenshot("out/page_0001.png", 1)
+                crawler._previous_capture = None  # 與上一頁位置不同，只比對內容
+                self.assertTrue(crawler.capture_full_page_screenshot("out/page_0002.png", 2))
+            self.assertEqual(crawler._last_capture_status, 'duplicate')
+            self.assertEqual(crawler.manifest.data["pages"]["2"], {
+                "duplicate_of": 1, "captured_at": crawler.manifest.data["pages"]["2"]["captured_at"],
+            })
+            self.assertFalse(Path("out/page_0002.png").exists())
+        finally:
+            crawler.ocr = None
+            crawler.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
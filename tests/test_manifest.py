@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""manifest.json 以檢查點批次寫回，不在每次更新時重寫整份檔案。"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import manifest as manifest_module  # noqa: E402
+from src.manifest import BookManifest  # noqa: E402
+
+
+class ManifestCheckpointTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_updates_are_batched_until_flush(self):
+        save = mock.Mock(wraps=manifest_module.save_json_file)
+        with mock.patch.object(manifest_module, "save_json_file", save):
+            manifest = BookManifest(self.output_dir, "http://example.invalid/book", checkpoint_seconds=60)
+            for page in range(1, 201):
+                manifest.record_page(page, [(self.output_dir / f"page_{page:04d}.png", b"png")])
+                manifest.record_location(page, {"cfi": f"epubcfi(/6/{page * 2})"})
+            self.assertEqual(save.call_count, 1)
+            self.assertEqual(BookManifest(self.output_dir).last_good_page(), 1)
+
+            manifest.flush()
+            manifest.flush()
+        self.assertEqual(save.call_count, 2)
+        self.assertEqual(BookManifest(self.output_dir).last_good_page(), 200)
+
+    def test_zero_interval_writes_every_update(self):
+        manifest = BookManifest(self.output_dir, checkpoint_seconds=0)
+        manifest.record_failure(3, "capture failed")
+        manifest.record_failure(7, "capture failed")
+        self.assertEqual(BookManifest(self.output_dir).failed_pages(), [3, 7])
+
+
+if __name__ == '__main__':
+    unittest.main()
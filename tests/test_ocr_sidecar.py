@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""OCR 結果經由頁面儲存寫入：pack / cbz 時存進容器，不在容器旁另外留下檔案。"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.ocr import load_sidecar, save_sidecar  # noqa: E402
+from src.storage import BACKENDS, open_store  # noqa: E402
+
+
+class SidecarStoreTest(unittest.TestCase):
+    def test_sidecar_round_trip_through_store(self):
+        result = {"text": "第一頁", "words": []}
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), tempfile.TemporaryDirectory() as tmp:
+                output_dir = Path(tmp)
+                store = open_store(output_dir, backend)
+                store.put(output_dir / "page_0001.png", b"\x89PNG" + b"\x00" * 64)
+                save_sidecar(output_dir / "page_0001.png", result, store)
+                store.close()
+
+                store = open_store(output_dir, backend, readonly=True)
+                try:
+                    self.assertEqual(load_sidecar("page_0001.png", store), result)
+                    self.assertIsNone(load_sidecar("page_0002.png", store))
+                    self.assertEqual(store.names(), ["page_0001.png"])
+                finally:
+                    store.close()
+                if backend != "loose":
+                    self.assertFalse((output_dir / "page_0001.ocr.json").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
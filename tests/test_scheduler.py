@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""批次模式的工作檔、工作佇列與速率限制（不需瀏覽器）。"""
+
+import sys
+import json
+import time
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import scheduler  # noqa: E402
+from src.scheduler import JobQueue, RateLimiter, load_job_file  # noqa: E402
+
+
+class LoadJobFileTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_text_file(self):
+        path = self.dir / "books.txt"
+        path.write_text(
+            "# 註解\n"
+            "https://x/1\n"
+            "\n"
+            "https://x/2, 300\n"
+            "https://x/3, 120, 5\n"
+            "https://x/4, , 2\n",
+            encoding="utf-8",
+        )
+        self.assertEqual(load_job_file(path), [
+            {"url": "https://x/1", "pages": None, "priority": 0},
+            {"url": "https://x/2", "pages": 300, "priority": 0},
+            {"url": "https://x/3", "pages": 120, "priority": 5},
+            {"url": "https://x/4", "pages": None, "priority": 2},
+        ])
+
+    def test_malformed_rows_are_skipped(self):
+        path = self.dir / "books.txt"
+        path.write_text("https://x/1, 300頁\nhttps://x/2, 10, high\nhttps://x/3, 10\n", encoding="utf-8")
+        with self.assertLogs("src.scheduler", "WARNING") as logs:
+            entries = load_job_file(path)
+        self.assertEqual(entries, [{"url": "https://x/3", "pages": 10, "priority": 0}])
+        self.assertIn("第 1 行", logs.output[0])
+        self.assertIn("第 2 行", logs.output[1])
+
+    def test_json_file(self):
+        path = self.dir / "books.json"
+        path.write_text('[{"url": "https://x/1", "pages": 50, "priority": 1}, {"pages": 10}]', encoding="utf-8")
+        self.assertEqual(load_job_file(path), [{"url": "https://x/1", "pages": 50, "priority": 1}])
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.state_path = Path(self._tmp.name) / "queue_state.json"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_priority_order_and_completion(self):
+        jobs = JobQueue(max_attempts=1)
+        jobs.add("https://x/low", priority=0)
+        jobs.add("https://x/high", pages=10, priority=5)
+        jobs.add("https://x/low", pages=20, priority=1)  # 相同網址只更新頁數與優先順序
+        self.assertEqual(len(jobs.jobs), 2)
+
+        first = jobs.next_job()
+        self.assertEqual((first["url"], first["pages"], first["status"]), ("https://x/high", 10, "running"))
+        second = jobs.next_job()
+        self.assertEqual((second["url"], second["pages"]), ("https://x/low", 20))
+        jobs.complete(first, "output/a")
+        jobs.fail(second, RuntimeError("boom"))
+        self.assertIsNone(jobs.next_job())
+        self.assertEqual(jobs.summary(), {"done": 1, "failed": 1})
+        self.assertEqual(first["output_dir"], "output/a")
+        self.assertEqual(second["last_error"], "boom")
+
+    def test_backoff_until_max_attempts(self):
+        jobs = JobQueue(max_attempts=3, backoff_base=10)
+        jobs.add("https://x/1")
+        job = jobs.next_job()
+        with mock.patch.object(scheduler.random, "uniform", return_value=1.0):
+            before = time.time()
+            jobs.fail(job, "first")
+            self.assertEqual(job["status"], "pending")
+            self.assertAlmostEqual(job["next_attempt_at"] - before, 10, delta=1)
+
+            job["next_attempt_at"] = 0  # 不等待退避時間
+            self.assertIs(jobs.next_job(), job)
+            before = time.time()
+            jobs.fail(job, "second")
+            self.assertAlmostEqual(job["next_attempt_at"] - before, 20, delta=1)
+
+            job["next_attempt_at"] = 0
+            self.assertIs(jobs.next_job(), job)
+            jobs.fail(job, "third")
+        self.assertEqual((job["status"], job["attempts"]), ("failed", 3))
+        self.assertIsNone(jobs.next_job())
+
+    def test_next_job_waits_for_backoff(self):
+        jobs = JobQueue(max_attempts=2, backoff_base=0.2)
+        jobs.add("https://x/1")
+        job = jobs.next_job()
+        jobs.fail(job, "retry")
+        start = time.monotonic()
+        self.assertIs(jobs.next_job(), job)
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_state_survives_restart(self):
+        jobs = JobQueue(self.state_path)
+        jobs.add("https://x/1", pages=100)
+        jobs.add("https://x/2")
+        running = jobs.next_job()
+        jobs.started(running, "output/ebook_1")
+        done = jobs.next_job()
+        jobs.complete(done, "output/ebook_2")
+
+        saved = json.loads(self.state_path.read_text(encoding="utf-8"))
+        self.assertEqual([job["status"] for job in saved], ["running", "done"])
+
+        # 重新啟動：執行到一半的工作回到待處理，並保留輸出目錄供續傳
+        restored = JobQueue(self.state_path)
+        self.assertEqual(restored.summary(), {"pending": 1, "done": 1})
+        job = restored.next_job()
+        self.assertEqual((job["url"], job["output_dir"], job["pages"]), ("https://x/1", "output/ebook_1", 100))
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_limits_request_rate_across_threads(self):
+        limiter = RateLimiter(20, burst=1)
+        start = time.monotonic()
+        threads = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(3)]) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 9 次請求、容量 1：第一次立即通過，其餘每 1/20 秒一次
+        self.assertGreaterEqual(time.monotonic() - start, 8 / 20 * 0.9)
+
+    def test_burst_passes_immediately(self):
+        limiter = RateLimiter(1, burst=5)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_zero_rate_is_unlimited(self):
+        limiter = RateLimiter(0)
+        start = time.monotonic()
+        for _ in range(1000):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
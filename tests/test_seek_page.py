@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""seek_page() / recapture_pages() 在沒有任何位置記錄 (CFI) 時的定位，以及 resume_capture() 確認跳轉位置。"""
+
+import io
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+from src import scripts  # noqa: E402
+from src.crawler import BooksCrawler  # noqa: E402
+from src.manifest import BookManifest  # noqa: E402
+
+BOOK_PAGES = 10
+
+
+class _SwitchTo:
+    def default_content(self):
+        pass
+
+    def frame(self, frame):
+        pass
+
+
+class FakeReader:
+    """模擬不回報位置的閱讀器：get() 回到第 1 頁，翻頁按鈕前進一頁。"""
+
+    def __init__(self):
+        self.switch_to = _SwitchTo()
+        self.page = 1
+        self.helper = False
+        self.loads = 0
+
+    def get(self, url):
+        self.page, self.helper = 1, False
+        self.loads += 1
+
+    def set_script_timeout(self, seconds):
+        pass
+
+    def get_screenshot_as_png(self):
+        rng = random.Random(self.page)
+        image = Image.frombytes('RGB', (32, 32), bytes(rng.randrange(256) for _ in range(32 * 32 * 3)))
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        return buffer.getvalue()
+
+    def _state(self):
+        return {'ready': True, 'location': None, 'geometry': [1, 1, 1]}
+
+    def execute_script(self, script, *args):
+        if script == scripts.READER_HELPER_JS:
+            self.helper = True
+            return None
+        if script == scripts.READER_STATE_JS:
+            return self._state() if self.helper else None
+        return True
+
+    def execute_async_script(self, script, *args):
+        if script == scripts.WAIT_FOR_ANY_JS:
+            return None
+        if not self.helper:
+            return None
+        if args[0].get('xpaths'):
+            if self.page >= BOOK_PAGES:
+                return {'clicked': -1}
+            self.page += 1
+        return {'clicked': 0, 'settled': True, 'elapsed': 10, 'state': self._state()}
+
+
+class LocatingReader(FakeReader):
+    """回報位置的閱讀器；跳轉時抵達 landing(target) 回傳的頁碼，並一律回報成功。"""
+
+    def __init__(self, landing):
+        super().__init__()
+        self.landing = landing
+
+    def _state(self):
+        return {'ready': True, 'location': {'cfi': _cfi(self.page)}, 'geometry': [1, 1, 1]}
+
+    def execute_async_script(self, script, *args):
+        if script == scripts.SEEK_LOCATION_JS:
+            self.page = self.landing(args[0])
+            return {'cfi': _cfi(self.page)}
+        if script == scripts.DISPLAY_LOCATION_JS:
+            self.page = self.landing(args[0])
+            return True
+        return super().execute_async_script(script, *args)
+
+
+def _cfi(page):
+    return f"epubcfi(/6/{page * 2})"
+
+
+class RecordingCrawler(BooksCrawler):
+    def __init__(self, config, driver):
+        super().__init__(config, driver=driver)
+        self.captured = {}
+
+    def find_and_switch_to_ebook_iframe(self):
+        self._tutorial_handled, self._ebook_iframe = True, object()
+        return True
+
+    def capture_page_with_retry(self, page_num, max_retries=3, full_page=False):
+        self.captured[page_num] = self.driver.page
+        return True
+
+
+class SeekPageWithoutLocationsTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.config = {
+            "metrics_dir": "", "page_turn_cache": "", "session_file": "",
+            "async_write": False, "settle_pixel_check": False,
+        }
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_recapture_non_adjacent_pages(self):
+        manifest = BookManifest("out", "http://example.invalid/book")
+        manifest.record_failure(3, "capture failed")
+        manifest.record_failure(7, "capture failed")
+        manifest.flush()
+
+        driver = FakeReader()
+        crawler = RecordingCrawler(self.config, driver)
+        try:
+            result = crawler.recapture_pages("out", delay=1)
+        finally:
+            crawler.close()
+
+        self.assertEqual(crawler.captured, {3: 3, 7: 7})
+        self.assertEqual(result["recaptured"], [3, 7])
+        # 第 7 頁沒有錨點，必須重新開啟書籍回到第 1 頁後再翻
+        self.assertEqual(driver.loads, 2)
+
+    def test_seek_page_fails_when_start_unreachable(self):
+        driver = FakeReader()
+        crawler = RecordingCrawler(self.config, driver)
+        crawler.book_url = "http://example.invalid/book"
+        crawler._return_to_start = lambda: False
+        try:
+            self.assertIsNone(crawler.seek_page(4, delay=1))
+        finally:
+            crawler.close()
+
+
+class ResumeCaptureTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        self.config = {
+            "metrics_dir": "", "page_turn_cache": "", "session_file": "",
+            "async_write": False, "settle_pixel_check": False,
+        }
+        manifest = BookManifest("out", "http://example.invalid/book")
+        for page in range(1, 5):
+            manifest.record_page(page, [(Path("out") / f"page_{page:04d}.png", b"png")])
+            manifest.record_location(page, {'cfi': _cfi(page)})
+        manifest.flush()
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _resume(self, driver):
+        crawler = RecordingCrawler(self.config, driver)
+        try:
+            self.assertTrue(crawler.resume_capture("out", delay=1))
+        finally:
+            crawler.close()
+        return crawler
+
+    def test_resume_jumps_to_checkpointed_location(self):
+        driver = LocatingReader(landing=lambda cfi: int(cfi[len("epubcfi(/6/"):-1]) // 2)
+        crawler = self._resume(driver)
+        self.assertEqual(crawler.captured, {page: page for page in range(5, BOOK_PAGES + 1)})
+        self.assertEqual(driver.loads, 1)
+
+    def test_resume_does_not_trust_wrong_landing(self):
+        # 閱讀器回報跳轉成功，但停在章節開頭（第 2 頁）而不是記錄的位置
+        driver = LocatingReader(landing=lambda cfi: 2)
+        crawler = self._resume(driver)
+        # 不以錯誤的位置接續頁碼：重新開啟書籍後逐頁翻回第 4 頁，從第 5 頁起與實際頁面一致
+        self.assertEqual(crawler.captured, {page: page for page in range(5, BOOK_PAGES + 1)})
+        self.assertEqual(driver.loads, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""瀏覽器池只在第一個瀏覽器確實登入後才啟動其餘瀏覽器。"""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import session_pool  # noqa: E402
+from src.session_pool import DriverPool  # noqa: E402
+
+
+class _FakeCrawler:
+    login_result = False
+    created = []
+
+    def __init__(self, config, metrics=None):
+        self.metrics = metrics
+        self.closed = False
+        self.restored = None
+        _FakeCrawler.created.append(self)
+
+    def login(self, auto_captcha=False):
+        return self.login_result
+
+    def export_session_state(self):
+        return {"cookies": [{"name": "session", "value": "x"}]}
+
+    def restore_session_state(self, state):
+        self.restored = state
+
+    def close(self):
+        self.closed = True
+
+
+class DriverPoolStartTest(unittest.TestCase):
+    def setUp(self):
+        _FakeCrawler.created = []
+        patcher = mock.patch.object(session_pool, "BooksCrawler", _FakeCrawler)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_failed_login_stops_before_launching_pool(self):
+        _FakeCrawler.login_result = False
+        pool = DriverPool({}, size=3)
+        with self.assertRaises(RuntimeError):
+            pool.start(auto_captcha=True)
+        self.assertEqual(len(_FakeCrawler.created), 1)
+        self.assertTrue(_FakeCrawler.created[0].closed)
+        self.assertIsNone(pool.session_state)
+        self.assertEqual(pool.drivers, [])
+
+    def test_successful_login_shares_session(self):
+        _FakeCrawler.login_result = True
+        pool = DriverPool({}, size=3)
+        pool.start(auto_captcha=True)
+        self.assertEqual(len(pool.drivers), 3)
+        self.assertEqual(
+            [crawler.restored for crawler in _FakeCrawler.created[1:]], [pool.session_state] * 2
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""全頁拼接：最後一段捲動受限時依實際位置裁掉重疊，輸出與原頁逐列相同。"""
+
+import io
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+from src.stitcher import PAGE_GEOMETRY_JS, SCROLL_TO_JS, FullPageStitcher  # noqa: E402
+
+WIDTH, HEIGHT = 8, 100
+
+
+def _row_color(y):
+    """每一列以顏色編碼其在頁面中的絕對位置。"""
+    return (y % 256, y // 256, 0)
+
+
+class FakeDriver:
+    """
+    以 benchmarks/bench_full_page.py 的 FakeDriver 為基礎：捲動位置會被限制在
+    scrollHeight - innerHeight，截圖內容取自頁面的實際位置。scale 模擬裝置像素比。
+    """
+
+    def __init__(self, total_height, scale=1):
+        self.total_height = total_height
+        self.scale = scale
+        self.scroll_y = 0
+        page = Image.new('RGB', (WIDTH, total_height))
+        page.putdata([_row_color(y) for y in range(total_height) for _ in range(WIDTH)])
+        self.page = page
+
+    def execute_script(self, script, *args):
+        if script == PAGE_GEOMETRY_JS:
+            return [self.total_height, HEIGHT, WIDTH]
+        if script == SCROLL_TO_JS:
+            self.scroll_y = max(0, min(args[0], self.total_height - HEIGHT))
+            return self.scroll_y
+        raise ValueError(script)
+
+    def get_screenshot_as_png(self):
+        shot = self.page.crop((0, self.scroll_y, WIDTH, self.scroll_y + HEIGHT))
+        shot = shot.resize((WIDTH * self.scale, HEIGHT * self.scale), Image.Resampling.NEAREST)
+        buffer = io.BytesIO()
+        shot.save(buffer, 'PNG')
+        return buffer.getvalue()
+
+
+class FullPageStitcherTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.filename = Path(self._tmp.name) / "page_0001.png"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _rows(self, outputs):
+        rows = []
+        for path in outputs:
+            with Image.open(path) as img:
+                rows.extend(img.getpixel((0, y)) for y in range(img.height))
+        return rows
+
+    def test_last_viewport_overlap_is_cropped(self):
+        # 250 不是視窗高度的倍數：最後一次只能捲到 150，須裁掉與上一段重疊的 50 列
+        for scale in (1, 2):
+            with self.subTest(scale=scale):
+                driver = FakeDriver(250, scale)
+                outputs = FullPageStitcher(driver, scroll_pause=0).capture(self.filename)
+                self.assertEqual(outputs, [self.filename])
+                with Image.open(self.filename) as img:
+                    self.assertEqual(img.size, (WIDTH * scale, 250 * scale))
+                expected = [_row_color(y) for y in range(250) for _ in range(scale)]
+                self.assertEqual(self._rows(outputs), expected)
+
+    def test_tall_page_is_split_into_strips(self):
+        driver = FakeDriver(250)
+        outputs = FullPageStitcher(driver, max_strip_height=120, scroll_pause=0).capture(self.filename)
+        self.assertEqual([p.name for p in outputs], ["page_0001.png", "page_0001_part02.png", "page_0001_part03.png"])
+        heights = []
+        for path in outputs:
+            with Image.open(path) as img:
+                heights.append(img.height)
+        self.assertEqual(heights, [120, 120, 10])
+        self.assertEqual(self._rows(outputs), [_row_color(y) for y in range(250)])
+        self.assertEqual(sorted(p.name for p in self.filename.parent.iterdir()), [p.name for p in outputs])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""頁面儲存（loose / pack / cbz）的寫入、取代與重新開啟。"""
+
+import os
+import struct
+import sys
+import tempfile
+import unittest
+import warnings
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.storage import BACKENDS, CBZ_FILENAME, PACK_FILENAME, open_store  # noqa: E402
+
+# 大小不一的頁面（含空白與跨頁拆分的名稱），確認每頁的位移與長度都正確
+PAGES = {
+    "page_0001.png": b"\x89PNG" + bytes(range(256)) * 40,
+    "page_0002_1.png": b"",
+    "page_0002_2.png": b"left-right" * 3,
+    "page_0003.webp": os.urandom(70000),
+}
+
+
+class StoreRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _assert_pages(self, store, pages):
+        self.assertEqual(store.names(), sorted(pages))
+        for name, data in pages.items():
+            self.assertIn(name, store)
+            self.assertEqual(bytes(store.get(name)), data)
+
+    def test_put_close_reopen_get(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend), tempfile.TemporaryDirectory() as tmp:
+                output_dir = Path(tmp)
+                store = open_store(output_dir, backend)
+                self.assertEqual(store.backend, backend)
+                for name, data in PAGES.items():
+                    store.put(output_dir / name, data)
+                    # 寫入中即可讀回（容器以 mmap 讀取，需先 flush 並重新對應）
+                    self.assertEqual(bytes(store.get(name)), data)
+                store.close()
+
+                store = open_store(output_dir, readonly=True)
+                try:
+                    self.assertEqual(store.backend, backend)
+                    self._assert_pages(store, PAGES)
+                    self.assertNotIn("page_0009.png", store)
+                finally:
+                    store.close()
+
+                # 重新開啟續寫
+                store = open_store(output_dir, backend)
+                store.put(output_dir / "page_0004.png", b"appended" * 50)
+                store.close()
+                store = open_store(output_dir, readonly=True)
+                try:
+                    self._assert_pages(store, dict(PAGES, **{"page_0004.png": b"appended" * 50}))
+                finally:
+                    store.close()
+
+    def test_pack_rebuilds_index_after_unclean_close(self):
+        store = open_store(self.output_dir, "pack")
+        for name, data in PAGES.items():
+            store.put(self.output_dir / name, data)
+        store._flush()
+        # 模擬寫到一半中斷：沒有索引與檔尾，最後一筆記錄不完整
+        pack_path = self.output_dir / PACK_FILENAME
+        complete_size = pack_path.stat().st_size
+        store._file.write(struct.pack("<4sHI", b"PAGE", 13, 5000) + b"page_0005.png" + b"partial")
+        store._file.close()
+        store._file = None
+        store._unmap()
+
+        with self.assertLogs("src.storage", "WARNING"):
+            store = open_store(self.output_dir, readonly=True)
+        try:
+            self._assert_pages(store, PAGES)
+        finally:
+            store.close()
+
+        with self.assertLogs("src.storage", "WARNING"):
+            store = open_store(self.output_dir, "pack")
+        self.assertEqual(pack_path.stat().st_size, complete_size)  # 不完整的記錄已截掉
+        store.put(self.output_dir / "page_0005.png", b"recaptured")
+        store.close()
+        store = open_store(self.output_dir, readonly=True)
+        try:
+            self._assert_pages(store, dict(PAGES, **{"page_0005.png": b"recaptured"}))
+        finally:
+            store.close()
+
+    def test_pack_last_write_wins(self):
+        store = open_store(self.output_dir, "pack")
+        store.put(self.output_dir / "page_0001.png", b"first")
+        store.put(self.output_dir / "page_0001.png", b"second")
+        store.close()
+        store = open_store(self.output_dir, readonly=True)
+        try:
+            self._assert_pages(store, {"page_0001.png": b"second"})
+        finally:
+            store.close()
+
+    def test_cbz_entries_with_extra_fields(self):
+        # 其他工具寫出的 CBZ 在本機檔頭可能有 extra 欄位，資料位移須依檔頭計算
+        with zipfile.ZipFile(self.output_dir / CBZ_FILENAME, "w", zipfile.ZIP_STORED) as archive:
+            for index, (name, data) in enumerate(PAGES.items()):
+                info = zipfile.ZipInfo(name)
+                info.extra = struct.pack("<HHB4s", 0x5455, 5, 1, b"\0" * 4) * (index + 1)
+                archive.writestr(info, data)
+        store = open_store(self.output_dir, readonly=True)
+        try:
+            self.assertEqual(store.backend, "cbz")
+            self._assert_pages(store, PAGES)
+        finally:
+            store.close()
+
+    def test_damaged_cbz_cannot_be_appended(self):
+        store = open_store(self.output_dir, "cbz")
+        store.put(self.output_dir / "page_0001.png", b"data" * 100)
+        store._flush()  # 沒有寫入中央目錄就中斷
+        (self.output_dir / "copy.cbz").write_bytes((self.output_dir / CBZ_FILENAME).read_bytes())
+        store.close()
+        os.replace(self.output_dir / "copy.cbz", self.output_dir / CBZ_FILENAME)
+        with self.assertRaises(ValueError):
+            open_store(self.output_dir, "cbz")
+
+
+class CbzOverwriteTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_reput_replaces_entry(self):
+        store = open_store(self.output_dir, "cbz")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            store.put(self.output_dir / "page_0001.png", b"first" * 100)
+            store.put(self.output_dir / "page_0002.png", b"second" * 100)
+            store.put(self.output_dir / "page_0001.png", b"retry" * 100)
+        self.assertEqual(bytes(store.get("page_0001.png")), b"retry" * 100)
+        store.close()
+
+        with zipfile.ZipFile(self.output_dir / CBZ_FILENAME) as archive:
+            self.assertEqual(archive.namelist(), ["page_0001.png", "page_0002.png"])
+            self.assertEqual(archive.read("page_0001.png"), b"retry" * 100)
+
+        # 重新開啟續寫後再取代一次
+        store = open_store(self.output_dir, "cbz")
+        store.put(self.output_dir / "page_0002.png", b"again" * 100)
+        store.close()
+        store = open_store(self.output_dir, readonly=True)
+        try:
+            self.assertEqual(store.names(), ["page_0001.png", "page_0002.png"])
+            self.assertEqual(bytes(store.get("page_0002.png")), b"again" * 100)
+        finally:
+            store.close()
+        with zipfile.ZipFile(self.output_dir / CBZ_FILENAME) as archive:
+            self.assertEqual(len(archive.infolist()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
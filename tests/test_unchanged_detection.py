@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""翻頁是否生效以閱讀器位置 (CFI) 判斷：連續的空白頁不應被誤判為書末。"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+from src.crawler import BooksCrawler  # noqa: E402
+
+
+def _png(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+BLANK = _png("white")
+TEXT = _png("black")
+
+
+class UnchangedDetectionTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        config = {"metrics_dir": "", "page_turn_cache": "", "session_file": "", "async_write": False}
+        self.crawler = BooksCrawler(config, driver=object())
+
+    def tearDown(self):
+        self.crawler.close()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _capture(self, page_num, png_bytes, cfi):
+        # 翻頁時輔助物件一併回報的狀態
+        self.crawler._reader_state = {'location': {'cfi': cfi} if cfi else None}
+        skipped = self.crawler._dedupe_capture(page_num, png_bytes)
+        return skipped, self.crawler._last_capture_status, self.crawler._last_capture_ref
+
+    def test_blank_pages_with_new_location_are_not_unchanged(self):
+        self.assertEqual(self._capture(1, TEXT, "epubcfi(/6/2!/4/2)"), (False, None, None))
+        self.assertEqual(self._capture(2, BLANK, "epubcfi(/6/4!/4/2)"), (False, None, None))
+        # 畫面與上一頁相同，但位置已改變：是內容相同的另一頁
+        self.assertEqual(self._capture(3, BLANK, "epubcfi(/6/6!/4/2)"), (True, 'duplicate', 2))
+        # 位置沒有改變：翻頁沒有生效
+        self.assertEqual(self._capture(4, BLANK, "epubcfi(/6/6!/4/2)"), (True, 'unchanged', 3))
+
+    def test_same_location_is_unchanged_even_if_pixels_differ(self):
+        self._capture(1, TEXT, "epubcfi(/6/2!/4/2)")
+        self.assertEqual(self._capture(2, BLANK, "epubcfi(/6/2!/4/2)"), (True, 'unchanged', 1))
+
+    def test_pixels_are_used_without_location(self):
+        self._capture(1, TEXT, None)
+        self._capture(2, BLANK, None)
+        self.assertEqual(self._capture(3, BLANK, None), (True, 'unchanged', 2))
+
+
+if __name__ == '__main__':
+    unittest.main()